@@ -1,6 +1,39 @@
-from .game import BaccaratTable
-from .game import BetResult
-from .game import NotEnoughMoneyError
-from .game import Player
+"""
+A game of baccarat, and tools to analyse it.
 
-__all__ = ("BaccaratTable", "BetResult", "Player", "NotEnoughMoneyError")
+The public names below are imported from `baccarat.game` when first used, so importing
+the package is quick and has no side effects.
+"""
+# Not imported from typing, which takes longer to import than the package
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from .game import BaccaratTable
+    from .game import BetLimits
+    from .game import BetResult
+    from .game import NotEnoughMoneyError
+    from .game import Player
+    from .game import TableLimitError
+
+__all__ = (
+    "BaccaratTable",
+    "BetLimits",
+    "BetResult",
+    "Player",
+    "NotEnoughMoneyError",
+    "TableLimitError",
+)
+
+
+def __getattr__(name: str) -> object:
+    if name in __all__:
+        from . import game
+
+        value = getattr(game, name)
+        globals()[name] = value
+        return value
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,185 @@
+"""
+Play a table automatically, with a strategy, on a background thread.
+
+An `AutoPlayer` plays rounds as fast as it can, until it has played a number of rounds,
+the player's bankroll reaches a goal, or the player can't place their bets. Rather than
+reporting every round, it puts its progress on a queue at most once per `interval`
+seconds: the totals so far, the latest coup, and the results since the last report.
+A display can then redraw once per frame, however many rounds were played in between.
+
+While it plays, the auto player owns the table, and the table doesn't log each step.
+"""
+import queue
+import threading
+import time
+from typing import NamedTuple
+
+from .game import BaccaratTable
+from .game import BetResult
+from .game import Coup
+from .game import NotEnoughMoneyError
+from .game import TableLimitError
+from .lobby import Strategy
+
+
+class AutoPlayProgress(NamedTuple):
+    """The progress of an auto player.
+
+    :param rounds: The number of rounds played
+    :param bankroll: The player's bankroll
+    :param wagered: The total staked
+    :param won: The player's total winnings, negative if they lost
+    :param result_counts: The number of times each bet type won
+    :param results: The results of the rounds since the last report, oldest first
+    :param coup: The latest coup, if any
+    :param finished: Why the auto player stopped, or None if it is still playing
+    """
+
+    rounds: int
+    bankroll: int
+    wagered: int
+    won: int
+    result_counts: dict[BetResult, int]
+    results: tuple[BetResult, ...]
+    coup: Coup | None
+    finished: str | None
+
+
+class AutoPlayer:
+    """Plays a table with a strategy, reporting its progress on a queue.
+
+    :param table: The table, with a player seated
+    :param strategy: The bets the player places each round
+    :param rounds: The most rounds to play, or None for no limit
+    :param goal: Stop once the player's bankroll reaches this, or None for no goal
+    :param interval: The fewest seconds between reports
+    :raises ValueError: If there is no player at the table
+    """
+
+    progress: "queue.Queue[AutoPlayProgress]"
+
+    def __init__(
+        self,
+        table: BaccaratTable,
+        strategy: Strategy,
+        rounds: int | None = None,
+        goal: int | None = None,
+        interval: float = 1 / 60,
+    ) -> None:
+        if table.player is None:
+            raise ValueError("Player is not set")
+
+        self.table = table
+        self.strategy = strategy
+        self.rounds = rounds
+        self.goal = goal
+        self.interval = interval
+        self.progress = queue.Queue()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self.run, name="autoplay", daemon=True)
+
+    def start(self) -> None:
+        """Start playing on a background thread."""
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Stop playing after the current round.
+
+        :param timeout: The most seconds to wait for the thread to stop
+        """
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def run(self) -> AutoPlayProgress:
+        """Play until finished, reporting progress. Called by the thread, or directly to
+        play in the current thread.
+
+        :return: The final progress
+        """
+        table = self.table
+        player = table.player
+        if player is None:
+            raise ValueError("Player is not set")
+
+        verbose = table.verbose
+        table.verbose = False
+
+        result_index = {result: i for i, result in enumerate(BetResult)}
+        result_counts = [0] * len(result_index)
+        results: list[BetResult] = []
+        rounds = wagered = won = 0
+        finished: str | None = None
+        next_report = time.perf_counter() + self.interval
+
+        try:
+            while True:
+                if self._stop.is_set():
+                    finished = "Stopped"
+                    break
+                if self.rounds is not None and rounds >= self.rounds:
+                    finished = f"Played {rounds:,} rounds"
+                    break
+                if self.goal is not None and player.bankroll >= self.goal:
+                    finished = "Reached the goal"
+                    break
+
+                bets = list(self.strategy(table))
+                if not bets:
+                    finished = "The strategy placed no bets"
+                    break
+
+                bankroll = player.bankroll
+                try:
+                    table.place_bets(bets)
+                except NotEnoughMoneyError:
+                    finished = "Not enough money for the bets"
+                    break
+                except TableLimitError as error:
+                    finished = str(error)
+                    break
+
+                table.play()
+
+                result = table.results[-1]
+                rounds += 1
+                wagered += sum(amount for amount, _ in bets)
+                won += player.bankroll - bankroll
+                result_counts[result_index[result]] += 1
+                results.append(result)
+
+                if time.perf_counter() >= next_report:
+                    self._report(rounds, wagered, won, result_counts, results, None)
+                    results = []
+                    next_report = time.perf_counter() + self.interval
+        finally:
+            table.verbose = verbose
+
+        return self._report(rounds, wagered, won, result_counts, results, finished)
+
+    def _report(
+        self,
+        rounds: int,
+        wagered: int,
+        won: int,
+        result_counts: list[int],
+        results: list[BetResult],
+        finished: str | None,
+    ) -> AutoPlayProgress:
+        table = self.table
+        coup = None
+        if rounds and table.player_hand is not None and table.banker_hand is not None:
+            coup = Coup.from_hands(table.player_hand, table.banker_hand, table.results[-1])
+
+        progress = AutoPlayProgress(
+            rounds,
+            table.player.bankroll if table.player is not None else 0,
+            wagered,
+            won,
+            dict(zip(BetResult, result_counts)),
+            tuple(results),
+            coup,
+            finished,
+        )
+        self.progress.put(progress)
+        return progress
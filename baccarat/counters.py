@@ -0,0 +1,171 @@
+"""
+Count how often each path of the drawing rules is taken, to check play against theory.
+
+Every coup is counted in three fixed arrays of integers:
+
+- by the player's and banker's two card totals, which shows each natural combination
+- by the player's two card total, and whether the player drew
+- by the banker's two card total, the value of the player's third card (or
+  `PLAYER_STOOD`), and whether the banker drew
+
+Coups decided by a natural are only counted in the first. The counts come from the
+cards actually dealt, so `mismatches` finds any coup played against the rules.
+"""
+from array import array
+from collections.abc import Sequence
+from typing import Any
+
+from .game import BaccaratTable
+from .game import Coup
+from .game import does_banker_draw
+from .game import does_player_draw
+from .game import EventType
+from .game import get_baccarat_value
+from .game import TableEvent
+from .utils import Card
+
+NUM_TOTALS = 10
+# The column of the banker's counts for coups where the player stood
+PLAYER_STOOD = 10
+
+Matrix = list[list[int]]
+
+
+class RuleCounters:
+    """Counts of each path of the drawing rules."""
+
+    totals: "array[int]"
+    player: "array[int]"
+    banker: "array[int]"
+
+    def __init__(self) -> None:
+        self.totals = array("q", [0] * NUM_TOTALS * NUM_TOTALS)
+        self.player = array("q", [0] * NUM_TOTALS * 2)
+        self.banker = array("q", [0] * NUM_TOTALS * (PLAYER_STOOD + 1) * 2)
+
+    def add(self, player_cards: Sequence[Card], banker_cards: Sequence[Card]) -> None:
+        """Count a coup from its cards.
+
+        :param player_cards: The player's cards, in the order they were dealt
+        :param banker_cards: The banker's cards, in the order they were dealt
+        """
+
+        player_total = _two_card_total(player_cards)
+        banker_total = _two_card_total(banker_cards)
+        self.totals[player_total * NUM_TOTALS + banker_total] += 1
+
+        if player_total >= 8 or banker_total >= 8:
+            return
+
+        player_drew = len(player_cards) == 3
+        self.player[player_total * 2 + player_drew] += 1
+
+        third_card = get_baccarat_value(player_cards[2]) if player_drew else PLAYER_STOOD
+        banker_drew = len(banker_cards) == 3
+        self.banker[(banker_total * (PLAYER_STOOD + 1) + third_card) * 2 + banker_drew] += 1
+
+    def add_coup(self, coup: Coup) -> None:
+        """Count a coup.
+
+        :param coup: The coup
+        """
+        self.add(coup.player_cards, coup.banker_cards)
+
+    def attach(self, table: BaccaratTable) -> None:
+        """Count every coup played at a table from now on.
+
+        :param table: The table
+        """
+
+        def listener(event: TableEvent) -> None:
+            if (
+                event.type is EventType.RESULT
+                and table.player_hand is not None
+                and table.banker_hand is not None
+            ):
+                self.add(table.player_hand.cards, table.banker_hand.cards)
+
+        table.listeners.append(listener)
+
+    @property
+    def coups(self) -> int:
+        """The number of coups counted."""
+        return sum(self.totals)
+
+    def totals_matrix(self) -> Matrix:
+        """The number of coups by the player's (rows) and banker's (columns) two card totals."""
+        return _matrix(self.totals, NUM_TOTALS, NUM_TOTALS)
+
+    def player_matrix(self) -> Matrix:
+        """The number of coups by the player's two card total (rows), and whether the
+        player stood or drew (columns), excluding naturals."""
+        return _matrix(self.player, NUM_TOTALS, 2)
+
+    def banker_matrix(self, drew: bool) -> Matrix:
+        """The number of coups by the banker's two card total (rows) and the value of the
+        player's third card (columns, with `PLAYER_STOOD` last), excluding naturals.
+
+        :param drew: Whether to count the coups where the banker drew, or stood
+        :return: The matrix
+        """
+        return _matrix(self.banker[drew::2], NUM_TOTALS, PLAYER_STOOD + 1)
+
+    def mismatches(self) -> list[tuple[str, int, int | None, int]]:
+        """The paths taken against the drawing rules.
+
+        :return: The hand that broke the rules, its two card total, the value of the
+            player's third card if it is the banker, and the number of coups
+        """
+
+        mismatches: list[tuple[str, int, int | None, int]] = []
+        for total in range(8):
+            count = self.player[total * 2 + (not does_player_draw(total))]
+            if count:
+                mismatches.append(("player", total, None, count))
+
+        for total in range(8):
+            for third_card in range(PLAYER_STOOD + 1):
+                value = None if third_card == PLAYER_STOOD else third_card
+                drew = does_banker_draw(total, value)
+                count = self.banker[(total * (PLAYER_STOOD + 1) + third_card) * 2 + (not drew)]
+                if count:
+                    mismatches.append(("banker", total, value, count))
+
+        return mismatches
+
+    def merge(self, other: "RuleCounters") -> None:
+        """Add the counts of another set of counters.
+
+        :param other: The other counters
+        """
+        for counts, other_counts in (
+            (self.totals, other.totals),
+            (self.player, other.player),
+            (self.banker, other.banker),
+        ):
+            for i, count in enumerate(other_counts):
+                counts[i] += count
+
+    def to_dict(self) -> dict[str, Any]:
+        """The counts as JSON-compatible data, e.g. to export with other metrics."""
+        return {
+            "coups": self.coups,
+            "totals": self.totals_matrix(),
+            "player": self.player_matrix(),
+            "banker_stood": self.banker_matrix(False),
+            "banker_drew": self.banker_matrix(True),
+        }
+
+
+def _two_card_total(cards: Sequence[Card]) -> int:
+    return (get_baccarat_value(cards[0]) + get_baccarat_value(cards[1])) % 10
+
+
+def _matrix(counts: Sequence[int], rows: int, columns: int) -> Matrix:
+    matrix = []
+    for row in range(rows):
+        start = row * columns
+        end = start + columns
+        matrix.append(list(counts[start:end]))
+
+    return matrix
@@ -16,24 +16,39 @@ Hand Values:
 - The value of a hand is the sum of the values of its cards, modulo 10
 (i.e., the maximum value of a hand is 9)
 """
+import functools
 import logging
-import math
+import operator
 import sys
 from collections import Counter
 from collections import deque
+from collections.abc import Callable
+from collections.abc import Iterable
+from collections.abc import Iterator
+from collections.abc import Sequence
 from dataclasses import dataclass
 from enum import Enum
+from fractions import Fraction
+from itertools import chain
+from itertools import repeat
 from typing import NamedTuple
 
 from .utils import Card
 from .utils import Shoe
 from .utils import Value
 
-logging.basicConfig(
-    stream=sys.stdout,
-    level=logging.DEBUG,
-    format="TABLE (%(asctime)s): %(message)s",
-)
+LOG_FORMAT = "TABLE (%(asctime)s): %(message)s"
+
+logger = logging.getLogger(__name__)
+
+
+def configure_logging(level: int = logging.DEBUG) -> None:
+    """Print the log of each step of the game to stdout. Importing the package leaves
+    logging alone, so scripts call this themselves.
+
+    :param level: The lowest level of message to print
+    """
+    logging.basicConfig(stream=sys.stdout, level=level, format=LOG_FORMAT)
 
 
 class NotEnoughMoneyError(Exception):
@@ -42,6 +57,12 @@ class NotEnoughMoneyError(Exception):
     pass
 
 
+class TableLimitError(Exception):
+    """Raised when a bet is outside the table's limits."""
+
+    pass
+
+
 class BetResult(Enum):
     """A bet type."""
 
@@ -107,6 +128,136 @@ class BaccaratHand:
         return f"{self.__class__.__name__}(total={self.get_value()}, cards={self.cards})"
 
 
+class Outcome(NamedTuple):
+    """The outcome of a coup, ignoring the suits and order of the cards.
+
+    :param player_total: The player's final total
+    :param banker_total: The banker's final total
+    :param player_drew: Whether the player drew a third card
+    :param banker_drew: Whether the banker drew a third card
+    """
+
+    player_total: int
+    banker_total: int
+    player_drew: bool
+    banker_drew: bool
+
+    @property
+    def result(self) -> BetResult:
+        """The winning bet type."""
+        if self.player_total > self.banker_total:
+            return BetResult.PLAYER
+        elif self.player_total < self.banker_total:
+            return BetResult.BANKER
+        else:
+            return BetResult.TIE
+
+    @property
+    def natural(self) -> bool:
+        """Whether the coup was decided by a natural."""
+        return (
+            not self.player_drew
+            and not self.banker_drew
+            and max(self.player_total, self.banker_total) >= 8
+        )
+
+
+class Coup(NamedTuple):
+    """A single coup (round) of baccarat that has been played out.
+
+    :param player_cards: The player's cards, in the order they were dealt
+    :param banker_cards: The banker's cards, in the order they were dealt
+    :param player_total: The player's final total
+    :param banker_total: The banker's final total
+    :param result: The winning bet type
+    :param natural: Whether the coup was decided by a natural
+    """
+
+    player_cards: tuple[Card, ...]
+    banker_cards: tuple[Card, ...]
+    player_total: int
+    banker_total: int
+    result: BetResult
+    natural: bool
+
+    @property
+    def outcome(self) -> Outcome:
+        """The outcome of the coup."""
+        return Outcome(
+            self.player_total,
+            self.banker_total,
+            len(self.player_cards) == 3,
+            len(self.banker_cards) == 3,
+        )
+
+    @classmethod
+    def from_hands(
+        cls, player_hand: BaccaratHand, banker_hand: BaccaratHand, result: BetResult
+    ) -> "Coup":
+        """The coup played out with two hands.
+
+        :param player_hand: The player's hand
+        :param banker_hand: The banker's hand
+        :param result: The result of the coup
+        :return: The coup
+        """
+        player_total = player_hand.total
+        banker_total = banker_hand.total
+        return cls(
+            tuple(player_hand.cards),
+            tuple(banker_hand.cards),
+            player_total,
+            banker_total,
+            result,
+            player_hand.num_cards == banker_hand.num_cards == 2
+            and max(player_total, banker_total) >= 8,
+        )
+
+
+class Rounding(Enum):
+    """How winnings are rounded to a whole unit of money."""
+
+    DOWN = "down"
+    UP = "up"
+    HALF_EVEN = "half-even"
+
+
+class PayoutRules(NamedTuple):
+    """The payout rules of a table.
+
+    :param banker_commission: The commission taken from the winnings of a Banker bet
+    :param tie_payout: The multiple of the stake returned on a winning Tie bet
+    :param tie_pushes: Whether Player and Banker bets are returned on a tie
+    :param rounding: How winnings that are not a whole unit of money are rounded
+    """
+
+    banker_commission: Fraction = Fraction(5, 100)
+    tie_payout: int = 8
+    tie_pushes: bool = False
+    rounding: Rounding = Rounding.DOWN
+
+    def net_odds(self, bet_type: BetResult, result: BetResult) -> Fraction:
+        """The net amount won per unit staked, before any rounding.
+
+        :param bet_type: The bet type
+        :param result: The result of the game
+        :return: The net win per unit staked (-1 if the bet loses)
+        """
+        if bet_type is not result:
+            if result is BetResult.TIE and self.tie_pushes:
+                return Fraction(0)
+            return Fraction(-1)
+        elif result is BetResult.PLAYER:
+            return Fraction(1)
+        elif result is BetResult.BANKER:
+            return 1 - self.banker_commission
+        else:
+            return Fraction(self.tie_payout - 1)
+
+
+STANDARD_RULES = PayoutRules()
+
+
 class Bet(NamedTuple):
     """A bet on the game.
 
@@ -118,6 +269,70 @@ class Bet(NamedTuple):
     result: BetResult
 
 
+class BetLimits(NamedTuple):
+    """The smallest and largest amount that can be bet.
+
+    :param minimum: The smallest amount
+    :param maximum: The largest amount, if any
+    """
+
+    minimum: int = 1
+    maximum: int | None = None
+
+    def allows(self, amount: int) -> bool:
+        """Whether an amount is within the limits."""
+        return amount >= self.minimum and (self.maximum is None or amount <= self.maximum)
+
+
+# Every bet must be positive anyway, so these limits allow any bet
+NO_LIMITS = BetLimits()
+
+
+class EventType(Enum):
+    """A change to the state of a table."""
+
+    SEAT = "seat"
+    BET = "bet"
+    SHUFFLE = "shuffle"
+    DEAL = "deal"
+    DRAW = "draw"
+    RESULT = "result"
+    SETTLE = "settle"
+
+
+class TableEvent(NamedTuple):
+    """A change to the state of a table, passed to each of its listeners.
+
+    - SEAT: `amount` is the player's bankroll
+    - BET: `amount` and `result` are the bet's amount and type
+    - SHUFFLE: `cards` are the cards in the shoe, after the discards are shuffled back
+      in, and `amount` is the number of times the shoe has been shuffled
+    - DEAL: `cards` are the four cards dealt, in order
+    - DRAW: `cards` is the third card, and `result` whose hand drew it
+    - RESULT: `result` is the result of the game
+    - SETTLE: `amount` is the total paid out to the player, `result` is the result of
+      the game, and `settled` is each bet settled with its payout
+
+    :param type: The type of event
+    :param amount: An amount of money
+    :param result: A bet type
+    :param cards: Some cards
+    :param settled: Some bets, each with its payout (0 if the bet lost)
+    """
+
+    type: EventType
+    amount: int = 0
+    result: BetResult | None = None
+    cards: tuple[Card, ...] = ()
+    settled: tuple[tuple[Bet, int], ...] = ()
+
+
+Listener = Callable[[TableEvent], None]
+
+# Given the last coup, if any, the amount and type of each bet to place on the next
+BetCallback = Callable[[Coup | None], Iterable[tuple[int, BetResult]]]
+
+
 @dataclass
 class Player:
     """A player.
@@ -141,6 +356,22 @@ class Player:
         self.bankroll -= amount
         return Bet(amount, result)
 
+    def make_bets(self, bets: Sequence[tuple[int, BetResult]]) -> list[Bet]:
+        """Make many bets at once, debiting the bankroll once.
+
+        :param bets: The amount and type of each bet
+        :raises NotEnoughMoneyError: If the bets add up to more than the bankroll,
+            in which case no bet is made
+        :return: The bets
+        """
+
+        total = sum(amount for amount, _ in bets)
+        if total > self.bankroll:
+            raise NotEnoughMoneyError("Player does not have enough money to make bets")
+
+        self.bankroll -= total
+        return [Bet(amount, result) for amount, result in bets]
+
     def win_bet(self, amount: int) -> None:
         """Win a bet - add the amount to the bankroll.
 
@@ -154,29 +385,91 @@ class BaccaratTable:
     """A game of baccarat.
 
     :param num_decks: The number of decks to use in the shoe
+    :param rules: The payout rules of the table
+    :param limits: The limits of every bet
+    :param type_limits: The limits of the total staked on a bet type in one game
+    :param shoe: The shoe to deal from, instead of a new one
+    :param verbose: Whether to log each step of the game
+    :param history: The fewest recent results to keep, or None to keep every result
     """
 
-    shoe: Shoe
+    rules: PayoutRules
+    limits: BetLimits
+    type_limits: dict[BetResult, BetLimits]
     player: Player | None
     bets: deque[Bet]
     player_hand: BaccaratHand | None
     banker_hand: BaccaratHand | None
     results: list[BetResult]
-
-    def __init__(self, num_decks: int = 8) -> None:
-        self.shoe = Shoe(num_decks)
-        self.shoe.shuffle()
-        logging.info(f"Shoe shuffled with {self.shoe.num_cards} cards")
-
+    trimmed_results: int
+    verbose: bool
+    history: int | None
+    listeners: list[Listener]
+
+    def __init__(
+        self,
+        num_decks: int = 8,
+        rules: PayoutRules = STANDARD_RULES,
+        limits: BetLimits = NO_LIMITS,
+        type_limits: dict[BetResult, BetLimits] | None = None,
+        shoe: Shoe | None = None,
+        verbose: bool = True,
+        history: int | None = None,
+    ) -> None:
+        self.verbose = verbose
+        self.history = history
+
+        if shoe is None:
+            shoe = Shoe(num_decks)
+            shoe.shuffle()
+            if self.verbose:
+                logger.info(f"Shoe shuffled with {shoe.num_cards} cards")
+
+        self._shoe: Shoe | None = shoe
+
+        self.rules = rules
+        self.limits = limits
+        self.type_limits = type_limits or {}
         self.player = None
         self.bets = deque()
         self.player_hand = None
         self.banker_hand = None
         self.results = []
+        self.trimmed_results = 0
+
+        # Called with every change to the table's state, e.g. to journal it
+        self.listeners = []
+        self._shuffle_seen = (id(self.shoe), self.shoe.shuffles)
+
+    @property
+    def shoe(self) -> Shoe:
+        """The shoe the table deals from.
+
+        :raises ValueError: If the table is closed
+        """
+        if self._shoe is None:
+            raise ValueError("The table is closed")
+
+        return self._shoe
+
+    @property
+    def closed(self) -> bool:
+        """Whether the table is closed, and has no shoe."""
+        return self._shoe is None
+
+    def close(self) -> Shoe:
+        """Close the table, detaching its shoe so it can be dealt from elsewhere.
+
+        :raises ValueError: If the table is already closed
+        :return: The shoe
+        """
+        shoe = self.shoe
+        self._shoe = None
+        return shoe
 
     @property
     def num_games(self) -> int:
-        """The number of games played."""
+        """The number of games played, or kept in the history if it is bounded."""
         return len(self.results)
 
     @property
@@ -205,22 +498,78 @@ class BaccaratTable:
         :param player: The player to seat
         """
         self.player = player
-        logging.info(f"Player seated with ${player.bankroll:.02f}")
+        if self.listeners:
+            self._emit(TableEvent(EventType.SEAT, player.bankroll))
+        if self.verbose:
+            logger.info(f"Player seated with ${player.bankroll:.02f}")
 
     def place_bet(self, amount: int, result: BetResult) -> None:
         """Place a bet.
 
         :param amount: The amount to bet
         :param result: The bet type
-        :raises ValueError: If the bet amount is greater than the player's bankroll
+        :raises ValueError: If the player is not set, or the amount isn't positive
+        :raises TableLimitError: If the bet is outside the table's limits
+        :raises NotEnoughMoneyError: If the bet amount is greater than the player's bankroll
         """
 
         if self.player is None:
             raise ValueError("Player is not set")
 
+        self._check_limits([(amount, result)])
         bet = self.player.make_bet(amount, result)
         self.bets.append(bet)
-        logging.info(f"Player bets ${bet.amount:.02f} on '{bet.result.value}'")
+        if self.listeners:
+            self._emit(TableEvent(EventType.BET, bet.amount, bet.result))
+        if self.verbose:
+            logger.info(f"Player bets ${bet.amount:.02f} on '{bet.result.value}'")
+
+    def place_bets(self, bets: Iterable[tuple[int, BetResult]]) -> None:
+        """Place many bets at once. Either every bet is placed, or none are.
+
+        :param bets: The amount and type of each bet
+        :raises ValueError: If the player is not set, or any amount isn't positive
+        :raises TableLimitError: If any bet is outside the table's limits
+        :raises NotEnoughMoneyError: If the bets add up to more than the player's bankroll
+        """
+
+        if self.player is None:
+            raise ValueError("Player is not set")
+
+        bets = list(bets)
+        self._check_limits(bets)
+        placed = self.player.make_bets(bets)
+        self.bets.extend(placed)
+        if self.listeners:
+            for bet in placed:
+                self._emit(TableEvent(EventType.BET, bet.amount, bet.result))
+        if self.verbose:
+            logger.info(f"Player places {len(bets)} bets")
+
+    def _check_limits(self, bets: Sequence[tuple[int, BetResult]]) -> None:
+        """Check new bets are positive and, along with any already placed, within the
+        table's limits."""
+
+        # A table has no standing bets to sit out with (unlike a tournament, where a bet of
+        # 0 sits an entrant out), so every bet placed is a stake
+        for amount, _ in bets:
+            if amount <= 0:
+                raise ValueError(f"Bets must be positive, not ${amount:.02f}")
+
+        totals: dict[BetResult, int] = {}
+        for amount, result in chain(self.bets, bets):
+            totals[result] = totals.get(result, 0) + amount
+
+        for amount, result in bets:
+            if not self.limits.allows(amount):
+                raise TableLimitError(f"${amount:.02f} is outside the table limits {self.limits}")
+
+        for result, total in totals.items():
+            limits = self.type_limits.get(result, NO_LIMITS)
+            if not limits.allows(total):
+                raise TableLimitError(
+                    f"${total:.02f} on '{result.value}' is outside its limits {limits}"
+                )
 
     def play(self) -> None:
         """Play a game of baccarat."""
@@ -229,16 +578,28 @@ class BaccaratTable:
 
         if self.shoe.num_cards < 6:
             self.shoe.reset()
-            logging.info(f"Shoe reset with {self.shoe.num_cards} cards")
+            if self.verbose:
+                logger.info(f"Shoe reset with {self.shoe.num_cards} cards")
+
+        # The shoe may also have been reshuffled, or swapped, since the last game
+        if self.listeners and (id(self.shoe), self.shoe.shuffles) != self._shuffle_seen:
+            self._emit(
+                TableEvent(EventType.SHUFFLE, self.shoe.shuffles, cards=tuple(self.shoe.cards))
+            )
+        self._shuffle_seen = (id(self.shoe), self.shoe.shuffles)
 
         # Set up the game - deal 2 cards to the player and banker
-        logging.info(f"Starting new deal with {self.shoe.num_cards} cards")
+        if self.verbose:
+            logger.info(f"Starting new deal with {self.shoe.num_cards} cards")
         self._deal()
 
         # Play the game - draw as needed, and determine the result
         result = self._play()
-        logging.info(f"The result is '{result.value}'")
-        self.results.append(result)
+        if self.verbose:
+            logger.info(f"The result is '{result.value}'")
+        self._record(result)
+        if self.listeners:
+            self._emit(TableEvent(EventType.RESULT, result=result))
 
         # Settle the bets - pay out winnings, if any
         self._settle_bets(result)
@@ -246,7 +607,57 @@ class BaccaratTable:
         if self.player is None:
             raise ValueError("Player is not set")
 
-        logging.info(f"Player's bankroll is now ${self.player.bankroll:.02f}")
+        if self.verbose:
+            logger.info(f"Player's bankroll is now ${self.player.bankroll:.02f}")
+
+    def iter_coups(self, n: int | None = None, bets: BetCallback | None = None) -> Iterator[Coup]:
+        """Play coups lazily, yielding each one as it is played.
+
+        Coups are played without bets, unless a callback places them. The shoe is reset
+        when it runs low. Nothing is logged, the coups are not added to the results, and
+        the listeners are not called, so any number of coups can be streamed in
+        constant memory.
+
+        Bets placed by the callback are debited from the player's bankroll and settled
+        directly, without going through the table's pending bets, so listeners never see
+        a bet without its settlement. Any bets already pending are left for `play`. A
+        table with a journal, ledger or other listener should be played with `play`.
+
+        :param n: The number of coups to play, or None to play forever
+        :param bets: Places bets on each coup, given the last coup
+        :raises ValueError: If bets are placed with no player set, or aren't positive
+        :raises TableLimitError: If a bet is outside the table's limits
+        :raises NotEnoughMoneyError: If the player can't afford the bets
+        :return: The coups
+        """
+
+        coup = None
+        played = 0
+        while n is None or played < n:
+            placed: list[Bet] = []
+            if bets is not None:
+                new_bets = list(bets(coup))
+                if new_bets:
+                    if self.player is None:
+                        raise ValueError("Player is not set")
+                    self._check_limits(new_bets)
+                    placed = self.player.make_bets(new_bets)
+
+            if self.shoe.num_cards < 6:
+                self.shoe.reset()
+
+            coup = deal_coup(self.shoe)
+            if placed and self.player is not None:
+                payouts = settle_bets(
+                    [bet.amount for bet in placed],
+                    [bet.result for bet in placed],
+                    coup.result,
+                    self.rules,
+                )
+                self.player.win_bet(sum(payouts))
+
+            played += 1
+            yield coup
 
     def _deal(self) -> None:
         """Deal the cards."""
@@ -259,8 +670,21 @@ class BaccaratTable:
         self.player_hand.add_card(self.shoe.deal())
         self.banker_hand.add_card(self.shoe.deal())
 
-        logging.info(f"Player has {self.player_hand}")
-        logging.info(f"Banker has {self.banker_hand}")
+        if self.listeners:
+            cards = (*self.player_hand.cards, *self.banker_hand.cards)
+            self._emit(TableEvent(EventType.DEAL, cards=cards[0::2] + cards[1::2]))
+        if self.verbose:
+            logger.info(f"Player has {self.player_hand}")
+            logger.info(f"Banker has {self.banker_hand}")
+
+    def _record(self, result: BetResult) -> None:
+        """Add a result to the history, trimming it once it is twice its bound."""
+
+        self.results.append(result)
+        if self.history is not None and len(self.results) > 2 * self.history:
+            trim = len(self.results) - self.history
+            del self.results[:trim]
+            self.trimmed_results += trim
 
     def _play(self) -> BetResult:
         """Play the game."""
@@ -271,41 +695,67 @@ class BaccaratTable:
         natural_win = check_natural(self.player_hand, self.banker_hand)
 
         if natural_win:
-            logging.info(f"Natual! Result is '{natural_win.value}'")
+            if self.verbose:
+                logger.info(f"Natual! Result is '{natural_win.value}'")
             return natural_win
 
         do_player_draw(self.player_hand, self.shoe)
-        BaccaratTable._log_draw("Player", self.player_hand)
-
         do_banker_draw(self.banker_hand, self.player_hand, self.shoe)
-        BaccaratTable._log_draw("Banker", self.banker_hand)
+
+        if self.listeners:
+            for who, hand in (
+                (BetResult.PLAYER, self.player_hand),
+                (BetResult.BANKER, self.banker_hand),
+            ):
+                if hand.third_card is not None:
+                    self._emit(TableEvent(EventType.DRAW, result=who, cards=(hand.third_card,)))
+
+        if self.verbose:
+            BaccaratTable._log_draw("Player", self.player_hand)
+            BaccaratTable._log_draw("Banker", self.banker_hand)
 
         return get_result(self.player_hand, self.banker_hand)
 
     def _settle_bets(self, result: BetResult) -> None:
+        bets, amounts = self._pay_bets(result)
+
+        if self.verbose:
+            for bet, amount in zip(bets, amounts):
+                if amount == 0:
+                    logger.info(f"Player loses ${bet.amount:.02f}")
+                if amount > 0:
+                    logger.info(f"Player wins ${amount:.02f}")
+
+        if self.listeners:
+            settled = tuple(zip(bets, amounts))
+            self._emit(TableEvent(EventType.SETTLE, sum(amounts), result, settled=settled))
+
+    def _pay_bets(self, result: BetResult) -> tuple[list[Bet], list[int]]:
+        """Pay the player for the bets placed, and clear them."""
+
         if self.player is None:
             raise ValueError("Player is not set")
 
-        while self.bets:
-            bet = self.bets.popleft()
-            amount = settle_bet(bet, result)
+        bets = list(self.bets)
+        self.bets.clear()
 
-            if amount == 0:
-                logging.info(f"Player loses ${bet.amount:.02f}")
-            if amount > 0:
-                logging.info(f"Player wins ${amount:.02f}")
+        amounts = settle_bets(
+            [bet.amount for bet in bets], [bet.result for bet in bets], result, self.rules
+        )
+        self.player.win_bet(sum(amounts))
 
-            self.player.win_bet(amount)
+        return bets, amounts
 
-        if len(self.bets) != 0:
-            raise ValueError("Not all bets have been settled")
+    def _emit(self, event: TableEvent) -> None:
+        for listener in self.listeners:
+            listener(event)
 
     @classmethod
     def _log_draw(cls, who: str, hand: BaccaratHand) -> None:
         if hand.num_cards == 3:
-            logging.info(f"{who} draws {hand.third_card} - new total is {hand.total}")
+            logger.info(f"{who} draws {hand.third_card} - new total is {hand.total}")
         else:
-            logging.info(f"{who} stands with {hand.total}")
+            logger.info(f"{who} stands with {hand.total}")
 
 
 def get_baccarat_value(card: Card) -> int:
@@ -315,12 +765,20 @@ def get_baccarat_value(card: Card) -> int:
     :return: The baccarat value of the card as an integer
     """
 
-    if card.value in [Value.TEN, Value.JACK, Value.QUEEN, Value.KING]:
+    return _BACCARAT_VALUES[card.value]
+
+
+def _baccarat_value(value: Value) -> int:
+    if value in [Value.TEN, Value.JACK, Value.QUEEN, Value.KING]:
         return 0
-    elif card.value is Value.ACE:
+    elif value is Value.ACE:
         return 1
     else:
-        return int(card.value.value)
+        return int(value.value)
+
+
+# Looked up on every card dealt, so computed once for each value
+_BACCARAT_VALUES = {value: _baccarat_value(value) for value in Value}
 
 
 def does_player_draw(player_total: int) -> bool:
@@ -387,11 +845,11 @@ def check_natural(player_hand: BaccaratHand, banker_hand: BaccaratHand) -> BetRe
 
     :param player_hand: The player's hand
     :param banker_hand: The banker's hand
-    :return: The bet type if a natural win, otherwise False
+    :return: The bet type if a natural win, otherwise None
     """
 
     if player_hand.is_natural and banker_hand.is_natural:
-        return BetResult.TIE
+        return get_result(player_hand, banker_hand)
     elif player_hand.is_natural:
         return BetResult.PLAYER
     elif banker_hand.is_natural:
@@ -416,18 +874,136 @@ def get_result(player_hand: BaccaratHand, banker_hand: BaccaratHand) -> BetResul
         return BetResult.TIE
 
 
-def settle_bet(bet: Bet, result: BetResult) -> int:
+def settle_bet(bet: Bet, result: BetResult, rules: PayoutRules = STANDARD_RULES) -> int:
     """Settle a bet.
 
     :param bet: the bet
     :param result: the result of the game
+    :param rules: the payout rules of the table
     :return: the amount to pay out (0 if the bet loses)
     """
-    if result is BetResult.PLAYER and bet.result == result:
-        return bet.amount * 2
-    elif result is BetResult.BANKER and bet.result == result:
-        return math.floor(bet.amount * 1.95)  # 5% commission
-    elif bet.result == BetResult.TIE and result == BetResult.TIE:
-        return bet.amount * 8
+    numerator, denominator = _net_odds_ratio(rules, bet.result, result)
+    return bet.amount + _round(bet.amount * numerator, denominator, rules.rounding)
+
+
+def settle_bets(
+    amounts: Sequence[int],
+    bet_types: Sequence[BetResult],
+    result: BetResult,
+    rules: PayoutRules = STANDARD_RULES,
+) -> list[int]:
+    """Settle many bets at once.
+
+    Amounts are whole units of money (e.g. cents), and payouts are computed with
+    integer arithmetic only, so they are exact for any stake.
+
+    :param amounts: the amount of each bet
+    :param bet_types: the type of each bet
+    :param result: the result of the game
+    :param rules: the payout rules of the table
+    :return: the amount to pay out on each bet (0 if the bet loses)
+    """
+
+    odds = {bet_type: _net_odds_ratio(rules, bet_type, result) for bet_type in BetResult}
+    rounding = rules.rounding
+
+    # Whole-unit odds (e.g. even money, or a loss) need no rounding
+    multiples = {
+        bet_type: 1 + numerator
+        for bet_type, (numerator, denominator) in odds.items()
+        if denominator == 1
+    }
+    if len(multiples) == len(odds):
+        return [amount * multiples[bet_type] for amount, bet_type in zip(amounts, bet_types)]
+
+    payouts = []
+    for amount, bet_type in zip(amounts, bet_types):
+        if bet_type in multiples:
+            payouts.append(amount * multiples[bet_type])
+        else:
+            numerator, denominator = odds[bet_type]
+            payouts.append(amount + _round(amount * numerator, denominator, rounding))
+
+    return payouts
+
+
+def settle_stakes(
+    amounts: Sequence[int],
+    bet_type: BetResult,
+    result: BetResult,
+    rules: PayoutRules = STANDARD_RULES,
+) -> list[int]:
+    """Settle many bets of the same type at once.
+
+    The payouts are the same as `settle_bets`, but each step of the arithmetic is applied
+    to every amount in one `map`, rather than a bet at a time, which is much quicker for
+    thousands of bets.
+
+    :param amounts: the amount of each bet
+    :param bet_type: the type of every bet
+    :param result: the result of the game
+    :param rules: the payout rules of the table
+    :return: the amount to pay out on each bet (0 if the bet loses)
+    """
+
+    numerator, denominator = _net_odds_ratio(rules, bet_type, result)
+    if denominator == 1:
+        return list(map(operator.mul, amounts, repeat(1 + numerator)))
+
+    winnings = map(operator.mul, amounts, repeat(numerator))
+    if rules.rounding is Rounding.DOWN:
+        rounded = map(operator.floordiv, winnings, repeat(denominator))
+    elif rules.rounding is Rounding.UP:
+        negated = map(operator.neg, winnings)
+        rounded = map(operator.neg, map(operator.floordiv, negated, repeat(denominator)))
     else:
-        return 0
+        rounded = map(_round, winnings, repeat(denominator), repeat(rules.rounding))
+
+    return list(map(operator.add, amounts, rounded))
+
+
+@functools.lru_cache(maxsize=None)
+def _net_odds_ratio(rules: PayoutRules, bet_type: BetResult, result: BetResult) -> tuple[int, int]:
+    """The net odds of a bet as an integer numerator and denominator."""
+    odds = rules.net_odds(bet_type, result)
+    return odds.numerator, odds.denominator
+
+
+def _round(numerator: int, denominator: int, rounding: Rounding) -> int:
+    """Divide two integers, rounding the quotient to an integer."""
+
+    if rounding is Rounding.DOWN:
+        return numerator // denominator
+    elif rounding is Rounding.UP:
+        return -(-numerator // denominator)
+
+    quotient, remainder = divmod(numerator, denominator)
+    if 2 * remainder > denominator or (2 * remainder == denominator and quotient % 2 == 1):
+        return quotient + 1
+
+    return quotient
+
+
+def deal_coup(shoe: Shoe) -> Coup:
+    """Deal and play out a single coup from the shoe, without any logging.
+
+    :param shoe: The shoe of cards, which must hold at least 6 cards
+    :return: The coup
+    """
+
+    player_hand = BaccaratHand()
+    banker_hand = BaccaratHand()
+
+    for hand in (player_hand, banker_hand, player_hand, banker_hand):
+        hand.add_card(shoe.deal())
+
+    natural_win = check_natural(player_hand, banker_hand)
+
+    if natural_win is None:
+        do_player_draw(player_hand, shoe)
+        do_banker_draw(banker_hand, player_hand, shoe)
+        result = get_result(player_hand, banker_hand)
+    else:
+        result = natural_win
+
+    return Coup.from_hands(player_hand, banker_hand, result)
@@ -0,0 +1,304 @@
+"""
+An append-only journal of every change to a table's state, for audit and recovery.
+
+A `Journal` listens to a table and appends each event (seat, bet, shuffle, deal, draw,
+result and settle) to a buffer, which is written to disk in batches. Every so many
+rounds, between rounds, it also appends a snapshot of the whole table (see
+`baccarat.snapshot`), so the table can be rebuilt by replaying only the events since
+the latest snapshot.
+
+The journal is a directory of numbered segment files. A segment is rotated once it
+grows past a size, and each new segment starts with a snapshot, so old segments can be
+archived or deleted. Each record in a segment is:
+
+    length      4 bytes     the length of the payload
+    checksum    4 bytes     the CRC-32 of the payload
+    kind        1 byte      SNAPSHOT or EVENT
+    payload     a snapshot, or an event (see EVENT)
+
+A record torn by a crash fails its checksum, and ends the journal.
+"""
+import os
+import struct
+import time
+import zlib
+from collections.abc import Iterator
+from enum import Enum
+from pathlib import Path
+from types import TracebackType
+from typing import BinaryIO
+
+from .game import BaccaratTable
+from .game import BetResult
+from .game import EventType
+from .game import Player
+from .game import TableEvent
+from .snapshot import decode_cards
+from .snapshot import encode_cards
+from .snapshot import restore
+from .snapshot import Snapshotter
+
+RECORD = struct.Struct("<IIB")
+# type, amount, result (255 if none), then the number of cards, each 1 byte
+EVENT = struct.Struct("<BqBH")
+
+SNAPSHOT = 0
+EVENT_RECORD = 1
+
+SEGMENT_SUFFIX = ".journal"
+
+EVENT_TYPES = tuple(EventType)
+RESULTS = tuple(BetResult)
+
+# Looked up by identity, as hashing an enum is slow
+_EVENT_TYPE_CODES = {id(event_type): code for code, event_type in enumerate(EVENT_TYPES)}
+_NO_RESULT = 255
+_RESULT_CODES = {id(result): code for code, result in enumerate(RESULTS)} | {id(None): _NO_RESULT}
+
+
+class FsyncPolicy(Enum):
+    """When to force the journal's writes to disk."""
+
+    NEVER = "never"
+    BATCH = "batch"
+    INTERVAL = "interval"
+
+
+class Journal:
+    """Journal every change to a table's state.
+
+    :param directory: The directory of the journal's segments
+    :param table: The table to journal
+    :param batch_size: The number of records to buffer before writing them
+    :param fsync: When to force writes to disk - after every batch, at most once per
+        `fsync_interval` seconds, or never (leaving it to the operating system)
+    :param fsync_interval: The seconds between forced writes, with the INTERVAL policy
+    :param segment_size: The size in bytes past which a new segment is started
+    :param snapshot_every: The number of rounds between snapshots
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        table: BaccaratTable,
+        batch_size: int = 1024,
+        fsync: FsyncPolicy = FsyncPolicy.BATCH,
+        fsync_interval: float = 1.0,
+        segment_size: int = 16 * 1024 * 1024,
+        snapshot_every: int = 1000,
+    ) -> None:
+        self.directory = directory
+        self.table = table
+        self.batch_size = batch_size
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.segment_size = segment_size
+        self.snapshot_every = snapshot_every
+
+        self._buffer = bytearray()
+        self._buffered = 0
+        self._rounds = 0
+        self._last_fsync = time.monotonic()
+        self._snapshotter = Snapshotter()
+
+        directory.mkdir(parents=True, exist_ok=True)
+        segments = list_segments(directory)
+        self._segment = int(segments[-1].stem) if segments else 0
+        self._file: BinaryIO
+        self._open_segment()
+        table.listeners.append(self.record)
+
+    def record(self, event: TableEvent) -> None:
+        """Append an event to the journal.
+
+        :param event: The event
+        """
+        self._append(EVENT_RECORD, encode_event(event))
+
+        if event.type is EventType.SETTLE:
+            self._rounds += 1
+            if self._size() >= self.segment_size:
+                self.flush()
+                self._file.close()
+                self._open_segment()
+            elif self._rounds % self.snapshot_every == 0:
+                self._append(SNAPSHOT, self._snapshotter.snapshot(self.table))
+
+    def flush(self) -> None:
+        """Write the buffered records, and force them to disk if the policy says to."""
+        if self._buffer:
+            self._file.write(self._buffer)
+            self._file.flush()
+            self._buffer.clear()
+            self._buffered = 0
+
+        now = time.monotonic()
+        if self.fsync is FsyncPolicy.BATCH or (
+            self.fsync is FsyncPolicy.INTERVAL and now - self._last_fsync >= self.fsync_interval
+        ):
+            os.fsync(self._file.fileno())
+            self._last_fsync = now
+
+    def close(self) -> None:
+        """Stop journaling the table, and write everything to disk."""
+        if self.record in self.table.listeners:
+            self.table.listeners.remove(self.record)
+
+        self.flush()
+        if self.fsync is not FsyncPolicy.NEVER:
+            os.fsync(self._file.fileno())
+        self._file.close()
+
+    def __enter__(self) -> "Journal":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def _append(self, kind: int, payload: bytes) -> None:
+        self._buffer += RECORD.pack(len(payload), zlib.crc32(payload), kind)
+        self._buffer += payload
+        self._buffered += 1
+        if self._buffered >= self.batch_size:
+            self.flush()
+
+    def _size(self) -> int:
+        return self._file.tell() + len(self._buffer)
+
+    def _open_segment(self) -> None:
+        """Start a new segment, with a snapshot of the table."""
+        self._segment += 1
+        self._file = open(self.directory / f"{self._segment:08d}{SEGMENT_SUFFIX}", "ab")
+        self._append(SNAPSHOT, self._snapshotter.snapshot(self.table))
+
+
+def encode_event(event: TableEvent) -> bytes:
+    """Encode an event as bytes. A settlement's bets aren't encoded, as they follow from
+    the bets and the deal before it.
+
+    :param event: The event
+    :return: The encoded event
+    """
+    header = EVENT.pack(
+        _EVENT_TYPE_CODES[id(event.type)],
+        event.amount,
+        _RESULT_CODES[id(event.result)],
+        len(event.cards),
+    )
+    return header + encode_cards(event.cards) if event.cards else header
+
+
+def decode_event(data: bytes) -> TableEvent:
+    """Decode an event from `encode_event`.
+
+    :param data: The encoded event
+    :return: The event
+    """
+    event_type, amount, result, num_cards = EVENT.unpack_from(data)
+    start = EVENT.size
+    end = start + num_cards
+    return TableEvent(
+        EVENT_TYPES[event_type],
+        amount,
+        None if result == _NO_RESULT else RESULTS[result],
+        tuple(decode_cards(data[start:end])),
+    )
+
+
+def list_segments(directory: Path) -> list[Path]:
+    """The segments of a journal, oldest first."""
+    return sorted(directory.glob(f"*{SEGMENT_SUFFIX}"))
+
+
+def read_segment(path: Path) -> Iterator[tuple[int, bytes]]:
+    """Read the records of a segment, stopping at the first torn or corrupt record.
+
+    :param path: The path of the segment
+    :return: The kind and payload of each record
+    """
+    data = path.read_bytes()
+    offset = 0
+
+    while offset + RECORD.size <= len(data):
+        length, checksum, kind = RECORD.unpack_from(data, offset)
+        start = offset + RECORD.size
+        end = start + length
+        payload = data[start:end]
+        if len(payload) < length or zlib.crc32(payload) != checksum:
+            return
+
+        yield kind, payload
+        offset = start + length
+
+
+def events(directory: Path) -> Iterator[TableEvent]:
+    """Stream every event in a journal, oldest first, e.g. for analytics.
+
+    :param directory: The directory of the journal's segments
+    :return: The events
+    """
+    for path in list_segments(directory):
+        for kind, payload in read_segment(path):
+            if kind == EVENT_RECORD:
+                yield decode_event(payload)
+
+
+def replay(directory: Path) -> BaccaratTable:
+    """Rebuild a table from its journal.
+
+    The table is restored from the latest snapshot, and the events since are replayed
+    on it. Replaying a deal plays the game out, which must give the journaled result.
+
+    :param directory: The directory of the journal's segments
+    :raises ValueError: If the journal has no snapshot, or the replay does not match it
+    :return: The table, as of the last event journaled
+    """
+
+    # Read segments from the newest until one has a snapshot
+    records: list[tuple[int, bytes]] = []
+    for path in reversed(list_segments(directory)):
+        records = list(read_segment(path)) + records
+        snapshots = [i for i, (kind, _) in enumerate(records) if kind == SNAPSHOT]
+        if snapshots:
+            break
+    else:
+        raise ValueError(f"The journal in {directory} has no snapshot")
+
+    latest = snapshots[-1]
+    table = restore(records[latest][1])
+    for kind, payload in records[latest:]:
+        if kind == EVENT_RECORD:
+            apply_event(table, decode_event(payload))
+
+    return table
+
+
+def apply_event(table: BaccaratTable, event: TableEvent) -> None:
+    """Apply a journaled event to a table.
+
+    Draws and settlements follow from the deal, so they are not applied separately.
+
+    :param table: The table
+    :param event: The event
+    :raises ValueError: If a result does not match the table's
+    """
+
+    if event.type is EventType.SEAT:
+        table.seat_player(Player(event.amount))
+    elif event.type is EventType.BET and event.result is not None:
+        table.place_bet(event.amount, event.result)
+    elif event.type is EventType.SHUFFLE:
+        table.shoe.cards = list(event.cards)
+        table.shoe.discards = []
+        table.shoe.shuffles = event.amount
+    elif event.type is EventType.DEAL:
+        table.play()
+    elif event.type is EventType.RESULT and table.last_result is not event.result:
+        raise ValueError(
+            f"The journal's result {event.result} does not match the replay {table.last_result}"
+        )
@@ -0,0 +1,326 @@
+"""
+The house's side of a table: what it took in and paid out on each bet type.
+
+A `HouseLedger` listens to a table and keeps running totals for each bet type, updated
+from the bets and payouts of each settlement, with no per-bet records kept:
+
+- bets: the number of bets
+- handle: the total staked
+- paid: the total paid back to the player, stakes included
+- commission: the commission kept from winning Banker bets
+
+From these, the house's win on a bet type is its handle less what it paid, and its hold
+is the win as a fraction of the handle.
+
+Every `period` rounds, the ledger can also append a summary of the rounds since the
+last one to a file, for reports. Summaries are buffered and written in batches. Each
+summary is a fixed size record (see `PERIOD` and `TOTALS`):
+
+    time        8 bytes     the Unix time the period ended, as a double
+    start       8 bytes     the number of rounds before the period
+    rounds      8 bytes     the number of rounds in the period
+    then for each bet type, in `BetResult` order:
+    bets        8 bytes
+    handle      8 bytes
+    paid        8 bytes
+    commission  8 bytes
+
+To print the summaries in a file:
+
+    python -m baccarat.ledger ledger.bin
+"""
+import argparse
+import struct
+import time
+from array import array
+from collections.abc import Iterable
+from collections.abc import Iterator
+from pathlib import Path
+from types import TracebackType
+from typing import BinaryIO
+from typing import NamedTuple
+
+from .game import BaccaratTable
+from .game import Bet
+from .game import BetResult
+from .game import EventType
+from .game import TableEvent
+
+PERIOD = struct.Struct("<dqq")
+TOTALS = struct.Struct("<qqqq")
+
+RESULTS = tuple(BetResult)
+
+# The index of each total within a bet type's totals
+BETS = 0
+HANDLE = 1
+PAID = 2
+COMMISSION = 3
+NUM_FIELDS = 4
+
+RECORD_SIZE = PERIOD.size + len(RESULTS) * TOTALS.size
+
+# Looked up by identity, as hashing an enum is slow
+_RESULT_INDEX = {id(result): i for i, result in enumerate(RESULTS)}
+
+
+class BetTotals(NamedTuple):
+    """The house's totals for a bet type.
+
+    :param bets: The number of bets
+    :param handle: The total staked
+    :param paid: The total paid back to the player, stakes included
+    :param commission: The commission kept from winning bets
+    """
+
+    bets: int = 0
+    handle: int = 0
+    paid: int = 0
+    commission: int = 0
+
+    @property
+    def win(self) -> int:
+        """The house's win, negative if it lost."""
+        return self.handle - self.paid
+
+    @property
+    def hold(self) -> float:
+        """The house's win as a fraction of the handle."""
+        return self.win / self.handle if self.handle else 0.0
+
+
+class LedgerPeriod(NamedTuple):
+    """A summary of the rounds since the previous one.
+
+    :param time: The Unix time the period ended
+    :param start: The number of rounds before the period
+    :param rounds: The number of rounds in the period
+    :param totals: The house's totals for each bet type over the period
+    """
+
+    time: float
+    start: int
+    rounds: int
+    totals: dict[BetResult, BetTotals]
+
+    @property
+    def total(self) -> BetTotals:
+        """The house's totals over every bet type."""
+        return _sum(self.totals.values())
+
+
+class HouseLedger:
+    """Keep the house's running totals for a table, and optionally summarize them to a file.
+
+    :param table: The table
+    :param path: The file to append the summaries to, or None to keep only the totals
+    :param period: The number of rounds in each summary
+    :param batch_size: The number of summaries to buffer before writing them
+    """
+
+    totals: "array[int]"
+
+    def __init__(
+        self,
+        table: BaccaratTable,
+        path: Path | None = None,
+        period: int = 1000,
+        batch_size: int = 16,
+    ) -> None:
+        self.table = table
+        self.path = path
+        self.period = period
+        self.batch_size = batch_size
+        self.rounds = 0
+
+        # Every bet type's totals, in `BetResult` order
+        self.totals = array("q", [0]) * (len(RESULTS) * NUM_FIELDS)
+        # The totals at the last summary
+        self._summarized = array("q", self.totals)
+        self._summarized_rounds = 0
+
+        self._buffer = bytearray()
+        self._buffered = 0
+        self._file: BinaryIO | None = None
+        if path is not None:
+            self._file = open(path, "ab")
+
+        table.listeners.append(self.record)
+
+    def record(self, event: TableEvent) -> None:
+        """Update the totals with an event from the table.
+
+        :param event: The event
+        """
+        if event.type is EventType.SETTLE and event.result is not None:
+            self.settle(event.settled, event.result)
+
+    def settle(self, settled: Iterable[tuple[Bet, int]], result: BetResult) -> None:
+        """Add a round's settled bets to the totals, and summarize them if a period has
+        passed.
+
+        :param settled: Each bet, with what the table paid on it
+        :param result: The result of the round
+        """
+        totals = self.totals
+        for (amount, bet_type), payout in settled:
+            offset = _RESULT_INDEX[id(bet_type)] * NUM_FIELDS
+            totals[offset + BETS] += 1
+            totals[offset + HANDLE] += amount
+            totals[offset + PAID] += payout
+            if bet_type is result is BetResult.BANKER:
+                # The commission is what an even money payout would have paid on top
+                totals[offset + COMMISSION] += 2 * amount - payout
+
+        self.rounds += 1
+        if self.rounds - self._summarized_rounds >= self.period:
+            self.summarize()
+
+    def bet_totals(self, bet_type: BetResult) -> BetTotals:
+        """The house's totals for a bet type.
+
+        :param bet_type: The bet type
+        :return: The totals
+        """
+        return _bet_totals(self.totals, _RESULT_INDEX[id(bet_type)])
+
+    def report(self) -> dict[BetResult, BetTotals]:
+        """The house's totals for each bet type."""
+        return {result: _bet_totals(self.totals, i) for i, result in enumerate(RESULTS)}
+
+    @property
+    def total(self) -> BetTotals:
+        """The house's totals over every bet type."""
+        return _sum(self.report().values())
+
+    def summarize(self) -> LedgerPeriod:
+        """Summarize the rounds since the last summary, and buffer the summary if there is a
+        file. Called every `period` rounds, but can be called at any time, e.g. at the end
+        of a session.
+
+        :return: The summary
+        """
+        deltas = array("q", (new - old for new, old in zip(self.totals, self._summarized)))
+        summary = LedgerPeriod(
+            time.time(),
+            self._summarized_rounds,
+            self.rounds - self._summarized_rounds,
+            {result: _bet_totals(deltas, i) for i, result in enumerate(RESULTS)},
+        )
+        self._summarized = array("q", self.totals)
+        self._summarized_rounds = self.rounds
+
+        if self._file is not None:
+            self._buffer += PERIOD.pack(summary.time, summary.start, summary.rounds)
+            for i in range(len(RESULTS)):
+                start = i * NUM_FIELDS
+                end = start + NUM_FIELDS
+                self._buffer += TOTALS.pack(*deltas[start:end])
+            self._buffered += 1
+            if self._buffered >= self.batch_size:
+                self.flush()
+
+        return summary
+
+    def flush(self) -> None:
+        """Write the buffered summaries."""
+        if self._file is not None and self._buffer:
+            self._file.write(self._buffer)
+            self._file.flush()
+            self._buffer.clear()
+            self._buffered = 0
+
+    def close(self) -> None:
+        """Stop listening to the table, summarize any rounds since the last summary, and
+        write everything to the file."""
+        if self.record in self.table.listeners:
+            self.table.listeners.remove(self.record)
+
+        if self.rounds > self._summarized_rounds:
+            self.summarize()
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "HouseLedger":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+def read_periods(path: Path) -> Iterator[LedgerPeriod]:
+    """Read the summaries in a ledger file, oldest first. A record torn by a crash ends
+    the file.
+
+    :param path: The file
+    :return: The summaries
+    """
+    with open(path, "rb") as file:
+        while len(record := file.read(RECORD_SIZE)) == RECORD_SIZE:
+            period_time, start, rounds = PERIOD.unpack_from(record)
+            totals = {
+                result: BetTotals(*TOTALS.unpack_from(record, PERIOD.size + i * TOTALS.size))
+                for i, result in enumerate(RESULTS)
+            }
+            yield LedgerPeriod(period_time, start, rounds, totals)
+
+
+def _bet_totals(totals: "array[int]", index: int) -> BetTotals:
+    offset = index * NUM_FIELDS
+    return BetTotals(
+        totals[offset + BETS],
+        totals[offset + HANDLE],
+        totals[offset + PAID],
+        totals[offset + COMMISSION],
+    )
+
+
+def _sum(totals: Iterable[BetTotals]) -> BetTotals:
+    bets = handle = paid = commission = 0
+    for bet_totals in totals:
+        bets += bet_totals.bets
+        handle += bet_totals.handle
+        paid += bet_totals.paid
+        commission += bet_totals.commission
+
+    return BetTotals(bets, handle, paid, commission)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Print the summaries in a ledger file, and their total."""
+    parser = argparse.ArgumentParser(description="Print the summaries in a house ledger file.")
+    parser.add_argument("path", type=Path)
+    args = parser.parse_args(argv)
+
+    header = f"{'Rounds':>16} {'Handle':>12} {'Win':>12} {'Hold':>8} {'Commission':>12}"
+    print(header)
+    grand: list[BetTotals] = []
+    rounds = 0
+    for period in read_periods(args.path):
+        total = period.total
+        grand.append(total)
+        rounds += period.rounds
+        first = f"{period.start + 1:,}-{period.start + period.rounds:,}"
+        print(
+            f"{first:>16} {total.handle:>12,} {total.win:>12,} {total.hold:>8.2%}"
+            f" {total.commission:>12,}"
+        )
+
+    total = _sum(grand)
+    print(
+        f"{'Total':>16} {total.handle:>12,} {total.win:>12,} {total.hold:>8.2%}"
+        f" {total.commission:>12,}"
+    )
+    print(f"{rounds:,} rounds")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,337 @@
+"""
+Run a casino floor of many tables in one process.
+
+A `Lobby` advances every table by one round at a time, in a tight loop: each table's
+strategy places its bets, and the table plays a coup. To keep thousands of tables
+cheap, they:
+
+- share the same 52 card objects, so a shoe is a list of references
+- keep a bounded history of results, and don't log each step of the game
+- take their shoes from a pool, and give them back when their player leaves
+
+The statistics of each table are kept by the lobby in flat lists, indexed by table.
+With `count_rules`, the lobby also counts the paths of the drawing rules taken by every
+coup (see `RuleCounters`), which `metrics` exports with the other statistics.
+
+Memory per table (`memory_per_table`) with 8 deck shoes is about 8 KB, most of it the
+shoe's list of 416 cards. Track it when changing what a table holds.
+"""
+import tracemalloc
+from collections.abc import Callable
+from collections.abc import Iterable
+from typing import Any
+from typing import NamedTuple
+
+from .counters import RuleCounters
+from .game import BaccaratTable
+from .game import BetResult
+from .game import NotEnoughMoneyError
+from .game import PayoutRules
+from .game import Player
+from .game import STANDARD_RULES
+from .game import TableLimitError
+from .utils import Shoe
+
+Strategy = Callable[[BaccaratTable], Iterable[tuple[int, BetResult]]]
+
+RESULTS = tuple(BetResult)
+
+
+def flat_bet(amount: int, result: BetResult = BetResult.BANKER) -> Strategy:
+    """A strategy which bets the same amount on the same bet type every round.
+
+    :param amount: The amount to bet
+    :param result: The bet type
+    :return: The strategy
+    """
+    bets = ((amount, result),)
+    return lambda table: bets
+
+
+def follow_the_shoe(amount: int, first: BetResult = BetResult.BANKER) -> Strategy:
+    """A strategy which bets on whichever of player or banker won the last coup that
+    wasn't a tie.
+
+    :param amount: The amount to bet
+    :param first: The bet type before either has won
+    :return: The strategy
+    """
+
+    def strategy(table: BaccaratTable) -> Iterable[tuple[int, BetResult]]:
+        for result in reversed(table.results):
+            if result is not BetResult.TIE:
+                return ((amount, result),)
+
+        return ((amount, first),)
+
+    return strategy
+
+
+class ShoePool:
+    """A pool of shoes to reuse, rather than building a new one for every table.
+
+    :param num_decks: The number of decks in each shoe
+    """
+
+    def __init__(self, num_decks: int = 8) -> None:
+        self.num_decks = num_decks
+        self._shoes: list[Shoe] = []
+
+    def __len__(self) -> int:
+        return len(self._shoes)
+
+    def take(self) -> Shoe:
+        """Take a freshly shuffled shoe from the pool, or a new one if it is empty."""
+        if self._shoes:
+            shoe = self._shoes.pop()
+            shoe.reset()
+        else:
+            shoe = Shoe(self.num_decks)
+            shoe.shuffle()
+
+        return shoe
+
+    def give(self, shoe: Shoe) -> None:
+        """Give a shoe back to the pool.
+
+        :param shoe: The shoe, with the same number of decks as the pool
+        :raises ValueError: If the shoe has a different number of decks
+        """
+        if shoe.num_decks != self.num_decks:
+            raise ValueError(f"The pool only holds shoes of {self.num_decks} decks")
+
+        self._shoes.append(shoe)
+
+
+class TableStats(NamedTuple):
+    """The statistics of a table, or of every table together.
+
+    :param rounds: The number of rounds played
+    :param result_counts: The number of times each bet type won
+    :param wagered: The total amount bet
+    :param won: The total amount won by the players, net of their losses
+    """
+
+    rounds: int
+    result_counts: dict[BetResult, int]
+    wagered: int
+    won: int
+
+    @property
+    def house_edge(self) -> float:
+        """The house's share of the total amount bet."""
+        return -self.won / self.wagered if self.wagered else 0.0
+
+
+class Lobby:
+    """Many tables, played one round at a time.
+
+    :param num_decks: The number of decks in each shoe
+    :param penetration: The fraction of each shoe dealt before it is reshuffled
+    :param rules: The payout rules of every table
+    :param history: The fewest recent results each table keeps
+    :param count_rules: Whether to count the paths of the drawing rules taken
+    """
+
+    tables: list[BaccaratTable]
+    strategies: list[Strategy]
+    active: list[bool]
+    rule_counters: RuleCounters | None
+
+    def __init__(
+        self,
+        num_decks: int = 8,
+        penetration: float = 0.8,
+        rules: PayoutRules = STANDARD_RULES,
+        history: int = 100,
+        count_rules: bool = False,
+    ) -> None:
+        self.rules = rules
+        self.history = history
+        self.rule_counters = RuleCounters() if count_rules else None
+        self.pool = ShoePool(num_decks)
+        self._cut = max(6, round(52 * num_decks * (1 - penetration)))
+
+        self.tables = []
+        self.strategies = []
+        self.active = []
+
+        self._rounds: list[int] = []
+        self._wagered: list[int] = []
+        self._won: list[int] = []
+        # The number of times each result won at table i is at [3 * i + result index]
+        self._result_counts: list[int] = []
+
+    def __len__(self) -> int:
+        return len(self.tables)
+
+    def add_table(self, player: Player, strategy: Strategy) -> int:
+        """Open a table with a player seated at it.
+
+        :param player: The player
+        :param strategy: The bets the player places each round
+        :return: The index of the table
+        """
+        table = BaccaratTable(
+            rules=self.rules, shoe=self.pool.take(), verbose=False, history=self.history
+        )
+        table.seat_player(player)
+
+        self.tables.append(table)
+        self.strategies.append(strategy)
+        self.active.append(True)
+        self._rounds.append(0)
+        self._wagered.append(0)
+        self._won.append(0)
+        self._result_counts.extend([0] * len(RESULTS))
+
+        return len(self.tables) - 1
+
+    def close_table(self, index: int) -> None:
+        """Close a table, giving its shoe back to the pool. Its statistics are kept.
+
+        The table no longer holds the shoe, so the shoe is only ever at one table.
+
+        :param index: The index of the table
+        """
+        if self.active[index]:
+            self.active[index] = False
+            self.pool.give(self.tables[index].close())
+
+    def play_round(self) -> int:
+        """Play one round at every open table.
+
+        A table sits out the round if its strategy places no bets, and is closed if its
+        player can't afford the bets or they break the table's limits.
+
+        :return: The number of tables which played
+        """
+        cut = self._cut
+        rule_counters = self.rule_counters
+        result_index = {result: i for i, result in enumerate(RESULTS)}
+        played = 0
+
+        for i, table in enumerate(self.tables):
+            if not self.active[i]:
+                continue
+
+            bets = list(self.strategies[i](table))
+            if not bets:
+                continue
+
+            player = table.player
+            if player is None:
+                raise ValueError("Player is not set")
+
+            bankroll = player.bankroll
+
+            try:
+                table.place_bets(bets)
+            except (NotEnoughMoneyError, TableLimitError):
+                self.close_table(i)
+                continue
+
+            if table.shoe.num_cards < cut:
+                table.shoe.reset()
+
+            table.play()
+            if rule_counters is not None:
+                player_hand = table.player_hand
+                banker_hand = table.banker_hand
+                if player_hand is not None and banker_hand is not None:
+                    rule_counters.add(player_hand.cards, banker_hand.cards)
+
+            self._rounds[i] += 1
+            self._wagered[i] += sum(amount for amount, _ in bets)
+            self._won[i] += player.bankroll - bankroll
+            self._result_counts[3 * i + result_index[table.results[-1]]] += 1
+            played += 1
+
+        return played
+
+    def run(self, rounds: int) -> int:
+        """Play a number of rounds, stopping early if every table sits out.
+
+        :param rounds: The most rounds to play
+        :return: The number of rounds played
+        """
+        for played in range(rounds):
+            if self.play_round() == 0:
+                return played
+
+        return rounds
+
+    def table_stats(self, index: int) -> TableStats:
+        """The statistics of a table.
+
+        :param index: The index of the table
+        :return: The statistics
+        """
+        start = len(RESULTS) * index
+        end = start + len(RESULTS)
+        counts = self._result_counts[start:end]
+        return TableStats(
+            self._rounds[index],
+            dict(zip(RESULTS, counts)),
+            self._wagered[index],
+            self._won[index],
+        )
+
+    def stats(self) -> TableStats:
+        """The statistics of every table together."""
+        step = len(RESULTS)
+        return TableStats(
+            sum(self._rounds),
+            {result: sum(self._result_counts[i::step]) for i, result in enumerate(RESULTS)},
+            sum(self._wagered),
+            sum(self._won),
+        )
+
+    def metrics(self) -> dict[str, Any]:
+        """The statistics of every table together, as JSON-compatible data.
+
+        :return: The statistics, and the rule counts if the lobby counts them
+        """
+        stats = self.stats()
+        metrics: dict[str, Any] = {
+            "tables": len(self.tables),
+            "rounds": stats.rounds,
+            "results": {result.value: count for result, count in stats.result_counts.items()},
+            "wagered": stats.wagered,
+            "won": stats.won,
+            "house_edge": stats.house_edge,
+        }
+        if self.rule_counters is not None:
+            metrics["rules"] = self.rule_counters.to_dict()
+
+        return metrics
+
+
+def memory_per_table(num_tables: int = 1000, rounds: int = 100, num_decks: int = 8) -> float:
+    """Measure the memory used by each table of a lobby, in bytes.
+
+    Every table is played for some rounds first, so its shoe's discards and its history
+    are full.
+
+    :param num_tables: The number of tables to measure
+    :param rounds: The number of rounds to play
+    :param num_decks: The number of decks in each shoe
+    :return: The memory per table
+    """
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+
+    before = tracemalloc.get_traced_memory()[0]
+    lobby = Lobby(num_decks)
+    strategy = flat_bet(1)
+    for _ in range(num_tables):
+        lobby.add_table(Player(10 * rounds), strategy)
+
+    lobby.run(rounds)
+    used = tracemalloc.get_traced_memory()[0] - before
+
+    if not tracing:
+        tracemalloc.stop()
+
+    return used / num_tables
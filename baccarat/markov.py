@@ -0,0 +1,292 @@
+"""
+The odds of reaching a bankroll goal before going bust.
+
+Betting a fixed stake on the same bet type every coup is a random walk over the
+player's bankroll. Treating each coup as independent, with the result probabilities
+of a full shoe, that walk is an absorbing Markov chain: the player stops when the
+bankroll reaches the goal, or is too small to cover the stake.
+The chain is solved with sparse Gaussian elimination, instead of playing it out.
+
+The result probabilities are exact fractions, but the chain is solved in floating point:
+exact fractions grow too large to eliminate a chain of a few hundred bankrolls in good
+time. The odds are as accurate as floating point rounding allows, not exact.
+"""
+from collections import defaultdict
+from fractions import Fraction
+from typing import NamedTuple
+
+from .game import Bet
+from .game import BetResult
+from .game import deal_coup
+from .game import PayoutRules
+from .game import settle_bet
+from .game import STANDARD_RULES
+from .odds import result_probabilities
+from .odds import shoe_counts
+from .utils import Shoe
+
+
+class GoalChain(NamedTuple):
+    """An absorbing Markov chain over a player's bankroll.
+
+    :param states: The reachable bankrolls, in increasing order
+    :param transitions: The sparse rows of the transition matrix, mapping the index
+        of the next state to its probability. Absorbing states only lead to themselves.
+    :param stake: The stake of every bet
+    :param goal: The bankroll at which the player stops
+    """
+
+    states: tuple[int, ...]
+    transitions: tuple[dict[int, float], ...]
+    stake: int
+    goal: int
+
+    def is_absorbing(self, bankroll: int) -> bool:
+        """Whether the player stops playing with the given bankroll."""
+        return bankroll < self.stake or bankroll >= self.goal
+
+
+class GoalSolution(NamedTuple):
+    """The odds of reaching a bankroll goal.
+
+    :param goal_probability: The probability of reaching the goal
+    :param ruin_probability: The probability of going bust first
+    :param expected_games: The expected number of games played
+    """
+
+    goal_probability: float
+    ruin_probability: float
+    expected_games: float
+
+
+def step_distribution(
+    bet_type: BetResult,
+    stake: int,
+    rules: PayoutRules = STANDARD_RULES,
+    num_decks: int = 8,
+) -> dict[int, Fraction]:
+    """The exact distribution of the change in bankroll from a single bet.
+
+    :param bet_type: The bet type
+    :param stake: The stake of the bet
+    :param rules: The payout rules of the table
+    :param num_decks: The number of decks in the shoe
+    :return: The probability of each change in bankroll
+    """
+
+    steps: defaultdict[int, Fraction] = defaultdict(Fraction)
+    for result, probability in result_probabilities(shoe_counts(num_decks)).items():
+        payout = settle_bet(Bet(stake, bet_type), result, rules)
+        steps[payout - stake] += probability
+
+    return dict(steps)
+
+
+def build_goal_chain(
+    bet_type: BetResult,
+    stake: int,
+    bankroll: int,
+    goal: int,
+    rules: PayoutRules = STANDARD_RULES,
+    num_decks: int = 8,
+) -> GoalChain:
+    """Build the Markov chain of a player betting a fixed stake until they reach a goal.
+
+    Only the bankrolls reachable from the starting bankroll are included.
+
+    :param bet_type: The bet type
+    :param stake: The stake of every bet
+    :param bankroll: The starting bankroll
+    :param goal: The bankroll at which the player stops
+    :param rules: The payout rules of the table
+    :param num_decks: The number of decks in the shoe
+    :raises ValueError: If the stake is not positive
+    :return: The Markov chain
+    """
+
+    if stake <= 0:
+        raise ValueError("The stake must be positive")
+
+    steps = step_distribution(bet_type, stake, rules, num_decks)
+    chain = GoalChain((), (), stake, goal)
+
+    reachable = {bankroll}
+    frontier = [bankroll]
+    while frontier:
+        state = frontier.pop()
+        if chain.is_absorbing(state):
+            continue
+
+        for step in steps:
+            if state + step not in reachable:
+                reachable.add(state + step)
+                frontier.append(state + step)
+
+    states = tuple(sorted(reachable))
+    index = {state: i for i, state in enumerate(states)}
+
+    transitions = []
+    for state in states:
+        if chain.is_absorbing(state):
+            transitions.append({index[state]: 1.0})
+        else:
+            transitions.append(
+                {index[state + step]: float(p) for step, p in steps.items() if p > 0}
+            )
+
+    return chain._replace(states=states, transitions=tuple(transitions))
+
+
+def solve_goal_chain(chain: GoalChain) -> dict[int, GoalSolution]:
+    """Solve a goal chain for every bankroll the player can still play with.
+
+    :param chain: The Markov chain
+    :return: The odds of reaching the goal from each non-absorbing bankroll
+    """
+
+    transient = [i for i, state in enumerate(chain.states) if not chain.is_absorbing(state)]
+    position = {state_index: i for i, state_index in enumerate(transient)}
+
+    # Solve (I - Q) x = b, where Q holds the moves between transient states. The
+    # right-hand sides are the one-step probability of reaching the goal, and 1 for
+    # the expected number of games.
+    rows: list[dict[int, float]] = []
+    rhs: list[list[float]] = []
+    for state_index in transient:
+        row = {position[state_index]: 1.0}
+        to_goal = 0.0
+
+        for next_index, probability in chain.transitions[state_index].items():
+            if next_index in position:
+                column = position[next_index]
+                row[column] = row.get(column, 0.0) - probability
+            elif chain.states[next_index] >= chain.goal:
+                to_goal += probability
+
+        rows.append(row)
+        rhs.append([to_goal, 1.0])
+
+    solution = _solve_sparse(rows, rhs)
+
+    return {
+        chain.states[state_index]: GoalSolution(
+            solution[i][0], 1.0 - solution[i][0], solution[i][1]
+        )
+        for i, state_index in enumerate(transient)
+    }
+
+
+def solve_goal(
+    bet_type: BetResult,
+    stake: int,
+    bankroll: int,
+    goal: int,
+    rules: PayoutRules = STANDARD_RULES,
+    num_decks: int = 8,
+) -> GoalSolution:
+    """The odds of reaching a bankroll goal by betting a fixed stake, solved from its
+    Markov chain.
+
+    :param bet_type: The bet type
+    :param stake: The stake of every bet
+    :param bankroll: The starting bankroll
+    :param goal: The bankroll at which the player stops
+    :param rules: The payout rules of the table
+    :param num_decks: The number of decks in the shoe
+    :return: The odds of reaching the goal
+    """
+
+    chain = build_goal_chain(bet_type, stake, bankroll, goal, rules, num_decks)
+    if chain.is_absorbing(bankroll):
+        reached = 1.0 if bankroll >= goal else 0.0
+        return GoalSolution(reached, 1.0 - reached, 0.0)
+
+    return solve_goal_chain(chain)[bankroll]
+
+
+def simulate_goal(
+    bet_type: BetResult,
+    stake: int,
+    bankroll: int,
+    goal: int,
+    rules: PayoutRules = STANDARD_RULES,
+    num_decks: int = 8,
+    trials: int = 1000,
+) -> GoalSolution:
+    """Estimate the odds of reaching a bankroll goal by playing it out.
+
+    Each trial plays from a freshly shuffled shoe, which is reset when it runs low,
+    as at the table. Use it to cross-check `solve_goal`.
+
+    :param bet_type: The bet type
+    :param stake: The stake of every bet
+    :param bankroll: The starting bankroll
+    :param goal: The bankroll at which the player stops
+    :param rules: The payout rules of the table
+    :param num_decks: The number of decks in the shoe
+    :param trials: The number of sessions to play
+    :return: The estimated odds of reaching the goal
+    """
+
+    reached = 0
+    games = 0
+    for _ in range(trials):
+        shoe = Shoe(num_decks)
+        shoe.shuffle()
+        money = bankroll
+
+        while stake <= money < goal:
+            if shoe.num_cards < 6:
+                shoe.reset()
+
+            result = deal_coup(shoe).result
+            money += settle_bet(Bet(stake, bet_type), result, rules) - stake
+            games += 1
+
+        reached += money >= goal
+
+    return GoalSolution(reached / trials, 1 - reached / trials, games / trials)
+
+
+def _solve_sparse(rows: list[dict[int, float]], rhs: list[list[float]]) -> list[list[float]]:
+    """Solve a sparse linear system by Gaussian elimination.
+
+    The rows are modified in place. No pivoting is done, which is stable here as
+    I - Q is diagonally dominant.
+    """
+
+    size = len(rows)
+    column_rows: list[set[int]] = [set() for _ in range(size)]
+    for i, row in enumerate(rows):
+        for j in row:
+            column_rows[j].add(i)
+
+    for k in range(size):
+        pivot_row = rows[k]
+        pivot = pivot_row[k]
+
+        for i in column_rows[k]:
+            if i <= k:
+                continue
+
+            row = rows[i]
+            factor = row.pop(k) / pivot
+            for j, value in pivot_row.items():
+                if j != k:
+                    row[j] = row.get(j, 0.0) - factor * value
+                    column_rows[j].add(i)
+
+            for r in range(len(rhs[i])):
+                rhs[i][r] -= factor * rhs[k][r]
+
+    solution = [[0.0] * len(rhs[0]) for _ in range(size)]
+    for k in reversed(range(size)):
+        row = rows[k]
+        for r in range(len(rhs[k])):
+            total = rhs[k][r]
+            for j, value in row.items():
+                if j > k:
+                    total -= value * solution[j][r]
+            solution[k][r] = total / row[k]
+
+    return solution
@@ -0,0 +1,318 @@
+"""
+Watch simulations running in other processes, through a block of shared memory.
+
+Each worker process owns a slot of the block and writes its running totals into it,
+so the workers never wait on a lock, a pipe or each other, and a monitor reads every
+slot as often as it likes. The block is:
+
+    header  16 bytes
+        magic       4 bytes     b"BMON"
+        version     uint32      1
+        slots       uint32      the number of slots
+        padding     4 bytes
+
+    slots   `SLOT.size` (160) bytes each, every field little endian
+        sequence    uint64      odd while the worker is writing the slot
+        coups       int64       the number of coups played
+        results     3 x int64   the number of player, banker and tie wins
+        wagered     int64       the total staked
+        profit      float64     the sum of the profit of each coup
+        squares     float64     the sum of the square of the profit of each coup
+        started     float64     when the worker started, in seconds since the epoch
+        updated     float64     when the slot was last written
+        totals      10 x int64  the number of coups won with each total, 0 to 9
+
+A worker only writes its slot every so many coups (`MonitorWriter.publish`), so the
+cost to the worker is a few microseconds per batch. A reader retries a slot whose
+sequence was odd or changed while reading it, so it never sees a torn write.
+
+    memory = create_monitor(4)
+    # in each worker
+    run_worker(memory.name, slot, coups)
+    # in the monitor
+    monitor = Monitor(memory.name)
+    monitor.total().coups_per_second
+"""
+import math
+import struct
+import time
+from collections.abc import Sequence
+from multiprocessing.shared_memory import SharedMemory
+from typing import NamedTuple
+
+from .game import BaccaratTable
+from .game import BetResult
+from .game import Coup
+from .game import Player
+
+MAGIC = b"BMON"
+VERSION = 1
+HEADER = struct.Struct("<4sII4x")
+NUM_TOTALS = 10
+SLOT = struct.Struct(f"<Qq3qqdddd{NUM_TOTALS}q")
+
+RESULTS = (BetResult.PLAYER, BetResult.BANKER, BetResult.TIE)
+
+# Looked up by identity, as hashing an enum is slow
+_RESULT_INDEXES = {id(result): i for i, result in enumerate(RESULTS)}
+# A slot still being written after this many reads belongs to a worker that died
+_READ_ATTEMPTS = 10_000
+
+
+class MonitorError(Exception):
+    """Raised when a block of shared memory isn't a monitor, or has no such slot."""
+
+
+class SlotStats(NamedTuple):
+    """The running totals of a worker, or of several together.
+
+    :param coups: The number of coups played
+    :param result_counts: The number of times each bet type won
+    :param wagered: The total staked
+    :param profit: The sum of the profit of each coup
+    :param squares: The sum of the square of the profit of each coup
+    :param started: When the worker started, in seconds since the epoch
+    :param updated: When the totals were last written
+    :param totals: The number of coups won with each total, 0 to 9
+    """
+
+    coups: int
+    result_counts: dict[BetResult, int]
+    wagered: int
+    profit: float
+    squares: float
+    started: float
+    updated: float
+    totals: tuple[int, ...]
+
+    @property
+    def coups_per_second(self) -> float:
+        """The number of coups played per second, up to the last write."""
+        elapsed = self.updated - self.started
+        return self.coups / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def house_edge(self) -> float:
+        """The fraction of the amount staked which was lost."""
+        return -self.profit / self.wagered if self.wagered else 0.0
+
+    @property
+    def standard_error(self) -> float:
+        """The standard error of the house edge."""
+        if self.coups < 2 or not self.wagered:
+            return 0.0
+
+        mean = self.profit / self.coups
+        variance = max(self.squares / self.coups - mean * mean, 0.0)
+        stake = self.wagered / self.coups
+        return math.sqrt(variance / self.coups) / stake
+
+    @classmethod
+    def combine(cls, stats: Sequence["SlotStats"]) -> "SlotStats":
+        """Add up the totals of several workers.
+
+        :param stats: The totals of each worker
+        :return: The totals of every worker together
+        """
+        return cls(
+            sum(slot.coups for slot in stats),
+            {result: sum(slot.result_counts[result] for slot in stats) for result in RESULTS},
+            sum(slot.wagered for slot in stats),
+            sum(slot.profit for slot in stats),
+            sum(slot.squares for slot in stats),
+            min((slot.started for slot in stats), default=0.0),
+            max((slot.updated for slot in stats), default=0.0),
+            tuple(sum(slot.totals[i] for slot in stats) for i in range(NUM_TOTALS)),
+        )
+
+
+def create_monitor(slots: int) -> SharedMemory:
+    """Create a block of shared memory for some workers to write to.
+
+    New shared memory is zeroed, so every slot starts unwritten. The creator should
+    `close` and `unlink` the block once every process is done with it.
+
+    :param slots: The number of workers
+    :return: The block, which the workers and monitors attach to by its `name`
+    """
+    memory = SharedMemory(create=True, size=HEADER.size + slots * SLOT.size)
+    HEADER.pack_into(_buffer(memory), 0, MAGIC, VERSION, slots)
+    return memory
+
+
+def _buffer(memory: SharedMemory) -> memoryview:
+    buffer = memory.buf
+    if buffer is None:
+        raise MonitorError(f"{memory.name} is closed")
+
+    return buffer
+
+
+def _attach(name: str) -> tuple[SharedMemory, int]:
+    memory = SharedMemory(name)
+    magic, version, slots = HEADER.unpack_from(_buffer(memory), 0)
+    if magic != MAGIC or version != VERSION:
+        memory.close()
+        raise MonitorError(f"{name} is not a version {VERSION} monitor")
+
+    return memory, slots
+
+
+class MonitorWriter:
+    """A worker's running totals, written to its slot of a monitor.
+
+    :param name: The name of the block of shared memory
+    :param slot: The worker's slot
+    :raises MonitorError: If the block isn't a monitor, or has no such slot
+    """
+
+    def __init__(self, name: str, slot: int) -> None:
+        self._memory, slots = _attach(name)
+        if not 0 <= slot < slots:
+            self._memory.close()
+            raise MonitorError(f"The monitor has no slot {slot}")
+
+        self._offset = HEADER.size + slot * SLOT.size
+        self._sequence = 0
+        self.coups = 0
+        self.result_counts = [0] * len(RESULTS)
+        self.wagered = 0
+        self.profit = 0.0
+        self.squares = 0.0
+        self.started = time.time()
+        self.totals = [0] * NUM_TOTALS
+
+    def add(self, coup: Coup, wagered: int = 0, profit: float = 0) -> None:
+        """Count a coup. It isn't visible to monitors until the next `publish`.
+
+        :param coup: The coup
+        :param wagered: The amount staked on the coup
+        :param profit: The profit (or loss, if negative) of the coup
+        """
+        self.coups += 1
+        self.result_counts[_RESULT_INDEXES[id(coup.result)]] += 1
+        self.wagered += wagered
+        self.profit += profit
+        self.squares += profit * profit
+        self.totals[max(coup.player_total, coup.banker_total)] += 1
+
+    def publish(self) -> None:
+        """Write the running totals to the worker's slot."""
+        buffer = _buffer(self._memory)
+        offset = self._offset
+
+        # The sequence is odd while the slot is being written
+        self._sequence += 1
+        struct.pack_into("<Q", buffer, offset, self._sequence)
+        SLOT.pack_into(
+            buffer,
+            offset,
+            self._sequence,
+            self.coups,
+            *self.result_counts,
+            self.wagered,
+            self.profit,
+            self.squares,
+            self.started,
+            time.time(),
+            *self.totals,
+        )
+        self._sequence += 1
+        struct.pack_into("<Q", buffer, offset, self._sequence)
+
+    def close(self) -> None:
+        """Publish the final totals, and detach from the shared memory."""
+        self.publish()
+        self._memory.close()
+
+
+class Monitor:
+    """Reads the running totals of every worker.
+
+    :param name: The name of the block of shared memory
+    :raises MonitorError: If the block isn't a monitor
+    """
+
+    slots: int
+
+    def __init__(self, name: str) -> None:
+        self._memory, self.slots = _attach(name)
+
+    def read_slot(self, slot: int) -> SlotStats | None:
+        """The totals of a worker, as of its last write.
+
+        :param slot: The worker's slot
+        :raises MonitorError: If the slot is never consistent, as its worker died writing it
+        :return: The totals, or None if the worker hasn't written any yet
+        """
+        buffer = _buffer(self._memory)
+        offset = HEADER.size + slot * SLOT.size
+        for _ in range(_READ_ATTEMPTS):
+            fields = SLOT.unpack_from(buffer, offset)
+            sequence = fields[0]
+            if sequence % 2 == 0 and struct.unpack_from("<Q", buffer, offset)[0] == sequence:
+                break
+        else:
+            raise MonitorError(f"Slot {slot} is still being written")
+
+        if sequence == 0:
+            return None
+
+        return SlotStats(
+            fields[1],
+            dict(zip(RESULTS, fields[2:5])),
+            fields[5],
+            fields[6],
+            fields[7],
+            fields[8],
+            fields[9],
+            fields[10:],
+        )
+
+    def read(self) -> list[SlotStats | None]:
+        """The totals of every worker, as of their last writes."""
+        return [self.read_slot(slot) for slot in range(self.slots)]
+
+    def total(self) -> SlotStats:
+        """The totals of every worker together."""
+        return SlotStats.combine([stats for stats in self.read() if stats is not None])
+
+    def close(self) -> None:
+        """Detach from the shared memory."""
+        self._memory.close()
+
+
+def run_worker(
+    name: str,
+    slot: int,
+    coups: int,
+    bet: BetResult = BetResult.BANKER,
+    stake: int = 100,
+    num_decks: int = 8,
+    publish_every: int = 10_000,
+) -> None:
+    """Play flat bets at a table, writing the running totals to a monitor.
+
+    :param name: The name of the monitor's block of shared memory
+    :param slot: The worker's slot
+    :param coups: The number of coups to play
+    :param bet: The bet type to back every coup
+    :param stake: The stake of every bet
+    :param num_decks: The number of decks in the shoe
+    :param publish_every: The number of coups between writes to the slot
+    """
+    writer = MonitorWriter(name, slot)
+    player = Player(stake * (coups + 1))
+    table = BaccaratTable(num_decks, verbose=False)
+    table.seat_player(player)
+    bets = [(stake, bet)]
+
+    try:
+        bankroll = player.bankroll
+        for coup in table.iter_coups(coups, lambda coup: bets):
+            writer.add(coup, stake, player.bankroll - bankroll)
+            bankroll = player.bankroll
+            if writer.coups % publish_every == 0:
+                writer.publish()
+    finally:
+        writer.close()
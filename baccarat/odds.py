@@ -0,0 +1,331 @@
+"""
+Exact odds of a coup of baccarat, computed from the composition of the shoe.
+
+Baccarat only cares about the value of each card, so a shoe is described by its
+composition: a tuple of 10 counts, the number of cards of each baccarat value 0-9.
+Every way the six (or fewer) cards of a coup can come out of the shoe is enumerated
+with exact integer weights, so the probabilities are exact fractions.
+
+An `OddsWorker` computes the odds on a background thread, so a GUI can show them for
+the shoe in play without waiting on the math.
+"""
+import functools
+import logging
+import queue
+import threading
+from collections import defaultdict
+from collections.abc import Mapping
+from fractions import Fraction
+from itertools import chain
+from typing import NamedTuple
+
+from .game import BetResult
+from .game import does_banker_draw
+from .game import does_player_draw
+from .game import get_baccarat_value
+from .game import Outcome
+from .game import PayoutRules
+from .game import STANDARD_RULES
+from .utils import Shoe
+
+logger = logging.getLogger(__name__)
+
+NUM_VALUES = 10
+
+
+def shoe_counts(num_decks: int) -> tuple[int, ...]:
+    """The composition of a full shoe.
+
+    :param num_decks: The number of decks in the shoe
+    :return: The number of cards of each baccarat value
+    """
+    return (16 * num_decks,) + (4 * num_decks,) * (NUM_VALUES - 1)
+
+
+def remaining_counts(shoe: Shoe) -> tuple[int, ...]:
+    """The composition of the cards remaining in a shoe.
+
+    :param shoe: The shoe of cards
+    :return: The number of cards of each baccarat value
+    """
+    counts = [0] * NUM_VALUES
+    for card in shoe.cards:
+        counts[get_baccarat_value(card)] += 1
+
+    return tuple(counts)
+
+
+def next_coup_counts(shoe: Shoe) -> tuple[int, ...]:
+    """The composition of the cards the next coup is dealt from. A table reshuffles a
+    shoe with fewer than 6 cards before dealing, so that's the whole shoe.
+
+    :param shoe: The shoe of cards
+    :return: The number of cards of each baccarat value
+    """
+    if shoe.num_cards >= 6:
+        return remaining_counts(shoe)
+
+    counts = [0] * NUM_VALUES
+    for card in chain(shoe.cards, shoe.discards):
+        counts[get_baccarat_value(card)] += 1
+
+    return tuple(counts)
+
+
+@functools.lru_cache(maxsize=1024)
+def outcome_probabilities(counts: tuple[int, ...]) -> Mapping[Outcome, Fraction]:
+    """The exact probability of every outcome of the next coup.
+
+    Results are cached by composition, so repeated calls are instant.
+    The returned mapping is shared between calls and must not be modified.
+
+    :param counts: The number of cards of each baccarat value in the shoe
+    :raises ValueError: If the shoe holds fewer than 6 cards
+    :return: The probability of each outcome
+    """
+
+    num_cards = sum(counts)
+    if len(counts) != NUM_VALUES or num_cards < 6:
+        raise ValueError("A coup needs a shoe of at least 6 cards")
+
+    # Every sequence of cards is weighted over the same denominator, the number of
+    # ordered ways to deal 6 cards; coups using fewer cards are scaled up to match.
+    four_card_scale = (num_cards - 4) * (num_cards - 5)
+    five_card_scale = num_cards - 5
+
+    cards = list(counts)
+    weights: defaultdict[Outcome, int] = defaultdict(int)
+
+    # The order of a hand's first two cards does not matter, so each unordered pair
+    # is visited once and weighted by the number of ways it can be dealt.
+    for p1 in range(NUM_VALUES):
+        for p2 in range(p1, NUM_VALUES):
+            player_weight = cards[p1] * (cards[p2] - (p1 == p2)) * (1 if p1 == p2 else 2)
+            if player_weight <= 0:
+                continue
+
+            cards[p1] -= 1
+            cards[p2] -= 1
+            player_total = (p1 + p2) % 10
+
+            for b1 in range(NUM_VALUES):
+                for b2 in range(b1, NUM_VALUES):
+                    banker_weight = cards[b1] * (cards[b2] - (b1 == b2)) * (1 if b1 == b2 else 2)
+                    if banker_weight <= 0:
+                        continue
+
+                    cards[b1] -= 1
+                    cards[b2] -= 1
+                    _add_draws(
+                        weights,
+                        cards,
+                        player_weight * banker_weight,
+                        player_total,
+                        (b1 + b2) % 10,
+                        four_card_scale,
+                        five_card_scale,
+                    )
+                    cards[b1] += 1
+                    cards[b2] += 1
+
+            cards[p1] += 1
+            cards[p2] += 1
+
+    denominator = four_card_scale * num_cards * (num_cards - 1) * (num_cards - 2) * (num_cards - 3)
+    return {outcome: Fraction(weight, denominator) for outcome, weight in weights.items()}
+
+
+def _add_draws(
+    weights: defaultdict[Outcome, int],
+    cards: list[int],
+    weight: int,
+    player_total: int,
+    banker_total: int,
+    four_card_scale: int,
+    five_card_scale: int,
+) -> None:
+    """Add the weight of every way the third cards can be drawn after the first four."""
+
+    if player_total >= 8 or banker_total >= 8:
+        weights[Outcome(player_total, banker_total, False, False)] += weight * four_card_scale
+        return
+
+    if not does_player_draw(player_total):
+        if not does_banker_draw(banker_total, None):
+            weights[Outcome(player_total, banker_total, False, False)] += weight * four_card_scale
+            return
+
+        for b3 in range(NUM_VALUES):
+            if cards[b3]:
+                outcome = Outcome(player_total, (banker_total + b3) % 10, False, True)
+                weights[outcome] += weight * cards[b3] * five_card_scale
+        return
+
+    for p3 in range(NUM_VALUES):
+        p3_weight = weight * cards[p3]
+        if not p3_weight:
+            continue
+
+        new_player_total = (player_total + p3) % 10
+
+        if not does_banker_draw(banker_total, p3):
+            outcome = Outcome(new_player_total, banker_total, True, False)
+            weights[outcome] += p3_weight * five_card_scale
+            continue
+
+        cards[p3] -= 1
+        for b3 in range(NUM_VALUES):
+            if cards[b3]:
+                outcome = Outcome(new_player_total, (banker_total + b3) % 10, True, True)
+                weights[outcome] += p3_weight * cards[b3]
+        cards[p3] += 1
+
+
+def result_probabilities(counts: tuple[int, ...]) -> dict[BetResult, Fraction]:
+    """The exact probability of each result of the next coup.
+
+    :param counts: The number of cards of each baccarat value in the shoe
+    :return: The probability of each result
+    """
+    probabilities = {result: Fraction(0) for result in BetResult}
+    for outcome, probability in outcome_probabilities(counts).items():
+        probabilities[outcome.result] += probability
+
+    return probabilities
+
+
+def expected_value(
+    bet_type: BetResult, counts: tuple[int, ...], rules: PayoutRules = STANDARD_RULES
+) -> Fraction:
+    """The exact expected net win of a bet, per unit staked.
+
+    The house edge of the bet is the negative of this value.
+
+    :param bet_type: The bet type
+    :param counts: The number of cards of each baccarat value in the shoe
+    :param rules: The payout rules of the table
+    :return: The expected net win per unit staked
+    """
+    return sum(
+        (
+            probability * rules.net_odds(bet_type, result)
+            for result, probability in result_probabilities(counts).items()
+        ),
+        Fraction(0),
+    )
+
+
+class OddsReport(NamedTuple):
+    """The exact odds of the next coup.
+
+    :param counts: The number of cards of each baccarat value in the shoe
+    :param probabilities: The probability of each result
+    :param expected_values: The expected net win of each bet type, per unit staked
+    """
+
+    counts: tuple[int, ...]
+    probabilities: dict[BetResult, Fraction]
+    expected_values: dict[BetResult, Fraction]
+
+
+@functools.lru_cache(maxsize=1024)
+def odds_report(counts: tuple[int, ...], rules: PayoutRules = STANDARD_RULES) -> OddsReport:
+    """The exact odds of the next coup, cached by composition.
+
+    :param counts: The number of cards of each baccarat value in the shoe
+    :param rules: The payout rules of the table
+    :return: The odds
+    """
+    return OddsReport(
+        counts,
+        result_probabilities(counts),
+        {bet_type: expected_value(bet_type, counts, rules) for bet_type in BetResult},
+    )
+
+
+class OddsWorker:
+    """Computes the odds of compositions on a background thread.
+
+    Compositions are submitted to `requests`, and their reports are put on `results`.
+    If several compositions are waiting, only the latest is computed, so the worker
+    never falls behind the shoe. A composition whose odds can't be computed (e.g. one
+    with fewer than 6 cards) is logged and put on `errors`, and the worker carries on.
+
+    :param rules: The payout rules of the table
+    """
+
+    requests: "queue.Queue[tuple[int, ...] | None]"
+    results: "queue.Queue[OddsReport]"
+    errors: "queue.Queue[tuple[tuple[int, ...], Exception]]"
+
+    def __init__(self, rules: PayoutRules = STANDARD_RULES) -> None:
+        self.rules = rules
+        self.requests = queue.Queue()
+        self.results = queue.Queue()
+        self.errors = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="odds", daemon=True)
+
+    def start(self) -> None:
+        """Start the thread."""
+        self._thread.start()
+
+    def submit(self, counts: tuple[int, ...]) -> None:
+        """Ask for the odds of a composition.
+
+        :param counts: The number of cards of each baccarat value in the shoe
+        """
+        self.requests.put(counts)
+
+    def latest(self) -> OddsReport | None:
+        """The latest report computed since the last call, without waiting.
+
+        :return: The report, or None if there are no new ones
+        """
+        report = None
+        while True:
+            try:
+                report = self.results.get_nowait()
+            except queue.Empty:
+                return report
+
+    def latest_error(self) -> Exception | None:
+        """The latest error since the last call, without waiting.
+
+        :return: The error, or None if there are no new ones
+        """
+        error = None
+        while True:
+            try:
+                _, error = self.errors.get_nowait()
+            except queue.Empty:
+                return error
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Stop the thread, once it has finished the composition it's computing.
+
+        :param timeout: The most seconds to wait for it
+        """
+        self.requests.put(None)
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            counts = self.requests.get()
+            # Skip to the latest request
+            while True:
+                try:
+                    counts = self.requests.get_nowait()
+                except queue.Empty:
+                    break
+
+            if counts is None:
+                return
+
+            try:
+                report = odds_report(counts, self.rules)
+            except Exception as error:
+                logger.exception(f"Couldn't compute the odds of {counts}")
+                self.errors.put((counts, error))
+            else:
+                self.results.put(report)
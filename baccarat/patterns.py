@@ -0,0 +1,171 @@
+"""
+An index of the streaks and patterns in a history of results, updated as each coup is
+played.
+
+Results are written as letters - P for player, B for banker and T for tie - so a
+pattern is a string like "PBPB". The index holds:
+
+- a run-length encoding of the results
+- a histogram of the length of each result's runs, including the run in progress
+- the number of times each pattern of up to `order` results has occurred
+
+so the longest run, the distribution of run lengths and the count of a pattern can be
+read without scanning the results.
+"""
+from collections.abc import Iterable
+from collections.abc import Sequence
+
+from .game import BaccaratTable
+from .game import BetResult
+from .game import EventType
+from .game import TableEvent
+
+LETTERS = {result: result.value[0] for result in BetResult}
+RESULTS = {letter: result for result, letter in LETTERS.items()}
+
+
+class PatternIndex:
+    """An index of the runs and patterns in a history of results.
+
+    :param order: The longest pattern to count
+    """
+
+    order: int
+    run_results: list[BetResult]
+    run_lengths: list[int]
+    run_histograms: dict[BetResult, dict[int, int]]
+    longest_runs: dict[BetResult, int]
+    patterns: dict[str, int]
+
+    def __init__(self, order: int = 4) -> None:
+        if order < 1:
+            raise ValueError("The order must be at least 1")
+
+        self.order = order
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget every result, e.g. at the start of a new shoe."""
+        self.run_results = []
+        self.run_lengths = []
+        self.run_histograms = {result: {} for result in BetResult}
+        self.longest_runs = {result: 0 for result in BetResult}
+        self.patterns = {}
+        self._recent = ""
+        self._count = 0
+
+    @classmethod
+    def from_results(cls, results: Iterable[BetResult], order: int = 4) -> "PatternIndex":
+        """Index a history of results.
+
+        :param results: The results, oldest first
+        :param order: The longest pattern to count
+        :return: The index
+        """
+        index = cls(order)
+        index.extend(results)
+        return index
+
+    def add(self, result: BetResult) -> None:
+        """Add the result of the next coup. This takes O(order) time.
+
+        :param result: The result
+        """
+
+        self._count += 1
+        histogram = self.run_histograms[result]
+
+        if self.run_results and self.run_results[-1] is result:
+            length = self.run_lengths[-1]
+            histogram[length] -= 1
+            if histogram[length] == 0:
+                del histogram[length]
+            length += 1
+            self.run_lengths[-1] = length
+        else:
+            length = 1
+            self.run_results.append(result)
+            self.run_lengths.append(length)
+
+        histogram[length] = histogram.get(length, 0) + 1
+        if length > self.longest_runs[result]:
+            self.longest_runs[result] = length
+
+        recent = self._recent + LETTERS[result]
+        if len(recent) > self.order:
+            recent = recent[1:]
+        self._recent = recent
+        patterns = self.patterns
+        for start in range(len(recent)):
+            pattern = recent[start:]
+            patterns[pattern] = patterns.get(pattern, 0) + 1
+
+    def extend(self, results: Iterable[BetResult]) -> None:
+        """Add the results of several coups, oldest first.
+
+        :param results: The results
+        """
+        for result in results:
+            self.add(result)
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def current_run(self) -> tuple[BetResult, int] | None:
+        """The result and length of the run in progress, if any."""
+        if not self.run_results:
+            return None
+
+        return self.run_results[-1], self.run_lengths[-1]
+
+    def longest_run(self, result: BetResult) -> int:
+        """The length of the longest run of a result.
+
+        :param result: The result
+        :return: The length, or 0 if the result has never occurred
+        """
+        return self.longest_runs[result]
+
+    def run_histogram(self, result: BetResult) -> dict[int, int]:
+        """The number of runs of a result of each length, including the run in progress.
+
+        :param result: The result
+        :return: The number of runs of each length, shortest first
+        """
+        histogram = self.run_histograms[result]
+        return {length: histogram[length] for length in sorted(histogram)}
+
+    def count(self, pattern: str | Sequence[BetResult]) -> int:
+        """The number of times a pattern of results has occurred, including overlaps.
+
+        :param pattern: The pattern, as letters (e.g. "PBPB") or results
+        :raises ValueError: If the pattern is empty, longer than the order, or has a
+            letter other than P, B or T
+        :return: The number of occurrences
+        """
+
+        if not isinstance(pattern, str):
+            pattern = "".join(LETTERS[result] for result in pattern)
+
+        if not 0 < len(pattern) <= self.order:
+            raise ValueError(f"Patterns must have between 1 and {self.order} results")
+        if not set(pattern) <= set(RESULTS):
+            raise ValueError(f"Patterns can only have the letters {''.join(RESULTS)}")
+
+        return self.patterns.get(pattern, 0)
+
+    def attach(self, table: BaccaratTable, per_shoe: bool = False) -> None:
+        """Index every result played at a table from now on.
+
+        :param table: The table
+        :param per_shoe: Whether to reset the index whenever the shoe is shuffled
+        """
+
+        def listener(event: TableEvent) -> None:
+            if event.type is EventType.RESULT and event.result is not None:
+                self.add(event.result)
+            elif event.type is EventType.SHUFFLE and per_shoe:
+                self.reset()
+
+        table.listeners.append(listener)
@@ -0,0 +1,110 @@
+"""
+The scoreboards ("roads") of a shoe's results, laid out cell by cell as results come in.
+
+A road is a grid of columns of up to `ROWS` cells. Each cell is a result and the number
+of ties marked on it:
+
+- the bead plate has every result in order, filling each column top to bottom
+- the big road has a column for each run of player or banker wins, with ties marked on
+  the cell before them. A run longer than `ROWS` carries on in the next column, rather
+  than turning along the bottom row.
+
+`add` returns the cell it changed, so a view can redraw that cell alone.
+"""
+from abc import ABC
+from abc import abstractmethod
+from collections.abc import Iterable
+from collections.abc import Iterator
+
+from .game import BetResult
+
+ROWS = 6
+
+# A result, and the number of ties marked on it
+Cell = tuple[BetResult, int]
+
+
+class Road(ABC):
+    """A grid of results, in columns of up to `ROWS` cells. Each kind of road lays out
+    results its own way, in `add`."""
+
+    columns: list[list[Cell]]
+
+    def __init__(self) -> None:
+        self.columns = []
+
+    @classmethod
+    def from_results(cls, results: Iterable[BetResult]) -> "Road":
+        """Lay out a history of results.
+
+        :param results: The results, oldest first
+        :return: The road
+        """
+        road = cls()
+        for result in results:
+            road.add(result)
+
+        return road
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+    @abstractmethod
+    def add(self, result: BetResult) -> tuple[int, int] | None:
+        """Add the result of the next coup.
+
+        :param result: The result
+        :return: The column and row of the cell added or changed, if any
+        """
+
+    def cells(self, start: int, end: int) -> Iterator[tuple[int, int, Cell]]:
+        """The cells in a range of columns.
+
+        :param start: The first column
+        :param end: The column after the last
+        :return: The column, row and contents of each cell
+        """
+        for column in range(max(start, 0), min(end, len(self.columns))):
+            for row, cell in enumerate(self.columns[column]):
+                yield column, row, cell
+
+    def _append(self, cell: Cell, new_column: bool) -> tuple[int, int]:
+        if new_column or not self.columns or len(self.columns[-1]) == ROWS:
+            self.columns.append([])
+
+        column = self.columns[-1]
+        column.append(cell)
+        return len(self.columns) - 1, len(column) - 1
+
+
+class BeadPlate(Road):
+    """Every result in order, filling each column top to bottom."""
+
+    def add(self, result: BetResult) -> tuple[int, int] | None:
+        return self._append((result, 0), False)
+
+
+class BigRoad(Road):
+    """A column for each run of player or banker wins, with ties marked on the cell
+    before them. Ties before the first player or banker win are marked on its cell."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._last: BetResult | None = None
+        self._leading_ties = 0
+
+    def add(self, result: BetResult) -> tuple[int, int] | None:
+        if result is BetResult.TIE:
+            if not self.columns:
+                self._leading_ties += 1
+                return None
+
+            column = self.columns[-1]
+            last, ties = column[-1]
+            column[-1] = (last, ties + 1)
+            return len(self.columns) - 1, len(column) - 1
+
+        position = self._append((result, self._leading_ties), result is not self._last)
+        self._last = result
+        self._leading_ties = 0
+        return position
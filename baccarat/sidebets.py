@@ -0,0 +1,62 @@
+"""
+Side bets, which are paid on particular outcomes of a coup.
+
+The side bets are those of EZ Baccarat, which only depend on the totals and the
+number of cards of each hand, so their odds can be computed from the shoe composition.
+"""
+from collections.abc import Callable
+from fractions import Fraction
+from typing import NamedTuple
+
+from .game import BetResult
+from .game import Outcome
+from .odds import outcome_probabilities
+
+
+class SideBet(NamedTuple):
+    """A side bet.
+
+    :param name: The name of the side bet
+    :param odds: The net amount won per unit staked
+    :param wins: Whether the side bet wins on an outcome
+    """
+
+    name: str
+    odds: int
+    wins: Callable[[Outcome], bool]
+
+    def net_odds(self, outcome: Outcome) -> int:
+        """The net amount won per unit staked on an outcome (-1 if the side bet loses)."""
+        return self.odds if self.wins(outcome) else -1
+
+
+def is_dragon_7(outcome: Outcome) -> bool:
+    """Whether the banker wins with a three card 7."""
+    return outcome.result is BetResult.BANKER and outcome.banker_drew and outcome.banker_total == 7
+
+
+def is_panda_8(outcome: Outcome) -> bool:
+    """Whether the player wins with a three card 8."""
+    return outcome.result is BetResult.PLAYER and outcome.player_drew and outcome.player_total == 8
+
+
+DRAGON_7 = SideBet("Dragon 7", 40, is_dragon_7)
+PANDA_8 = SideBet("Panda 8", 25, is_panda_8)
+
+SIDE_BETS = (DRAGON_7, PANDA_8)
+
+
+def side_bet_expected_value(side_bet: SideBet, counts: tuple[int, ...]) -> Fraction:
+    """The exact expected net win of a side bet, per unit staked.
+
+    :param side_bet: The side bet
+    :param counts: The number of cards of each baccarat value in the shoe
+    :return: The expected net win per unit staked
+    """
+    return sum(
+        (
+            probability * side_bet.net_odds(outcome)
+            for outcome, probability in outcome_probabilities(counts).items()
+        ),
+        Fraction(0),
+    )
@@ -0,0 +1,233 @@
+"""
+Monte Carlo simulation of the house edge, which stops once it is precise enough.
+
+Coups are played from a shoe and every bet type's profit and loss is fed to one-pass
+estimators, so no history is kept. Every `check_every` coups the confidence interval
+of each bet's edge is checked, and the simulation stops once all of them are narrow
+enough, or the time budget runs out.
+"""
+import logging
+import math
+import random
+import time
+from collections.abc import Callable
+from collections.abc import Sequence
+from statistics import NormalDist
+from typing import NamedTuple
+
+from .game import Bet
+from .game import BetResult
+from .game import deal_coup
+from .game import PayoutRules
+from .game import settle_bet
+from .game import STANDARD_RULES
+from .utils import Shoe
+
+logger = logging.getLogger(__name__)
+
+BET_TYPES = tuple(BetResult)
+
+
+class RunningCovariance:
+    """One-pass (Welford) estimator of the means and covariances of a vector.
+
+    :param size: The length of each vector
+    """
+
+    count: int
+    means: list[float]
+    comoments: list[list[float]]
+
+    def __init__(self, size: int) -> None:
+        self.count = 0
+        self.means = [0.0] * size
+        self.comoments = [[0.0] * size for _ in range(size)]
+
+    def add(self, values: Sequence[float]) -> None:
+        """Add an observation.
+
+        :param values: The observed vector
+        """
+        self.count += 1
+        before = [value - mean for value, mean in zip(values, self.means)]
+        self.means = [mean + delta / self.count for mean, delta in zip(self.means, before)]
+        after = [value - mean for value, mean in zip(values, self.means)]
+
+        for i, row in enumerate(self.comoments):
+            for j in range(len(row)):
+                row[j] += before[i] * after[j]
+
+    def merge(self, other: "RunningCovariance") -> None:
+        """Add every observation of another estimator (Chan et al.'s parallel algorithm).
+
+        :param other: The other estimator, of vectors of the same length
+        """
+        count = self.count + other.count
+        if other.count == 0:
+            return
+
+        deltas = [mean2 - mean1 for mean1, mean2 in zip(self.means, other.means)]
+        scale = self.count * other.count / count
+
+        self.means = [
+            mean + delta * other.count / count for mean, delta in zip(self.means, deltas)
+        ]
+        for i, row in enumerate(self.comoments):
+            for j in range(len(row)):
+                row[j] += other.comoments[i][j] + deltas[i] * deltas[j] * scale
+
+        self.count = count
+
+    def covariance(self, i: int, j: int) -> float:
+        """The sample covariance between two elements of the vector."""
+        if self.count < 2:
+            return math.nan
+
+        return self.comoments[i][j] / (self.count - 1)
+
+    def variance(self, i: int) -> float:
+        """The sample variance of an element of the vector."""
+        return self.covariance(i, i)
+
+    def half_width(self, i: int, confidence: float = 0.95) -> float:
+        """The half-width of the confidence interval of the mean of an element.
+
+        :param i: The element of the vector
+        :param confidence: The confidence level of the interval
+        :return: The half-width of the interval
+        """
+        if self.count < 2:
+            return math.inf
+
+        z = NormalDist().inv_cdf((1 + confidence) / 2)
+        return z * math.sqrt(self.variance(i) / self.count)
+
+
+class SimulationReport(NamedTuple):
+    """The results of a simulation.
+
+    :param coups: The number of coups played
+    :param elapsed: The number of seconds spent playing
+    :param result_counts: The number of times each bet type won
+    :param expected_values: The mean profit per unit staked of each bet type
+    :param half_widths: The half-width of the confidence interval of each expected value
+    :param covariances: The covariance between the profit of each pair of bet types
+    :param converged: Whether every half-width reached the requested precision
+    """
+
+    coups: int
+    elapsed: float
+    result_counts: dict[BetResult, int]
+    expected_values: dict[BetResult, float]
+    half_widths: dict[BetResult, float]
+    covariances: dict[tuple[BetResult, BetResult], float]
+    converged: bool
+
+    @property
+    def frequencies(self) -> dict[BetResult, float]:
+        """The fraction of coups each bet type won."""
+        return {result: count / self.coups for result, count in self.result_counts.items()}
+
+
+def simulate(
+    half_width: float | None = None,
+    time_budget: float | None = None,
+    max_coups: int | None = None,
+    *,
+    confidence: float = 0.95,
+    num_decks: int = 8,
+    penetration: float = 1.0,
+    rules: PayoutRules = STANDARD_RULES,
+    stake: int = 100,
+    check_every: int = 10_000,
+    progress: Callable[[SimulationReport], None] | None = None,
+    rng: random.Random | None = None,
+) -> SimulationReport:
+    """Simulate coups until the expected value of every bet is known precisely enough.
+
+    :param half_width: Stop once every confidence interval is at most this wide, either side
+    :param time_budget: Stop after this many seconds
+    :param max_coups: Stop after this many coups
+    :param confidence: The confidence level of the intervals
+    :param num_decks: The number of decks in the shoe
+    :param penetration: The fraction of the shoe dealt before the cut card comes out
+    :param rules: The payout rules of the table
+    :param stake: The stake of each bet, which matters as winnings are rounded down
+    :param check_every: The number of coups between checks of the stopping rules
+    :param progress: Called with the report so far at every check
+    :param rng: The random number generator to shuffle with, defaults to the `random` module's
+    :raises ValueError: If no stopping rule is given
+    :return: The report of the simulation
+    """
+
+    if half_width is None and time_budget is None and max_coups is None:
+        raise ValueError("At least one stopping rule is needed")
+
+    # The profit of each bet type only depends on the result, so look it up
+    profits = {
+        result: [(settle_bet(Bet(stake, bet), result, rules) - stake) / stake for bet in BET_TYPES]
+        for result in BetResult
+    }
+
+    estimator = RunningCovariance(len(BET_TYPES))
+    result_counts = {result: 0 for result in BetResult}
+
+    shoe = Shoe(num_decks, rng)
+    shoe.shuffle()
+    cut_card = max(6, round(shoe.num_cards * (1 - penetration)))
+    start = time.perf_counter()
+
+    while True:
+        batch = check_every
+        if max_coups is not None:
+            batch = min(batch, max_coups - estimator.count)
+
+        for _ in range(batch):
+            if shoe.num_cards < cut_card:
+                shoe.reset()
+
+            result = deal_coup(shoe).result
+            result_counts[result] += 1
+            estimator.add(profits[result])
+
+        report = _make_report(
+            estimator, result_counts, time.perf_counter() - start, confidence, half_width
+        )
+        logger.info(
+            f"Simulated {report.coups:,} coups, widest interval is "
+            f"±{max(report.half_widths.values()):.5f}"
+        )
+
+        if progress is not None:
+            progress(report)
+
+        if (
+            report.converged
+            or (time_budget is not None and report.elapsed >= time_budget)
+            or (max_coups is not None and report.coups >= max_coups)
+        ):
+            return report
+
+
+def _make_report(
+    estimator: RunningCovariance,
+    result_counts: dict[BetResult, int],
+    elapsed: float,
+    confidence: float,
+    half_width: float | None,
+) -> SimulationReport:
+    half_widths = {bet: estimator.half_width(i, confidence) for i, bet in enumerate(BET_TYPES)}
+
+    return SimulationReport(
+        coups=estimator.count,
+        elapsed=elapsed,
+        result_counts=dict(result_counts),
+        expected_values={bet: estimator.means[i] for i, bet in enumerate(BET_TYPES)},
+        half_widths=half_widths,
+        covariances={
+            (bet1, bet2): estimator.covariance(i, j)
+            for i, bet1 in enumerate(BET_TYPES)
+            for j, bet2 in enumerate(BET_TYPES)
+        },
+        converged=half_width is not None and max(half_widths.values()) <= half_width,
+    )
@@ -0,0 +1,318 @@
+"""
+Snapshot a table's state to bytes, and restore it exactly.
+
+A snapshot holds everything needed to carry on a table mid-shoe: the order of the cards
+left in the shoe and of its discards, the last hands dealt, the results, the pending
+bets, the player's bankroll, and the table's rules and limits. It is small enough to
+take every round - about 1 KB for a full 8 deck shoe.
+
+The format is a header followed by variable length sections, all little-endian:
+
+    magic       5 bytes     b"BSNP\\x01"
+    header      see HEADER
+    cards       1 byte each, the card's index in `CARDS`
+    discards    1 byte each
+    player hand 1 byte each
+    banker hand 1 byte each
+    results     1 byte each, the result's index in `BetResult`
+    bets        9 bytes each, the amount (int64) then the bet type
+    type limits 17 bytes each, the bet type, then the minimum and maximum (int64)
+
+A missing maximum, player, history or hand is stored as -1. To resume a job after a
+crash, `save` a snapshot every round and `load` it on restart. A `Snapshotter` takes
+the same snapshots in a fraction of the time, by only encoding what has changed.
+"""
+import os
+import struct
+from collections import deque
+from collections.abc import Iterable
+from collections.abc import Sequence
+from fractions import Fraction
+from pathlib import Path
+
+from .game import BaccaratHand
+from .game import BaccaratTable
+from .game import Bet
+from .game import BetLimits
+from .game import BetResult
+from .game import PayoutRules
+from .game import Player
+from .game import Rounding
+from .utils import Card
+from .utils import CARDS
+from .utils import Shoe
+
+MAGIC = b"BSNP\x01"
+
+# decks, shuffles, commission (numerator, denominator), tie payout, tie pushes,
+# rounding, table limits (minimum, maximum), bankroll, history, verbose, trimmed
+# results, then the length of each section: cards, discards, player hand, banker hand,
+# results, bets, type limits
+HEADER = struct.Struct("<BqIIHBBqqqiBqIIbbIIB")
+BET = struct.Struct("<qB")
+TYPE_LIMIT = struct.Struct("<Bqq")
+
+RESULTS = tuple(BetResult)
+ROUNDINGS = tuple(Rounding)
+
+_RESULT_CODES = {result: code for code, result in enumerate(RESULTS)}
+_ROUNDING_CODES = {rounding: code for code, rounding in enumerate(ROUNDINGS)}
+_CARD_CODES = {card: code for code, card in enumerate(CARDS)}
+
+# Hashing an enum, or a card of enums, is slow. Results are singletons and shoes share
+# the cards in CARDS, so they are looked up by identity instead.
+_RESULT_CODES_BY_ID = {id(result): code for code, result in enumerate(RESULTS)}
+_CARD_CODES_BY_ID = {id(card): code for code, card in enumerate(CARDS)}
+
+
+def snapshot(table: BaccaratTable) -> bytes:
+    """Snapshot the state of a table.
+
+    :param table: The table
+    :return: The snapshot
+    """
+    return _pack(
+        table,
+        encode_cards(table.shoe.cards),
+        encode_cards(table.shoe.discards),
+        _encode_results(table.results),
+    )
+
+
+class Snapshotter:
+    """Take snapshots of a table every round, faster than `snapshot`.
+
+    The cards and results make up most of a snapshot, and change little from one round
+    to the next. Between shuffles, the order of the shoe is the cards left followed by
+    the discards in reverse, so it is only encoded once per shuffle. Each result is
+    only encoded once, when it is added. This relies on the shoe only changing by
+    dealing and shuffling, and the results only by playing.
+    """
+
+    def __init__(self) -> None:
+        self._shoe_key: tuple[int, int] | None = None
+        self._order = b""
+        self._results_key: tuple[int, int] | None = None
+        self._results = bytearray()
+
+    def snapshot(self, table: BaccaratTable) -> bytes:
+        """Snapshot the state of a table.
+
+        :param table: The table
+        :return: The snapshot, the same as from `snapshot`
+        """
+
+        shoe = table.shoe
+        num_cards = len(shoe.cards)
+        shoe_key = (id(shoe), shoe.shuffles)
+        if shoe_key != self._shoe_key or num_cards + len(shoe.discards) != len(self._order):
+            self._shoe_key = shoe_key
+            self._order = encode_cards(shoe.cards) + encode_cards(shoe.discards[::-1])
+
+        results = table.results
+        results_key = (id(results), table.trimmed_results)
+        if self._results_key is None or results_key[0] != self._results_key[0]:
+            self._results = bytearray(_encode_results(results))
+        else:
+            # Drop any old results trimmed from the history since the last snapshot
+            del self._results[: results_key[1] - self._results_key[1]]
+            encoded = len(self._results)
+            self._results += _encode_results(results[encoded:])
+        self._results_key = results_key
+
+        return _pack(
+            table,
+            self._order[:num_cards],
+            self._order[num_cards:][::-1],
+            bytes(self._results),
+        )
+
+
+def restore(data: bytes) -> BaccaratTable:
+    """Restore a table from a snapshot.
+
+    :param data: The snapshot
+    :raises ValueError: If the data is not a snapshot
+    :return: The table, in the same state as when it was snapshot
+    """
+
+    if not data.startswith(MAGIC):
+        raise ValueError("Not a table snapshot")
+
+    try:
+        (
+            num_decks,
+            shuffles,
+            numerator,
+            denominator,
+            tie_payout,
+            tie_pushes,
+            rounding,
+            minimum,
+            maximum,
+            bankroll,
+            history,
+            verbose,
+            trimmed_results,
+            num_cards,
+            num_discards,
+            num_player_cards,
+            num_banker_cards,
+            num_results,
+            num_bets,
+            num_type_limits,
+        ) = HEADER.unpack_from(data, len(MAGIC))
+    except struct.error as e:
+        raise ValueError("Truncated table snapshot") from e
+
+    view = memoryview(data)
+    offset = len(MAGIC) + HEADER.size
+
+    def section(length: int) -> memoryview:
+        nonlocal offset
+        start, offset = offset, offset + length
+        if offset > len(data):
+            raise ValueError("Truncated table snapshot")
+        return view[start:offset]
+
+    shoe = Shoe(num_decks)
+    shoe.cards = decode_cards(section(num_cards))
+    shoe.discards = decode_cards(section(num_discards))
+    shoe.shuffles = shuffles
+    player_hand = _decode_hand(section(max(num_player_cards, 0)), num_player_cards)
+    banker_hand = _decode_hand(section(max(num_banker_cards, 0)), num_banker_cards)
+    results = list(map(RESULTS.__getitem__, section(num_results)))
+    bets = [
+        Bet(amount, RESULTS[code])
+        for amount, code in BET.iter_unpack(section(num_bets * BET.size))
+    ]
+    type_limits = {
+        RESULTS[code]: BetLimits(type_minimum, _from_missing(type_maximum))
+        for code, type_minimum, type_maximum in TYPE_LIMIT.iter_unpack(
+            section(num_type_limits * TYPE_LIMIT.size)
+        )
+    }
+
+    table = BaccaratTable(
+        rules=PayoutRules(
+            Fraction(numerator, denominator), tie_payout, bool(tie_pushes), ROUNDINGS[rounding]
+        ),
+        limits=BetLimits(minimum, _from_missing(maximum)),
+        type_limits=type_limits,
+        shoe=shoe,
+        verbose=bool(verbose),
+        history=_from_missing(history),
+    )
+    table.player = None if bankroll == -1 else Player(bankroll)
+    table.player_hand = player_hand
+    table.banker_hand = banker_hand
+    table.results = results
+    table.trimmed_results = trimmed_results
+    table.bets = deque(bets)
+
+    return table
+
+
+def save(table: BaccaratTable, path: Path) -> None:
+    """Save a snapshot of a table to a file.
+
+    The snapshot is written to a temporary file first, so a crash never leaves a
+    partly written snapshot.
+
+    :param table: The table
+    :param path: The path of the file
+    """
+    temporary = path.with_name(f"{path.name}.tmp")
+    temporary.write_bytes(snapshot(table))
+    os.replace(temporary, path)
+
+
+def load(path: Path) -> BaccaratTable:
+    """Restore a table from a snapshot file."""
+    return restore(path.read_bytes())
+
+
+def _pack(table: BaccaratTable, cards: bytes, discards: bytes, results: bytes) -> bytes:
+    player_hand = _encode_hand(table.player_hand)
+    banker_hand = _encode_hand(table.banker_hand)
+    bets = b"".join(BET.pack(bet.amount, _RESULT_CODES[bet.result]) for bet in table.bets)
+    type_limits = b"".join(
+        TYPE_LIMIT.pack(_RESULT_CODES[result], limits.minimum, _or_missing(limits.maximum))
+        for result, limits in table.type_limits.items()
+    )
+
+    commission = table.rules.banker_commission
+    header = HEADER.pack(
+        table.shoe.num_decks,
+        table.shoe.shuffles,
+        commission.numerator,
+        commission.denominator,
+        table.rules.tie_payout,
+        table.rules.tie_pushes,
+        _ROUNDING_CODES[table.rules.rounding],
+        table.limits.minimum,
+        _or_missing(table.limits.maximum),
+        -1 if table.player is None else table.player.bankroll,
+        _or_missing(table.history),
+        table.verbose,
+        table.trimmed_results,
+        len(cards),
+        len(discards),
+        -1 if player_hand is None else len(player_hand),
+        -1 if banker_hand is None else len(banker_hand),
+        len(results),
+        len(table.bets),
+        len(table.type_limits),
+    )
+
+    return b"".join(
+        [
+            MAGIC,
+            header,
+            cards,
+            discards,
+            player_hand or b"",
+            banker_hand or b"",
+            results,
+            bets,
+            type_limits,
+        ]
+    )
+
+
+def encode_cards(cards: Sequence[Card]) -> bytes:
+    """Encode cards as bytes, each the card's index in `CARDS`."""
+    try:
+        return bytes(map(_CARD_CODES_BY_ID.__getitem__, map(id, cards)))
+    except KeyError:
+        return bytes(map(_CARD_CODES.__getitem__, cards))
+
+
+def decode_cards(codes: Iterable[int]) -> list[Card]:
+    """Decode cards from `encode_cards`."""
+    return list(map(CARDS.__getitem__, codes))
+
+
+def _encode_results(results: list[BetResult]) -> bytes:
+    return bytes(map(_RESULT_CODES_BY_ID.__getitem__, map(id, results)))
+
+
+def _encode_hand(hand: BaccaratHand | None) -> bytes | None:
+    return None if hand is None else encode_cards(hand.cards)
+
+
+def _decode_hand(codes: memoryview, length: int) -> BaccaratHand | None:
+    if length == -1:
+        return None
+
+    hand = BaccaratHand()
+    hand.cards = decode_cards(codes)
+    return hand
+
+
+def _or_missing(value: int | None) -> int:
+    return -1 if value is None else value
+
+
+def _from_missing(value: int) -> int | None:
+    return None if value == -1 else value
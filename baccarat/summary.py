@@ -0,0 +1,384 @@
+"""
+Mergeable summaries of simulation runs.
+
+A large simulation can be split into shards, run anywhere, each keeping a `Summary` of
+its coups. Summaries merge associatively, so the shards can be combined in any order
+into the same report, without re-running anything or keeping the raw history. Each
+summary holds:
+
+- the number of times each bet type won
+- the mean and covariance of each bet type's profit per unit staked
+- a histogram of the player and banker totals
+- a histogram of the length of each bet type's streaks
+- a quantile sketch of bankrolls
+
+Shards are saved as compressed JSON, after the magic bytes `BSUM` and a format version
+byte. Version 1 shards, written before payout rules had a rounding rule, are still read,
+and round winnings down as every table did then. To merge shard files into one report:
+
+    python -m baccarat.summary shard-1.summary shard-2.summary -o merged.summary
+"""
+import argparse
+import json
+import math
+import zlib
+from collections.abc import Iterable
+from fractions import Fraction
+from pathlib import Path
+from typing import Any
+
+from .game import BetResult
+from .game import Coup
+from .game import PayoutRules
+from .game import Rounding
+from .game import STANDARD_RULES
+from .simulation import RunningCovariance
+
+MAGIC = b"BSUM"
+VERSION = 2
+# The format versions `Summary.loads` can read
+SUPPORTED_VERSIONS = (1, 2)
+
+
+class QuantileSketch:
+    """A mergeable sketch of quantiles, accurate to within a relative error.
+
+    Values are counted in buckets whose bounds grow geometrically (a DDSketch), so
+    any quantile is within the relative accuracy of a value in the sketch.
+
+    :param relative_accuracy: The relative error of each quantile
+    """
+
+    relative_accuracy: float
+    count: int
+    zeros: int
+    positive: dict[int, int]
+    negative: dict[int, int]
+
+    def __init__(self, relative_accuracy: float = 0.01) -> None:
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+
+        self.count = 0
+        self.zeros = 0
+        self.positive = {}
+        self.negative = {}
+
+    def add(self, value: float) -> None:
+        """Add a value to the sketch.
+
+        :param value: The value
+        """
+        self.count += 1
+        if value == 0:
+            self.zeros += 1
+            return
+
+        buckets = self.positive if value > 0 else self.negative
+        key = math.ceil(math.log(abs(value)) / self._log_gamma)
+        buckets[key] = buckets.get(key, 0) + 1
+
+    def merge(self, other: "QuantileSketch") -> None:
+        """Add every value of another sketch.
+
+        :param other: The other sketch, with the same relative accuracy
+        :raises ValueError: If the sketches have different accuracies
+        """
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different accuracies")
+
+        self.count += other.count
+        self.zeros += other.zeros
+        for buckets, other_buckets in (
+            (self.positive, other.positive),
+            (self.negative, other.negative),
+        ):
+            for key, count in other_buckets.items():
+                buckets[key] = buckets.get(key, 0) + count
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile of the values.
+
+        :param q: The quantile, between 0 and 1
+        :raises ValueError: If the sketch is empty
+        :return: The estimated quantile
+        """
+        if self.count == 0:
+            raise ValueError("The sketch is empty")
+
+        rank = q * (self.count - 1)
+        seen = 0
+
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -self._bucket_value(key)
+
+        seen += self.zeros
+        if seen > rank:
+            return 0.0
+
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return self._bucket_value(key)
+
+        return self._bucket_value(max(self.positive))
+
+    def _bucket_value(self, key: int) -> float:
+        return 2 * self._gamma**key / (self._gamma + 1)
+
+    def to_dict(self) -> dict[str, Any]:
+        """The sketch as JSON-compatible data."""
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "count": self.count,
+            "zeros": self.zeros,
+            "positive": list(self.positive.items()),
+            "negative": list(self.negative.items()),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "QuantileSketch":
+        """Rebuild a sketch from `to_dict`."""
+        sketch = cls(data["relative_accuracy"])
+        sketch.count = data["count"]
+        sketch.zeros = data["zeros"]
+        sketch.positive = dict(data["positive"])
+        sketch.negative = dict(data["negative"])
+        return sketch
+
+
+class Summary:
+    """A mergeable summary of coups and bankrolls.
+
+    Streaks are counted once they end; `all_streaks` includes the one in progress.
+
+    :param rules: The payout rules used to value each bet
+    :param relative_accuracy: The relative error of the bankroll quantiles
+    """
+
+    rules: PayoutRules
+    result_counts: dict[BetResult, int]
+    profits: RunningCovariance
+    totals: list[list[int]]
+    streaks: dict[BetResult, dict[int, int]]
+    bankrolls: QuantileSketch
+
+    def __init__(
+        self, rules: PayoutRules = STANDARD_RULES, relative_accuracy: float = 0.01
+    ) -> None:
+        self.rules = rules
+        self.result_counts = {result: 0 for result in BetResult}
+        self.profits = RunningCovariance(len(BetResult))
+        self.totals = [[0] * 10 for _ in range(10)]
+        self.streaks = {result: {} for result in BetResult}
+        self.bankrolls = QuantileSketch(relative_accuracy)
+
+        self._profits = {
+            result: [float(rules.net_odds(bet, result)) for bet in BetResult]
+            for result in BetResult
+        }
+        self._streak_result: BetResult | None = None
+        self._streak_length = 0
+
+    @property
+    def coups(self) -> int:
+        """The number of coups summarised."""
+        return self.profits.count
+
+    def add(self, coup: Coup) -> None:
+        """Add a coup to the summary.
+
+        :param coup: The coup
+        """
+        result = coup.result
+        self.result_counts[result] += 1
+        self.profits.add(self._profits[result])
+        self.totals[coup.player_total][coup.banker_total] += 1
+
+        if result is self._streak_result:
+            self._streak_length += 1
+        else:
+            if self._streak_result is not None:
+                _count(self.streaks[self._streak_result], self._streak_length)
+
+            self._streak_result = result
+            self._streak_length = 1
+
+    def add_bankroll(self, bankroll: float) -> None:
+        """Add a bankroll to the quantile sketch.
+
+        :param bankroll: The bankroll
+        """
+        self.bankrolls.add(bankroll)
+
+    def merge(self, other: "Summary") -> "Summary":
+        """Merge two summaries into a new one. Neither summary is changed.
+
+        Streaks do not carry over from one summary to the other.
+
+        :param other: The other summary
+        :raises ValueError: If the summaries used different payout rules
+        :return: The merged summary
+        """
+        if other.rules != self.rules:
+            raise ValueError("Cannot merge summaries with different payout rules")
+
+        merged = Summary.from_dict(self.to_dict())
+        other = Summary.from_dict(other.to_dict())
+
+        for result in BetResult:
+            merged.result_counts[result] += other.result_counts[result]
+            for length, count in other.streaks[result].items():
+                _count(merged.streaks[result], length, count)
+
+        merged.profits.merge(other.profits)
+        merged.bankrolls.merge(other.bankrolls)
+        for merged_row, other_row in zip(merged.totals, other.totals):
+            for i, count in enumerate(other_row):
+                merged_row[i] += count
+
+        return merged
+
+    def all_streaks(self) -> dict[BetResult, dict[int, int]]:
+        """The number of streaks of each length, including the streak in progress."""
+        streaks = {result: dict(lengths) for result, lengths in self.streaks.items()}
+        if self._streak_result is not None:
+            _count(streaks[self._streak_result], self._streak_length)
+
+        return streaks
+
+    def to_dict(self) -> dict[str, Any]:
+        """The summary as JSON-compatible data. The streak in progress counts as ended."""
+        return {
+            "rules": [
+                str(self.rules.banker_commission),
+                self.rules.tie_payout,
+                self.rules.tie_pushes,
+                self.rules.rounding.value,
+            ],
+            "result_counts": [self.result_counts[result] for result in BetResult],
+            "profits": [self.profits.count, self.profits.means, self.profits.comoments],
+            "totals": self.totals,
+            "streaks": [list(lengths.items()) for lengths in self.all_streaks().values()],
+            "bankrolls": self.bankrolls.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "Summary":
+        """Rebuild a summary from `to_dict`."""
+        # Version 1 summaries have no rounding rule, and always rounded down
+        commission, tie_payout, tie_pushes, *rounding = data["rules"]
+        summary = cls(
+            PayoutRules(
+                Fraction(commission),
+                tie_payout,
+                tie_pushes,
+                Rounding(rounding[0]) if rounding else Rounding.DOWN,
+            )
+        )
+
+        summary.result_counts = dict(zip(BetResult, data["result_counts"]))
+        summary.profits.count, summary.profits.means, summary.profits.comoments = data["profits"]
+        summary.totals = data["totals"]
+        summary.streaks = {
+            result: dict(lengths) for result, lengths in zip(BetResult, data["streaks"])
+        }
+        summary.bankrolls = QuantileSketch.from_dict(data["bankrolls"])
+        return summary
+
+    def dumps(self) -> bytes:
+        """Serialise the summary to compressed bytes."""
+        data = json.dumps(self.to_dict(), separators=(",", ":")).encode()
+        return MAGIC + bytes([VERSION]) + zlib.compress(data)
+
+    @classmethod
+    def loads(cls, data: bytes) -> "Summary":
+        """Deserialise a summary from `dumps`.
+
+        :raises ValueError: If the data is not a summary, or is in a format version this
+            version of the package cannot read
+        """
+        if not data.startswith(MAGIC) or len(data) <= len(MAGIC):
+            raise ValueError("Not a summary")
+
+        version = data[len(MAGIC)]
+        if version not in SUPPORTED_VERSIONS:
+            raise ValueError(f"Unsupported summary version {version}")
+
+        header = len(MAGIC) + 1
+        return cls.from_dict(json.loads(zlib.decompress(data[header:])))
+
+    def report(self) -> str:
+        """A human-readable report of the summary."""
+        lines = [f"Coups: {self.coups:,}"]
+        streaks = self.all_streaks()
+
+        for i, result in enumerate(BetResult):
+            frequency = self.result_counts[result] / max(self.coups, 1)
+            longest = max(streaks[result], default=0)
+            lines.append(
+                f"{result.value:<7} won {frequency:7.3%}, "
+                f"EV {self.profits.means[i]:+.5f} ± {self.profits.half_width(i):.5f}, "
+                f"SD {math.sqrt(self.profits.variance(i)):.4f}, longest streak {longest}"
+            )
+
+        if self.bankrolls.count:
+            quantiles = ", ".join(
+                f"{q:.0%} {self.bankrolls.quantile(q):,.0f}" for q in (0.05, 0.25, 0.5, 0.75, 0.95)
+            )
+            lines.append(f"Bankrolls ({self.bankrolls.count:,}): {quantiles}")
+
+        return "\n".join(lines)
+
+
+def _count(histogram: dict[int, int], key: int, count: int = 1) -> None:
+    histogram[key] = histogram.get(key, 0) + count
+
+
+def load(path: Path) -> Summary:
+    """Load a summary from a file."""
+    return Summary.loads(path.read_bytes())
+
+
+def save(summary: Summary, path: Path) -> None:
+    """Save a summary to a file."""
+    path.write_bytes(summary.dumps())
+
+
+def merge_all(summaries: Iterable[Summary]) -> Summary:
+    """Merge any number of summaries.
+
+    :param summaries: The summaries, all with the same payout rules
+    :raises ValueError: If there are no summaries
+    :return: The merged summary
+    """
+    merged = None
+    for summary in summaries:
+        merged = summary if merged is None else merged.merge(summary)
+
+    if merged is None:
+        raise ValueError("There are no summaries to merge")
+
+    return merged
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Merge shard files given on the command line, and print the report."""
+    parser = argparse.ArgumentParser(description="Merge summaries of simulation shards.")
+    parser.add_argument("shards", type=Path, nargs="+")
+    parser.add_argument("-o", "--output", type=Path, help="save the merged summary here")
+    args = parser.parse_args(argv)
+
+    merged = merge_all(load(path) for path in args.shards)
+    if args.output is not None:
+        save(merged, args.output)
+
+    print(merged.report())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,245 @@
+"""
+Sweep the house edge and volatility of each bet over a grid of rules and shoes.
+
+Every combination of the parameters in the grid is a cell. Each cell is simulated in
+a process pool, and written to a cache directory as soon as it finishes, keyed by a
+hash of its parameters and the package's source code. An interrupted sweep resumes
+from the cache, and a repeated sweep only simulates the cells that changed.
+
+The results are a tidy table, with one row per cell and bet type.
+
+Usage:
+
+    python -m baccarat.sweep --decks 1 6 8 --commission 0.05 0.04 --coups 1000000
+"""
+import argparse
+import csv
+import hashlib
+import itertools
+import json
+import logging
+import os
+import random
+from collections.abc import Mapping
+from collections.abc import Sequence
+from concurrent.futures import as_completed
+from concurrent.futures import ProcessPoolExecutor
+from fractions import Fraction
+from pathlib import Path
+from typing import Any
+
+from .game import BetResult
+from .game import configure_logging
+from .game import PayoutRules
+from .odds import expected_value
+from .odds import shoe_counts
+from .simulation import simulate
+
+logger = logging.getLogger(__name__)
+
+PARAMETERS = {
+    "num_decks": 8,
+    "penetration": 1.0,
+    "banker_commission": 0.05,
+    "tie_payout": 8,
+}
+
+Cell = dict[str, Any]
+Row = dict[str, Any]
+
+
+def grid_cells(grid: Mapping[str, Sequence[Any]]) -> list[Cell]:
+    """Every combination of the parameters in a grid.
+
+    Parameters missing from the grid take their default value.
+
+    :param grid: The values of each parameter to sweep
+    :raises ValueError: If the grid has an unknown parameter
+    :return: The parameters of each cell
+    """
+
+    unknown = set(grid) - set(PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {', '.join(sorted(unknown))}")
+
+    values = [grid.get(name, [default]) for name, default in PARAMETERS.items()]
+    return [dict(zip(PARAMETERS, combination)) for combination in itertools.product(*values)]
+
+
+def run_cell(
+    cell: Cell, max_coups: int, half_width: float | None = None, version: str | None = None
+) -> list[Row]:
+    """Simulate a cell of the sweep.
+
+    The cell has its own random number generator, seeded from its cache key, so a cell
+    always gives the same rows and the global `random` module is left alone.
+
+    :param cell: The parameters of the cell
+    :param max_coups: The most coups to simulate
+    :param half_width: Stop early once every confidence interval is this narrow
+    :param version: The package's `code_version`, worked out here if not given
+    :return: The rows of the cell, one per bet type
+    """
+
+    if version is None:
+        version = code_version()
+
+    rules = PayoutRules(
+        banker_commission=Fraction(str(cell["banker_commission"])),
+        tie_payout=cell["tie_payout"],
+    )
+    report = simulate(
+        half_width,
+        max_coups=max_coups,
+        num_decks=cell["num_decks"],
+        penetration=cell["penetration"],
+        rules=rules,
+        rng=random.Random(cell_key(cell, max_coups, half_width, version)),
+    )
+
+    counts = shoe_counts(cell["num_decks"])
+    return [
+        {
+            **cell,
+            "bet": bet.value,
+            "exact_ev": float(expected_value(bet, counts, rules)),
+            "simulated_ev": report.expected_values[bet],
+            "half_width": report.half_widths[bet],
+            "std_dev": report.covariances[bet, bet] ** 0.5,
+            "coups": report.coups,
+        }
+        for bet in BetResult
+    ]
+
+
+def sweep(
+    grid: Mapping[str, Sequence[Any]],
+    max_coups: int,
+    half_width: float | None = None,
+    cache_dir: Path | None = None,
+    workers: int | None = None,
+) -> list[Row]:
+    """Simulate every cell of a grid, in parallel.
+
+    :param grid: The values of each parameter to sweep
+    :param max_coups: The most coups to simulate per cell
+    :param half_width: Stop a cell early once every confidence interval is this narrow
+    :param cache_dir: The directory to cache finished cells in, if any
+    :param workers: The number of worker processes, defaults to the number of CPUs
+    :return: The rows of every cell, in grid order
+    """
+
+    cells = grid_cells(grid)
+    # Hashing the source is slow, so do it once for the whole sweep
+    version = code_version()
+    keys = [cell_key(cell, max_coups, half_width, version) for cell in cells]
+    results: dict[int, list[Row]] = {}
+
+    pending = []
+    for i, key in enumerate(keys):
+        cached = _read_cache(cache_dir, key)
+        if cached is None:
+            pending.append(i)
+        else:
+            results[i] = cached
+
+    logger.info(f"Sweeping {len(pending)} cells, {len(cells) - len(pending)} already cached")
+
+    if pending:
+        with ProcessPoolExecutor(workers) as executor:
+            futures = {
+                executor.submit(run_cell, cells[i], max_coups, half_width, version): i
+                for i in pending
+            }
+            for future in as_completed(futures):
+                i = futures[future]
+                results[i] = future.result()
+                _write_cache(cache_dir, keys[i], results[i])
+                logger.info(f"Finished cell {i + 1} of {len(cells)}: {cells[i]}")
+
+    return [row for i in range(len(cells)) for row in results[i]]
+
+
+def cell_key(cell: Cell, max_coups: int, half_width: float | None, version: str) -> str:
+    """The cache key of a cell: a hash of its parameters and the package's code.
+
+    :param cell: The parameters of the cell
+    :param max_coups: The most coups to simulate
+    :param half_width: Stop early once every confidence interval is this narrow
+    :param version: The package's `code_version`
+    :return: The key
+    """
+    settings = json.dumps([cell, max_coups, half_width], sort_keys=True)
+    return hashlib.sha256(f"{settings}:{version}".encode()).hexdigest()
+
+
+def code_version() -> str:
+    """A hash of the package's source code, so cached cells expire when it changes."""
+    digest = hashlib.sha256()
+    for path in sorted(Path(__file__).parent.glob("*.py")):
+        digest.update(path.read_bytes())
+
+    return digest.hexdigest()
+
+
+def write_table(rows: Sequence[Row], path: Path) -> None:
+    """Write the rows of a sweep to a CSV file.
+
+    :param rows: The rows of the sweep
+    :param path: The path of the CSV file
+    """
+    with path.open("w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def _read_cache(cache_dir: Path | None, key: str) -> list[Row] | None:
+    if cache_dir is None or not (cache_dir / f"{key}.json").exists():
+        return None
+
+    rows: list[Row] = json.loads((cache_dir / f"{key}.json").read_text())
+    return rows
+
+
+def _write_cache(cache_dir: Path | None, key: str, rows: list[Row]) -> None:
+    if cache_dir is None:
+        return
+
+    # Write to a temporary file first, so an interrupted write never leaves a bad cell
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    temporary = cache_dir / f"{key}.tmp"
+    temporary.write_text(json.dumps(rows))
+    os.replace(temporary, cache_dir / f"{key}.json")
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Sweep a grid given on the command line, and write the table to a CSV file."""
+    parser = argparse.ArgumentParser(description="Sweep the house edge over rules and shoes.")
+    parser.add_argument("--decks", type=int, nargs="+", default=[8])
+    parser.add_argument("--penetration", type=float, nargs="+", default=[1.0])
+    parser.add_argument("--commission", type=float, nargs="+", default=[0.05])
+    parser.add_argument("--tie-payout", type=int, nargs="+", default=[8])
+    parser.add_argument("--coups", type=int, default=100_000, help="most coups per cell")
+    parser.add_argument("--half-width", type=float, help="stop a cell early at this precision")
+    parser.add_argument("--cache", type=Path, default=Path(".sweep-cache"))
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("-o", "--output", type=Path, default=Path("sweep.csv"))
+    args = parser.parse_args(argv)
+    configure_logging(logging.INFO)
+
+    grid = {
+        "num_decks": args.decks,
+        "penetration": args.penetration,
+        "banker_commission": args.commission,
+        "tie_payout": args.tie_payout,
+    }
+    rows = sweep(grid, args.coups, args.half_width, args.cache, args.workers)
+    write_table(rows, args.output)
+
+    print(f"Wrote {len(rows)} rows to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
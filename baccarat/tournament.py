@@ -0,0 +1,253 @@
+"""
+A tournament of many entrants playing the same coups, with eliminations between rounds.
+
+Every entrant sees the same coups, dealt once from a shared shoe, so the tournament
+keeps no `Player` or `BaccaratTable` per entrant. Instead each entrant is an index into
+flat arrays of bankrolls and standing bets.
+
+Each coup is settled with no Python loop over the entrants. The entrants are grouped by
+bet type (regrouped only when bets change or entrants are eliminated), each group is
+gathered from the arrays with `operator.itemgetter`, settled with `settle_stakes`, and
+the new bankrolls are put back in entrant order with one more `itemgetter` and a
+single slice assignment.
+
+Between rounds, all but the leaders are eliminated. The leaders are found with a
+partial sort (`heapq.nlargest`), so ranking the top few of thousands of entrants
+doesn't sort the whole field.
+"""
+import heapq
+from array import array
+from collections.abc import Callable
+from collections.abc import Iterable
+from collections.abc import Sequence
+from operator import add
+from operator import itemgetter
+from operator import sub
+
+from .game import BetResult
+from .game import Coup
+from .game import deal_coup
+from .game import PayoutRules
+from .game import settle_stakes
+from .game import STANDARD_RULES
+from .utils import Shoe
+
+
+class Tournament:
+    """Entrants playing the same coups, each with their own bankroll and bet.
+
+    Each entrant has a standing bet, played every coup until it is changed. A bet of 0
+    sits the entrant out, and an entrant whose bankroll is less than their bet goes all
+    in.
+
+    :param num_entrants: The number of entrants
+    :param bankroll: The bankroll each entrant starts with
+    :param amount: The amount of each entrant's first bet
+    :param bet_type: The type of each entrant's first bet
+    :param num_decks: The number of decks in the shoe
+    :param penetration: The fraction of the shoe dealt before it is reshuffled
+    :param rules: The payout rules
+    """
+
+    bankrolls: "array[int]"
+    amounts: "array[int]"
+    bet_types: list[BetResult]
+    entrants: list[int]
+
+    def __init__(
+        self,
+        num_entrants: int,
+        bankroll: int,
+        amount: int = 0,
+        bet_type: BetResult = BetResult.BANKER,
+        num_decks: int = 8,
+        penetration: float = 0.8,
+        rules: PayoutRules = STANDARD_RULES,
+    ) -> None:
+        self.bankrolls = array("q", [bankroll]) * num_entrants
+        self.amounts = array("q", [amount]) * num_entrants
+        self.bet_types = [bet_type] * num_entrants
+        # The entrants still in the tournament, in the order they entered
+        self.entrants = list(range(num_entrants))
+        self.rules = rules
+        self.coups = 0
+        self._groups: list[tuple[BetResult, _Getter]] | None = None
+        self._eliminated: _Getter = _getter([])
+        self._ungroup: _Getter = _getter([])
+
+        self.shoe = Shoe(num_decks)
+        self.shoe.shuffle()
+        self._cut = max(6, round(52 * num_decks * (1 - penetration)))
+
+    def __len__(self) -> int:
+        return len(self.entrants)
+
+    def set_bet(self, entrant: int, amount: int, bet_type: BetResult) -> None:
+        """Change an entrant's standing bet.
+
+        :param entrant: The entrant
+        :param amount: The amount to bet each coup, or 0 to sit out
+        :param bet_type: The bet type
+        :raises ValueError: If the amount is negative
+        """
+        if amount < 0:
+            raise ValueError("Bets can't be negative")
+
+        self.amounts[entrant] = amount
+        if self.bet_types[entrant] is not bet_type:
+            self.bet_types[entrant] = bet_type
+            self._groups = None
+
+    def set_bets(self, amount: int, bet_type: BetResult) -> None:
+        """Change the standing bet of every entrant still in the tournament.
+
+        :param amount: The amount to bet each coup, or 0 to sit out
+        :param bet_type: The bet type
+        :raises ValueError: If the amount is negative
+        """
+        for entrant in self.entrants:
+            self.set_bet(entrant, amount, bet_type)
+
+    def play_coup(self) -> Coup:
+        """Deal a coup, and settle every entrant's bet on it.
+
+        :return: The coup
+        """
+        bankrolls = self.bankrolls
+        amounts = self.amounts
+        groups = self._group()
+
+        staked = []
+        for bet_type, gather in groups:
+            balances = gather(bankrolls)
+            staked.append((bet_type, balances, list(map(min, gather(amounts), balances))))
+
+        if self.shoe.num_cards < self._cut:
+            self.shoe.reset()
+        coup = deal_coup(self.shoe)
+
+        # The new bankrolls, by group, then those of the eliminated entrants
+        updated: list[int] = []
+        for bet_type, balances, stakes in staked:
+            payouts = settle_stakes(stakes, bet_type, coup.result, self.rules)
+            updated.extend(map(add, map(sub, balances, stakes), payouts))
+        updated.extend(self._eliminated(bankrolls))
+        bankrolls[:] = array("q", self._ungroup(updated))
+
+        self.coups += 1
+        return coup
+
+    def play(self, coups: int) -> list[Coup]:
+        """Play a number of coups.
+
+        :param coups: The number of coups
+        :return: The coups, oldest first
+        """
+        return [self.play_coup() for _ in range(coups)]
+
+    def run(self, coups: int, survivors: Iterable[int]) -> list[list[int]]:
+        """Play rounds of a number of coups, eliminating all but the leaders after each.
+
+        :param coups: The number of coups in each round
+        :param survivors: The number of entrants to keep after each round
+        :return: The entrants eliminated after each round
+        """
+        eliminated = []
+        for count in survivors:
+            self.play(coups)
+            eliminated.append(self.eliminate(count))
+
+        return eliminated
+
+    def leaderboard(self, top: int | None = None) -> list[tuple[int, int]]:
+        """The leading entrants still in the tournament, by bankroll. Ties are ranked by
+        the order the entrants entered.
+
+        :param top: The number of entrants, or None for every entrant
+        :return: Each entrant and their bankroll, leader first
+        """
+        bankrolls = self.bankrolls
+        key = bankrolls.__getitem__
+        if top is None or top >= len(self.entrants):
+            leaders = sorted(self.entrants, key=key, reverse=True)
+        else:
+            leaders = heapq.nlargest(top, self.entrants, key=key)
+
+        return [(entrant, bankrolls[entrant]) for entrant in leaders]
+
+    def rank(self, entrant: int) -> int:
+        """An entrant's rank among those still in the tournament, from 1, sharing the rank
+        of any entrants with the same bankroll.
+
+        :param entrant: The entrant
+        :return: The rank
+        """
+        bankroll = self.bankrolls[entrant]
+        bankrolls = self.bankrolls
+        return 1 + sum(bankrolls[i] > bankroll for i in self.entrants)
+
+    def eliminate(self, survivors: int) -> list[int]:
+        """Eliminate every entrant but the leaders.
+
+        :param survivors: The number of entrants to keep
+        :return: The entrants eliminated, in the order they entered
+        """
+        leaders = {entrant for entrant, _ in self.leaderboard(survivors)}
+        return self._keep(entrant for entrant in self.entrants if entrant in leaders)
+
+    def eliminate_broke(self, minimum: int = 1) -> list[int]:
+        """Eliminate every entrant who can't afford a bet.
+
+        :param minimum: The smallest bet
+        :return: The entrants eliminated, in the order they entered
+        """
+        bankrolls = self.bankrolls
+        return self._keep(entrant for entrant in self.entrants if bankrolls[entrant] >= minimum)
+
+    def _keep(self, entrants: Iterable[int]) -> list[int]:
+        kept = list(entrants)
+        kept_set = set(kept)
+        eliminated = [entrant for entrant in self.entrants if entrant not in kept_set]
+        self.entrants = kept
+        self._groups = None
+        return eliminated
+
+    def _group(self) -> list[tuple[BetResult, "_Getter"]]:
+        """Group the entrants by bet type, if their bets or the entrants have changed."""
+        if self._groups is not None:
+            return self._groups
+
+        bet_types = self.bet_types
+        grouped: dict[BetResult, list[int]] = {bet_type: [] for bet_type in BetResult}
+        for entrant in self.entrants:
+            grouped[bet_types[entrant]].append(entrant)
+
+        playing = set(self.entrants)
+        eliminated = [entrant for entrant in range(len(bet_types)) if entrant not in playing]
+        order = [entrant for entrants in grouped.values() for entrant in entrants] + eliminated
+
+        # Where each entrant's bankroll is in `order`
+        positions = [0] * len(order)
+        for position, entrant in enumerate(order):
+            positions[entrant] = position
+
+        self._groups = [
+            (bet_type, _getter(entrants)) for bet_type, entrants in grouped.items() if entrants
+        ]
+        self._eliminated = _getter(eliminated)
+        self._ungroup = _getter(positions)
+        return self._groups
+
+
+_Getter = Callable[[Sequence[int]], tuple[int, ...]]
+
+
+def _getter(indices: Sequence[int]) -> _Getter:
+    """Gather the items at some indices, as a tuple, in one call to `itemgetter`."""
+    if len(indices) == 0:
+        return lambda values: ()
+    if len(indices) == 1:
+        index = indices[0]
+        return lambda values: (values[index],)
+
+    return itemgetter(*indices)
@@ -0,0 +1,207 @@
+"""
+Record a timeline of where a table spends its time, and export it for Perfetto.
+
+A `Tracer` records the begin and end of named spans into a ring buffer allocated up
+front, so recording never allocates and the buffer holds only the latest spans. The
+buffer is dumped on demand as Chrome trace-event JSON, which opens in Perfetto
+(https://ui.perfetto.dev) or chrome://tracing as a timeline of each round.
+
+Methods are traced by wrapping them in place (`Tracer.instrument`), and unwrapped again
+by `Tracer.restore`, so there's no cost when the tracer isn't in use. `trace_tables`
+instruments the parts of a round: `BaccaratTable.play`, `_deal`, `_play` and
+`_settle_bets`, and `Shoe.shuffle` and `reset`.
+
+    tracer = Tracer()
+    trace_tables(tracer)
+    ...
+    tracer.dump("trace.json")
+"""
+import functools
+import json
+import os
+import threading
+import time
+from collections.abc import Callable
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+from .game import BaccaratTable
+from .utils import Shoe
+
+BEGIN = "B"
+END = "E"
+
+TABLE_METHODS = ("play", "_deal", "_play", "_settle_bets")
+SHOE_METHODS = ("shuffle", "reset")
+
+
+class Tracer:
+    """A ring buffer of the begin and end of spans.
+
+    :param capacity: The most events kept, after which the oldest are overwritten
+    :param clock: The clock, in nanoseconds
+    """
+
+    capacity: int
+
+    def __init__(
+        self, capacity: int = 65_536, clock: Callable[[], int] = time.perf_counter_ns
+    ) -> None:
+        if capacity < 1:
+            raise ValueError("The capacity must be at least 1")
+
+        self.capacity = capacity
+        self.clock = clock
+        self._names = [""] * capacity
+        self._phases = [BEGIN] * capacity
+        self._times = [0] * capacity
+        self._threads = [0] * capacity
+        self._next = 0
+        self._count = 0
+        self._originals: list[tuple[type, str, Any]] = []
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _record(self, name: str, phase: str) -> None:
+        i = self._next
+        self._names[i] = name
+        self._phases[i] = phase
+        self._times[i] = self.clock()
+        self._threads[i] = threading.get_ident()
+
+        i += 1
+        self._next = 0 if i == self.capacity else i
+        if self._count < self.capacity:
+            self._count += 1
+
+    def begin(self, name: str) -> None:
+        """Begin a span.
+
+        :param name: The name of the span
+        """
+        self._record(name, BEGIN)
+
+    def end(self, name: str) -> None:
+        """End the latest span begun on this thread.
+
+        :param name: The name of the span
+        """
+        self._record(name, END)
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Record a span around a block of code.
+
+        :param name: The name of the span
+        """
+        self.begin(name)
+        try:
+            yield
+        finally:
+            self.end(name)
+
+    def wrap(self, func: Callable[..., Any], name: str) -> Callable[..., Any]:
+        """Wrap a function so each call is recorded as a span.
+
+        :param func: The function
+        :param name: The name of the span
+        :return: The wrapped function
+        """
+
+        @functools.wraps(func)
+        def traced(*args: Any, **kwargs: Any) -> Any:
+            self._record(name, BEGIN)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._record(name, END)
+
+        return traced
+
+    def instrument(self, owner: type, *names: str) -> None:
+        """Trace each call of some methods of a class, until `restore` is called.
+
+        :param owner: The class
+        :param names: The names of the methods
+        """
+        for name in names:
+            original = owner.__dict__[name]
+            self._originals.append((owner, name, original))
+            setattr(owner, name, self.wrap(original, f"{owner.__name__}.{name}"))
+
+    def restore(self) -> None:
+        """Unwrap every method instrumented by the tracer."""
+        while self._originals:
+            owner, name, original = self._originals.pop()
+            setattr(owner, name, original)
+
+    def clear(self) -> None:
+        """Forget every recorded event."""
+        self._next = 0
+        self._count = 0
+
+    def events(self) -> list[dict[str, Any]]:
+        """The recorded events as Chrome trace events, oldest first.
+
+        The ends of spans whose begin has been overwritten are dropped, so every span
+        in the timeline is whole or still open.
+
+        :return: The events
+        """
+        pid = os.getpid()
+        start = (self._next - self._count) % self.capacity
+        depths: dict[int, int] = {}
+        events = []
+
+        for offset in range(self._count):
+            i = (start + offset) % self.capacity
+            thread = self._threads[i]
+            phase = self._phases[i]
+            depth = depths.get(thread, 0)
+            if phase == END:
+                if depth == 0:
+                    continue
+                depths[thread] = depth - 1
+            else:
+                depths[thread] = depth + 1
+
+            events.append(
+                {
+                    "name": self._names[i],
+                    "ph": phase,
+                    "ts": self._times[i] / 1000,
+                    "pid": pid,
+                    "tid": thread,
+                }
+            )
+
+        return events
+
+    def to_json(self) -> dict[str, Any]:
+        """The recorded events in the Chrome trace-event format.
+
+        :return: The trace, as JSON-compatible data
+        """
+        return {"traceEvents": self.events(), "displayTimeUnit": "ms"}
+
+    def dump(self, path: str | os.PathLike[str]) -> None:
+        """Write the recorded events to a Chrome trace-event JSON file.
+
+        :param path: The path of the file
+        """
+        Path(path).write_text(json.dumps(self.to_json()), encoding="utf-8")
+
+
+def trace_tables(tracer: Tracer) -> Tracer:
+    """Trace the parts of every round played by every table, until `tracer.restore` is
+    called.
+
+    :param tracer: The tracer
+    :return: The tracer
+    """
+    tracer.instrument(BaccaratTable, *TABLE_METHODS)
+    tracer.instrument(Shoe, *SHOE_METHODS)
+    return tracer
@@ -41,30 +41,35 @@ class Card(NamedTuple):
         return f"[{self.value.value}{self.suit.value}]"
 
 
+# Cards are immutable, so every deck and shoe shares these 52 objects
+CARDS = tuple(Card(value, suit) for value, suit in product(Value, Suit))
+
+
 class Deck:
     """A deck of cards."""
 
     def __init__(self) -> None:
-        self.cards = [Card(value, suit) for value, suit in product(Value, Suit)]
+        self.cards = list(CARDS)
 
 
 class Shoe:
     """A shoe of cards - multiple decks together.
 
     :param decks: The number of decks to use
+    :param rng: The random number generator to shuffle with, defaults to the `random` module's
     """
 
     cards: list[Card]
     discards: list[Card]
+    shuffles: int
 
-    def __init__(self, decks: int = 8) -> None:
+    def __init__(self, decks: int = 8, rng: random.Random | None = None) -> None:
         self._decks = decks
+        self.rng = rng
 
-        self.cards = []
+        self.cards = list(CARDS) * decks
         self.discards = []
-
-        for _ in range(decks):
-            self.cards.extend(Deck().cards)
+        self.shuffles = 0
 
     @property
     def num_decks(self) -> int:
@@ -78,7 +83,8 @@ class Shoe:
 
     def shuffle(self) -> None:
         """Shuffle the shoe."""
-        random.shuffle(self.cards)
+        (self.rng or random).shuffle(self.cards)
+        self.shuffles += 1
 
     def deal(self) -> Card:
         """Deal a card from the shoe.
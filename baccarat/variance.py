@@ -0,0 +1,440 @@
+"""
+Variance-reduced Monte Carlo estimates of rare events.
+
+Rare payouts, such as a Banker natural 9 against a Player 0, or a long streak of
+Banker wins, take a huge number of plain Monte Carlo coups to estimate. These
+estimators get the same precision from far fewer samples:
+
+- Stratification: the first four cards are enumerated exactly, and only the coups
+  where a third card is drawn are sampled.
+- Importance sampling: cards are drawn from a tilted shoe composition that makes the
+  event more likely, and each coup is weighted by its likelihood ratio.
+- Control variates: the sampled Player and Banker win rates are corrected to their
+  exactly known probabilities, and the estimate is corrected with them.
+
+Each estimate reports how much it cut the variance per sample, compared to plain
+Monte Carlo. Coups are played from the top of a freshly shuffled shoe.
+"""
+import math
+import random
+from collections.abc import Callable
+from collections.abc import Sequence
+from typing import NamedTuple
+
+from .game import BetResult
+from .game import does_banker_draw
+from .game import does_player_draw
+from .game import Outcome
+from .odds import NUM_VALUES
+from .odds import result_probabilities
+from .odds import shoe_counts
+from .simulation import RunningCovariance
+
+VALUES = range(NUM_VALUES)
+
+Payoff = Callable[[Outcome], float]
+
+
+class Estimate(NamedTuple):
+    """A Monte Carlo estimate.
+
+    :param mean: The estimated mean
+    :param std_error: The standard error of the estimate
+    :param samples: The number of samples used
+    :param variance_reduction: The variance per sample of plain Monte Carlo, divided by
+        the variance per sample of this estimate
+    """
+
+    mean: float
+    std_error: float
+    samples: int
+    variance_reduction: float
+
+
+def estimate_plain(
+    payoff: Payoff, samples: int, num_decks: int = 8, rng: random.Random | None = None
+) -> Estimate:
+    """Estimate the mean payoff of a coup with plain Monte Carlo.
+
+    :param payoff: The payoff of each outcome, e.g. 1 if an event happens, otherwise 0
+    :param samples: The number of coups to sample
+    :param num_decks: The number of decks in the shoe
+    :param rng: The random number generator
+    :return: The estimate
+    """
+
+    rng = rng or random.Random()
+    cards = _shoe_values(num_decks)
+
+    estimator = RunningCovariance(1)
+    for _ in range(samples):
+        outcome, _ = play_values(rng.sample(cards, 6))
+        estimator.add((payoff(outcome),))
+
+    return Estimate(
+        estimator.means[0], math.sqrt(estimator.variance(0) / estimator.count), samples, 1.0
+    )
+
+
+def estimate_stratified(
+    payoff: Payoff, samples: int, num_decks: int = 8, rng: random.Random | None = None
+) -> Estimate:
+    """Estimate the mean payoff of a coup, stratified over the first four cards.
+
+    Coups settled by the first four cards are counted exactly. Exactly `samples` coups
+    are shared out between the other strata in proportion to their probability (see
+    `_allocate`). Strata given fewer than 2 samples, too few to estimate their variance,
+    are pooled into one stratum whose first four cards are drawn by their probability.
+
+    :param payoff: The payoff of each outcome
+    :param samples: The number of coups to sample
+    :param num_decks: The number of decks in the shoe
+    :param rng: The random number generator
+    :raises ValueError: If there are fewer than 2 samples
+    :return: The estimate
+    """
+
+    if samples < 2:
+        raise ValueError("Stratified sampling needs at least 2 samples")
+
+    rng = rng or random.Random()
+    counts = list(shoe_counts(num_decks))
+    first_four = _first_four_strata(counts)
+
+    mean = 0.0
+    mean_square = 0.0
+    variance = 0.0
+
+    random_strata = []
+    for probability, cards in first_four:
+        if _needs_draw(cards):
+            random_strata.append((probability, cards))
+        else:
+            y = payoff(play_values(cards)[0])
+            mean += probability * y
+            mean_square += probability * y * y
+
+    allocation = _allocate([probability for probability, _ in random_strata], samples)
+    kept = [i for i, stratum_samples in enumerate(allocation) if stratum_samples >= 2]
+    pooled = [i for i, stratum_samples in enumerate(allocation) if stratum_samples < 2]
+    pooled_samples = sum(allocation[i] for i in pooled)
+    # The pool needs 2 samples too, so give it the smallest kept strata until it has
+    while pooled and pooled_samples < 2:
+        smallest = min(kept, key=lambda i: allocation[i])
+        kept.remove(smallest)
+        pooled.append(smallest)
+        pooled_samples += allocation[smallest]
+
+    groups = [([random_strata[i]], allocation[i]) for i in kept]
+    if pooled:
+        groups.append(([random_strata[i] for i in pooled], pooled_samples))
+
+    for strata, stratum_samples in groups:
+        probabilities = [probability for probability, _ in strata]
+        probability = sum(probabilities)
+
+        estimator = RunningCovariance(1)
+        square = 0.0
+        for _ in range(stratum_samples):
+            cards = strata[0][1] if len(strata) == 1 else rng.choices(strata, probabilities)[0][1]
+            remaining = counts.copy()
+            for value in cards:
+                remaining[value] -= 1
+
+            fifth = rng.choices(VALUES, remaining)[0]
+            remaining[fifth] -= 1
+            sixth = rng.choices(VALUES, remaining)[0]
+
+            y = payoff(play_values((*cards, fifth, sixth))[0])
+            estimator.add((y,))
+            square += y * y
+
+        mean += probability * estimator.means[0]
+        mean_square += probability * square / stratum_samples
+        variance += probability**2 * estimator.variance(0) / stratum_samples
+
+    return Estimate(
+        mean,
+        math.sqrt(variance),
+        samples,
+        _variance_reduction(mean_square - mean**2, variance * samples),
+    )
+
+
+def estimate_importance(
+    payoff: Payoff,
+    samples: int,
+    composition: Sequence[float],
+    num_decks: int = 8,
+    rng: random.Random | None = None,
+) -> Estimate:
+    """Estimate the mean payoff of a coup by importance sampling.
+
+    Cards are drawn with replacement in proportion to the tilted composition, and each
+    coup is weighted by the ratio of its probability from the real shoe to its
+    probability under the tilted composition.
+
+    :param payoff: The payoff of each outcome
+    :param samples: The number of coups to sample
+    :param composition: The relative weight of each baccarat value 0-9 in the tilted shoe
+    :param num_decks: The number of decks in the shoe
+    :param rng: The random number generator
+    :raises ValueError: If the tilted shoe cannot draw a value the real shoe can
+    :return: The estimate
+    """
+
+    rng = rng or random.Random()
+    counts = shoe_counts(num_decks)
+    num_cards = sum(counts)
+
+    total_weight = sum(composition)
+    tilted = [weight / total_weight for weight in composition]
+    if any(count > 0 and q <= 0 for count, q in zip(counts, tilted)):
+        raise ValueError("The tilted composition must be able to draw every value in the shoe")
+
+    estimator = RunningCovariance(1)
+    square = 0.0
+    for _ in range(samples):
+        cards = rng.choices(VALUES, tilted, k=6)
+        outcome, num_dealt = play_values(cards)
+
+        seen = [0] * NUM_VALUES
+        ratio = 1.0
+        for i, value in enumerate(cards[:num_dealt]):
+            ratio *= (counts[value] - seen[value]) / (num_cards - i) / tilted[value]
+            seen[value] += 1
+
+        y = payoff(outcome)
+        estimator.add((y * ratio,))
+        square += y * y * ratio
+
+    mean = estimator.means[0]
+    return Estimate(
+        mean,
+        math.sqrt(estimator.variance(0) / samples),
+        samples,
+        _variance_reduction(square / samples - mean**2, estimator.variance(0)),
+    )
+
+
+def estimate_control_variates(
+    payoff: Payoff, samples: int, num_decks: int = 8, rng: random.Random | None = None
+) -> Estimate:
+    """Estimate the mean payoff of a coup, using the main bets as control variates.
+
+    The sampled Player and Banker win rates are compared to their exact probabilities,
+    and the estimate is corrected by the regression of the payoff on them.
+
+    :param payoff: The payoff of each outcome
+    :param samples: The number of coups to sample
+    :param num_decks: The number of decks in the shoe
+    :param rng: The random number generator
+    :return: The estimate
+    """
+
+    rng = rng or random.Random()
+    cards = _shoe_values(num_decks)
+    exact = result_probabilities(shoe_counts(num_decks))
+    controls = (BetResult.PLAYER, BetResult.BANKER)
+
+    estimator = RunningCovariance(3)
+    for _ in range(samples):
+        outcome, _ = play_values(rng.sample(cards, 6))
+        result = outcome.result
+        estimator.add((payoff(outcome), *(float(result is control) for control in controls)))
+
+    # Solve the 2x2 normal equations for the regression coefficients
+    (spp, spb), (sbp, sbb) = [[estimator.covariance(i, j) for j in (1, 2)] for i in (1, 2)]
+    spy, sby = estimator.covariance(1, 0), estimator.covariance(2, 0)
+    determinant = spp * sbb - spb * sbp
+    beta_player = (sbb * spy - spb * sby) / determinant
+    beta_banker = (spp * sby - sbp * spy) / determinant
+
+    mean = (
+        estimator.means[0]
+        - beta_player * (estimator.means[1] - float(exact[BetResult.PLAYER]))
+        - beta_banker * (estimator.means[2] - float(exact[BetResult.BANKER]))
+    )
+    residual_variance = max(estimator.variance(0) - beta_player * spy - beta_banker * sby, 0.0)
+
+    return Estimate(
+        mean,
+        math.sqrt(residual_variance / samples),
+        samples,
+        _variance_reduction(estimator.variance(0), residual_variance),
+    )
+
+
+def streak_probability(
+    length: int, coups: int, result: BetResult = BetResult.BANKER, num_decks: int = 8
+) -> float:
+    """The probability of a streak of results, treating each coup as independent.
+
+    :param length: The length of the streak
+    :param coups: The number of coups played
+    :param result: The result of every coup in the streak
+    :param num_decks: The number of decks in the shoe
+    :return: The probability of at least one streak of the given length
+    """
+
+    p = float(result_probabilities(shoe_counts(num_decks))[result])
+
+    # The probability of the current streak being each length, short of the target
+    streaks = [1.0] + [0.0] * (length - 1)
+    reached = 0.0
+    for _ in range(coups):
+        reached += streaks[-1] * p
+        streaks = [sum(streaks) * (1 - p)] + [s * p for s in streaks[:-1]]
+
+    return reached
+
+
+def estimate_streak_probability(
+    length: int,
+    coups: int,
+    samples: int,
+    tilt: float,
+    result: BetResult = BetResult.BANKER,
+    num_decks: int = 8,
+    rng: random.Random | None = None,
+) -> Estimate:
+    """Estimate the probability of a streak of results by importance sampling.
+
+    Each coup is treated as independent, and the streaking result is drawn with
+    probability `tilt` instead of its real probability. Each sequence is weighted by its
+    likelihood ratio, up to the coup that completes the streak.
+
+    :param length: The length of the streak
+    :param coups: The number of coups played
+    :param samples: The number of sequences to sample
+    :param tilt: The probability of the streaking result in the tilted sequences
+    :param result: The result of every coup in the streak
+    :param num_decks: The number of decks in the shoe
+    :param rng: The random number generator
+    :return: The estimate
+    """
+
+    rng = rng or random.Random()
+    p = float(result_probabilities(shoe_counts(num_decks))[result])
+    hit_ratio = p / tilt
+    miss_ratio = (1 - p) / (1 - tilt)
+
+    estimator = RunningCovariance(1)
+    for _ in range(samples):
+        ratio = 1.0
+        streak = 0
+        y = 0.0
+        for _ in range(coups):
+            if rng.random() < tilt:
+                ratio *= hit_ratio
+                streak += 1
+                if streak == length:
+                    y = ratio
+                    break
+            else:
+                ratio *= miss_ratio
+                streak = 0
+
+        estimator.add((y,))
+
+    mean = estimator.means[0]
+    return Estimate(
+        mean,
+        math.sqrt(estimator.variance(0) / samples),
+        samples,
+        _variance_reduction(mean * (1 - mean), estimator.variance(0)),
+    )
+
+
+def play_values(cards: Sequence[int]) -> tuple[Outcome, int]:
+    """Play out a coup from the baccarat values of the cards, in the order they are dealt.
+
+    :param cards: The values of at least the first 4 cards, and up to 6
+    :return: The outcome, and the number of cards used
+    """
+
+    player_total = (cards[0] + cards[2]) % 10
+    banker_total = (cards[1] + cards[3]) % 10
+    if player_total >= 8 or banker_total >= 8:
+        return Outcome(player_total, banker_total, False, False), 4
+
+    num_dealt = 4
+    player_third = None
+    if does_player_draw(player_total):
+        player_third = cards[num_dealt]
+        player_total = (player_total + player_third) % 10
+        num_dealt += 1
+
+    banker_drew = does_banker_draw(banker_total, player_third)
+    if banker_drew:
+        banker_total = (banker_total + cards[num_dealt]) % 10
+        num_dealt += 1
+
+    return Outcome(player_total, banker_total, player_third is not None, banker_drew), num_dealt
+
+
+def _shoe_values(num_decks: int) -> list[int]:
+    """The baccarat values of every card in a full shoe."""
+    return [value for value, count in enumerate(shoe_counts(num_decks)) for _ in range(count)]
+
+
+def _first_four_strata(counts: list[int]) -> list[tuple[float, tuple[int, int, int, int]]]:
+    """The probability of every first four cards, ignoring the order of each hand's cards."""
+
+    num_cards = sum(counts)
+    denominator = num_cards * (num_cards - 1) * (num_cards - 2) * (num_cards - 3)
+    remaining = counts.copy()
+
+    strata = []
+    pairs = [(v1, v2) for v1 in VALUES for v2 in VALUES if v1 <= v2]
+    for p1, p2 in pairs:
+        for b1, b2 in pairs:
+            weight = 1
+            for value in (p1, p2, b1, b2):
+                weight *= remaining[value]
+                remaining[value] -= 1
+            for value in (p1, p2, b1, b2):
+                remaining[value] += 1
+
+            weight *= (1 if p1 == p2 else 2) * (1 if b1 == b2 else 2)
+            if weight > 0:
+                strata.append((weight / denominator, (p1, b1, p2, b2)))
+
+    return strata
+
+
+def _allocate(weights: Sequence[float], samples: int) -> list[int]:
+    """Share out samples in proportion to some weights, by the largest remainder method.
+
+    :param weights: The weight of each share
+    :param samples: The number of samples to share out
+    :return: The samples of each share, which add up to `samples`
+    """
+
+    total = sum(weights)
+    shares = [samples * weight / total for weight in weights]
+    allocation = [math.floor(share) for share in shares]
+
+    left = samples - sum(allocation)
+    by_remainder = sorted(range(len(shares)), key=lambda i: allocation[i] - shares[i])
+    for i in by_remainder[:left]:
+        allocation[i] += 1
+
+    return allocation
+
+
+def _needs_draw(cards: tuple[int, int, int, int]) -> bool:
+    """Whether a coup needs more than its first four cards."""
+    player_total = (cards[0] + cards[2]) % 10
+    banker_total = (cards[1] + cards[3]) % 10
+    if player_total >= 8 or banker_total >= 8:
+        return False
+
+    return does_player_draw(player_total) or does_banker_draw(banker_total, None)
+
+
+def _variance_reduction(plain_variance: float, variance: float) -> float:
+    if variance <= 0:
+        return math.inf if plain_variance > 0 else 1.0
+
+    return plain_variance / variance
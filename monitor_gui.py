@@ -0,0 +1,181 @@
+import argparse
+import multiprocessing
+import time
+import tkinter as tk
+from tkinter import ttk
+
+from baccarat.game import BetResult
+from baccarat.monitor import create_monitor
+from baccarat.monitor import Monitor
+from baccarat.monitor import MonitorError
+from baccarat.monitor import NUM_TOTALS
+from baccarat.monitor import run_worker
+from baccarat.monitor import SlotStats
+
+# How many times a second the window reads the monitor
+FRAME_RATE = 10
+
+COLUMNS = {
+    "worker": "Worker",
+    "coups": "Coups",
+    "rate": "Coups/s",
+    "player": "Player",
+    "banker": "Banker",
+    "tie": "Tie",
+    "edge": "House edge",
+}
+
+HISTOGRAM_WIDTH = 400
+HISTOGRAM_HEIGHT = 120
+
+
+class MonitorWindow(tk.Tk):
+    """Shows the running totals of the workers of a simulation, as they're written."""
+
+    def __init__(self, name: str, processes: list[multiprocessing.Process]) -> None:
+        super().__init__()
+        self.monitor = Monitor(name)
+        self.processes = processes
+        self._last_frame = (time.perf_counter(), 0)
+        self._after: str | None = None
+        # The last consistent totals of each slot, shown while a slot can't be read
+        self._slots: list[SlotStats | None] = [None] * self.monitor.slots
+
+        self.title("Baccarat simulation monitor")
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(0, weight=1)
+
+        self.tree = ttk.Treeview(self, columns=list(COLUMNS), show="headings")
+        for column, heading in COLUMNS.items():
+            self.tree.heading(column, text=heading)
+            self.tree.column(column, width=100, anchor="e")
+        for slot in range(self.monitor.slots):
+            self.tree.insert("", "end", iid=str(slot))
+        self.tree.insert("", "end", iid="total")
+        self.tree.tag_configure("stale", foreground="#888888")
+
+        # The number of coups won with each total, as bars made once and resized
+        self.histogram = tk.Canvas(
+            self, width=HISTOGRAM_WIDTH, height=HISTOGRAM_HEIGHT + 20, background="#ffffff"
+        )
+        bar_width = HISTOGRAM_WIDTH // NUM_TOTALS
+        self.bars: list[int] = []
+        for total in range(NUM_TOTALS):
+            x = total * bar_width
+            self.bars.append(
+                self.histogram.create_rectangle(
+                    x + 4, HISTOGRAM_HEIGHT, x + bar_width - 4, HISTOGRAM_HEIGHT, fill="#1f4e9c"
+                )
+            )
+            self.histogram.create_text(x + bar_width // 2, HISTOGRAM_HEIGHT + 10, text=str(total))
+
+        self.status_label = ttk.Label(self, text="")
+
+        self.tree.grid(row=0, column=0, sticky="NSEW")
+        self.histogram.grid(row=1, column=0, sticky="EW")
+        self.status_label.grid(row=2, column=0, sticky="W")
+
+        self.protocol("WM_DELETE_WINDOW", self.close)
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Read every slot and redraw, then schedule the next frame.
+
+        A slot that can't be read, e.g. as its worker died writing it, is shown as stale
+        with its last consistent totals.
+        """
+        try:
+            self._draw()
+        finally:
+            self._after = self.after(1000 // FRAME_RATE, self.refresh)
+
+    def _draw(self) -> None:
+        for slot in range(self.monitor.slots):
+            try:
+                stats = self.monitor.read_slot(slot)
+            except MonitorError:
+                stats = self._slots[slot]
+                name = f"Worker {slot} (stale)"
+                if stats is not None:
+                    self.tree.item(str(slot), values=_row(name, stats), tags=("stale",))
+                else:
+                    self.tree.item(str(slot), values=(name,), tags=("stale",))
+                continue
+
+            if stats is not None:
+                self._slots[slot] = stats
+                self.tree.item(str(slot), values=_row(f"Worker {slot}", stats), tags=())
+
+        total = SlotStats.combine([stats for stats in self._slots if stats is not None])
+        self.tree.item("total", values=_row("Total", total))
+
+        most = max(total.totals) or 1
+        bar_width = HISTOGRAM_WIDTH // NUM_TOTALS
+        for i, (bar, count) in enumerate(zip(self.bars, total.totals)):
+            x = i * bar_width
+            top = HISTOGRAM_HEIGHT - HISTOGRAM_HEIGHT * count / most
+            self.histogram.coords(bar, x + 4, top, x + bar_width - 4, HISTOGRAM_HEIGHT)
+
+        # The throughput over the last frame, rather than the whole run
+        now = time.perf_counter()
+        last_time, last_coups = self._last_frame
+        rate = (total.coups - last_coups) / (now - last_time) if now > last_time else 0.0
+        self._last_frame = (now, total.coups)
+
+        running = sum(process.is_alive() for process in self.processes)
+        status = f"{running} of {len(self.processes)} workers running, {rate:,.0f} coups/s"
+        self.status_label["text"] = status
+
+    def close(self) -> None:
+        if self._after is not None:
+            self.after_cancel(self._after)
+
+        for process in self.processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+
+        self.monitor.close()
+        self.destroy()
+
+
+def _row(name: str, stats: SlotStats) -> tuple[str, ...]:
+    coups = stats.coups or 1
+    return (
+        name,
+        f"{stats.coups:,}",
+        f"{stats.coups_per_second:,.0f}",
+        f"{stats.result_counts[BetResult.PLAYER] / coups:.4f}",
+        f"{stats.result_counts[BetResult.BANKER] / coups:.4f}",
+        f"{stats.result_counts[BetResult.TIE] / coups:.4f}",
+        f"{stats.house_edge:.5f} ± {1.96 * stats.standard_error:.5f}",
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a simulation, and watch it live.")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--coups", type=int, default=10_000_000, help="coups per worker")
+    parser.add_argument(
+        "--bet", choices=[result.value for result in BetResult], default=BetResult.BANKER.value
+    )
+    args = parser.parse_args()
+
+    memory = create_monitor(args.workers)
+    try:
+        processes = [
+            multiprocessing.Process(
+                target=run_worker,
+                args=(memory.name, slot, args.coups, BetResult(args.bet)),
+                daemon=True,
+            )
+            for slot in range(args.workers)
+        ]
+        for process in processes:
+            process.start()
+
+        window = MonitorWindow(memory.name, processes)
+        window.mainloop()
+    finally:
+        memory.close()
+        memory.unlink()
@@ -2,6 +2,7 @@ from baccarat import BaccaratTable
 from baccarat import BetResult
 from baccarat import NotEnoughMoneyError
 from baccarat import Player
+from baccarat.game import configure_logging
 
 
 BET_CHOICES = {
@@ -12,6 +13,7 @@ BET_CHOICES = {
 
 
 def main(argv: list[str] | None = None) -> int:
+    configure_logging()
     player = Player(1000)
 
     table = BaccaratTable(num_decks=8)
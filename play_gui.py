@@ -1,20 +1,125 @@
+import argparse
+import queue
+import sqlite3
 import time
 import tkinter as tk
+from collections.abc import Iterable
+from collections.abc import Iterator
+from tkinter import filedialog
+from tkinter import messagebox
 from tkinter import ttk
 
+from baccarat.autoplay import AutoPlayer
+from baccarat.autoplay import AutoPlayProgress
 from baccarat.game import BaccaratTable
 from baccarat.game import BetResult
+from baccarat.game import configure_logging
 from baccarat.game import get_baccarat_value
 from baccarat.game import Player
+from baccarat.history import HistoryStore
+from baccarat.history import StoredCoup
+from baccarat.lobby import flat_bet
+from baccarat.lobby import follow_the_shoe
+from baccarat.odds import OddsReport
+from baccarat.odds import OddsWorker
+from baccarat.odds import next_coup_counts
+from baccarat.roads import BeadPlate
+from baccarat.roads import BigRoad
+from baccarat.roads import Road
+from baccarat.roads import ROWS
+from baccarat.tracing import trace_tables
+from baccarat.tracing import Tracer
+from baccarat.utils import Card
+from baccarat.utils import CARDS
+from baccarat.utils import Suit
+
+CARD_WIDTH = 60
+CARD_HEIGHT = 84
+# The space around and between the cards of a hand
+CARD_PADDING = 6
+
+CARD_COLOR = "#ffffff"
+BORDER_COLOR = "#888888"
+BACK_COLOR = "#1f4e9c"
+BACK_PATTERN_COLOR = "#6f93d0"
+RED_SUITS = (Suit.HEARTS, Suit.DIAMONDS)
+
+# The time between dealing each card, at normal speed
+DEAL_DELAY_MS = 200
+MAX_REPLAY_SPEED = 100
+
+# The time between redraws while auto playing, about 60 frames a second
+FRAME_MS = 16
+# Each takes the amount and bet type of the bet panel
+STRATEGIES = {"Flat bet": flat_bet, "Follow the shoe": follow_the_shoe}
+
+# How often to check for new odds from the odds worker
+ODDS_POLL_MS = 50
+
+# The size of a cell of the scoreboard's roads
+CELL_SIZE = 20
+RESULT_COLORS = {
+    BetResult.PLAYER: "#1f4e9c",
+    BetResult.BANKER: "#cc0000",
+    BetResult.TIE: "#2e8b3d",
+}
+
+# Bitmaps of each glyph on the cards, a string of rows with 1s for the pixels drawn
+GLYPHS = {
+    "0": "111 101 101 101 111",
+    "1": "010 110 010 010 111",
+    "2": "111 001 111 100 111",
+    "3": "111 001 111 001 111",
+    "4": "101 101 111 001 001",
+    "5": "111 100 111 001 111",
+    "6": "111 100 111 101 111",
+    "7": "111 001 001 001 001",
+    "8": "111 101 111 101 111",
+    "9": "111 101 111 001 111",
+    "J": "001 001 001 101 111",
+    "Q": "010 101 101 111 011",
+    "K": "101 101 110 101 101",
+    "A": "010 101 111 101 101",
+    Suit.SPADES.value: "0001000 0011100 0111110 1111111 1111111 0001000 0011100",
+    Suit.HEARTS.value: "0110110 1111111 1111111 1111111 0111110 0011100 0001000",
+    Suit.DIAMONDS.value: "0001000 0011100 0111110 1111111 0111110 0011100 0001000",
+    Suit.CLUBS.value: "0011100 0011100 1101011 1111111 1101011 0001000 0011100",
+}
 
 
 class Window(tk.Tk):
     table: BaccaratTable
+    tracer: Tracer | None
+    history_store: HistoryStore | None
 
-    def __init__(self):
+    def __init__(self, tracer: Tracer | None = None, trace_path: str = "trace.json"):
         super().__init__()
 
         self.table = BaccaratTable()
+        self.card_renderer = CardRenderer(self)
+
+        # Trace each round, and dump the latest rounds with F12 and on closing
+        self.tracer = tracer
+        self.trace_path = trace_path
+        if tracer is not None:
+            trace_tables(tracer)
+            tracer.instrument(Window, "deal")
+            self.bind("<F12>", lambda event: self.dump_trace())
+
+        # A hand history being replayed, a step (one card) at a time from `after`
+        self.history_store = None
+        self._replay_steps: Iterator[None] | None = None
+        self._replay_after: str | None = None
+
+        # The odds of the next coup, computed on a background thread
+        self.odds_worker = OddsWorker(self.table.rules)
+        self.odds_worker.start()
+
+        # Auto play runs on a background thread, and is shown once per frame
+        self.autoplayer: AutoPlayer | None = None
+        self._autoplay_after: str | None = None
+
+        self.protocol("WM_DELETE_WINDOW", self.close)
 
         self.title("Tkinter Baccarat")
         self.minsize(400, 200)
@@ -25,19 +130,37 @@ class Window(tk.Tk):
         self.player_sit_panel = PlayerSitPanel(self)
         self.game_panel = GamePanel(self)
         self.bet_panel = BetPanel(self)
+        self.replay_panel = ReplayPanel(self)
+        self.scoreboard = ScoreboardPanel(self)
+        self.odds_panel = OddsPanel(self)
+        self.autoplay_panel = AutoPlayPanel(self)
 
         self.player_sit_panel.grid(row=0, column=0, sticky="NSEW")
         self.game_panel.grid(row=0, column=0, sticky="NSEW")
         self.bet_panel.grid(row=1, column=0, sticky="NSEW")
+        self.replay_panel.grid(row=1, column=0, sticky="NSEW")
+        self.scoreboard.grid(row=2, column=0, sticky="NSEW")
+        self.odds_panel.grid(row=3, column=0, sticky="NSEW")
+        self.autoplay_panel.grid(row=4, column=0, sticky="NSEW")
 
         self.game_panel.grid_remove()
         self.bet_panel.grid_remove()
+        self.replay_panel.grid_remove()
+        self.scoreboard.grid_remove()
+        self.odds_panel.grid_remove()
+        self.autoplay_panel.grid_remove()
+
+        self._poll_odds()
 
     def sit_player(self, player: Player):
         self.table.seat_player(player)
         self.player_sit_panel.grid_remove()
         self.game_panel.grid()
         self.bet_panel.grid()
+        self.scoreboard.grid()
+        self.odds_panel.grid()
+        self.autoplay_panel.grid()
+        self.update_odds()
 
     def deal(self, bet: int, bet_type: str):
         self.table.place_bet(bet, BetResult(bet_type))
@@ -48,46 +171,223 @@ class Window(tk.Tk):
         self.game_panel.banker_cards.clear()
         self.update()
 
-        player_card1 = self.table.player_hand.cards[0]
-        self.game_panel.player_cards.add_card(str(player_card1), get_baccarat_value(player_card1))
+        self.game_panel.player_cards.add_card(self.table.player_hand.cards[0])
         self._deal_card_delay()
 
-        banker_card1 = self.table.banker_hand.cards[0]
-        self.game_panel.banker_cards.add_card(str(banker_card1), get_baccarat_value(banker_card1))
+        self.game_panel.banker_cards.add_card(self.table.banker_hand.cards[0])
         self._deal_card_delay()
 
-        player_card2 = self.table.player_hand.cards[1]
-        self.game_panel.player_cards.add_card(str(player_card2), get_baccarat_value(player_card2))
+        self.game_panel.player_cards.add_card(self.table.player_hand.cards[1])
         self._deal_card_delay()
 
-        banker_card2 = self.table.banker_hand.cards[1]
-        self.game_panel.banker_cards.add_card(str(banker_card2), get_baccarat_value(banker_card2))
+        self.game_panel.banker_cards.add_card(self.table.banker_hand.cards[1])
         self._deal_card_delay()
 
         player_has_drawn = self.table.player_hand.num_cards == 3
         banker_has_drawn = self.table.banker_hand.num_cards == 3
 
         if player_has_drawn:
-            player_card3 = self.table.player_hand.cards[2]
-            self.game_panel.player_cards.add_card(
-                str(player_card3), get_baccarat_value(player_card3)
-            )
+            self.game_panel.player_cards.add_card(self.table.player_hand.cards[2])
             self._deal_card_delay()
 
         if banker_has_drawn:
-            banker_card3 = self.table.banker_hand.cards[2]
-            self.game_panel.banker_cards.add_card(
-                str(banker_card3), get_baccarat_value(banker_card3)
-            )
+            self.game_panel.banker_cards.add_card(self.table.banker_hand.cards[2])
             self._deal_card_delay()
 
         self.game_panel.update_winner(self.table.results[-1].value)
+        self.scoreboard.add(self.table.results[-1])
         self.bet_panel.update_bankroll(self.table.player.bankroll)
+        self.update_odds()
+
+    def start_autoplay(self, amount: int, bet_type: str, strategy: str, rounds, goal):
+        """Play rounds on a background thread until a number of rounds or a bankroll
+        goal, showing the latest round once per frame."""
+        self.game_panel.deal_button["state"] = "disabled"
+        self.autoplayer = AutoPlayer(
+            self.table,
+            STRATEGIES[strategy](amount, BetResult(bet_type)),
+            rounds,
+            goal,
+            interval=FRAME_MS / 1000,
+        )
+        self.autoplayer.start()
+        self._poll_autoplay()
+
+    def stop_autoplay(self):
+        if self.autoplayer is not None:
+            self.autoplayer.stop()
+
+    def _poll_autoplay(self):
+        """Show the progress of the auto player since the last frame, all at once."""
+        self._autoplay_after = None
+        if self.autoplayer is None:
+            return
+
+        latest: AutoPlayProgress | None = None
+        results: list[BetResult] = []
+        while True:
+            try:
+                progress = self.autoplayer.progress.get_nowait()
+            except queue.Empty:
+                break
+            results.extend(progress.results)
+            latest = progress
+
+        if latest is not None:
+            self.scoreboard.extend(results)
+            if latest.coup is not None:
+                self.game_panel.player_cards.show(latest.coup.player_cards)
+                self.game_panel.banker_cards.show(latest.coup.banker_cards)
+                self.game_panel.update_winner(latest.coup.result.value)
+            self.bet_panel.update_bankroll(latest.bankroll)
+            self.autoplay_panel.update_progress(latest)
+
+            if latest.finished is not None:
+                self.autoplayer = None
+                self.game_panel.deal_button["state"] = "normal"
+                self.update_odds()
+                return
+
+        self._autoplay_after = self.after(FRAME_MS, self._poll_autoplay)
+
+    def update_odds(self):
+        """Ask the odds worker for the odds of the next coup, from the cards left in the
+        shoe, or the whole shoe if it's about to be reshuffled."""
+        self.odds_panel.calculating()
+        self.odds_worker.submit(next_coup_counts(self.table.shoe))
+
+    def _poll_odds(self):
+        report = self.odds_worker.latest()
+        if report is not None:
+            self.odds_panel.update_odds(report)
+        error = self.odds_worker.latest_error()
+        if error is not None:
+            self.odds_panel.failed(error)
+
+        self._odds_after = self.after(ODDS_POLL_MS, self._poll_odds)
 
     def _deal_card_delay(self):
         time.sleep(0.2)
         self.update()
 
+    def start_replay(self, path: str):
+        """Replay a hand history recorded by `HistoryStore`, from its first coup. The file
+        is opened read only, so replaying it leaves it exactly as it was."""
+        try:
+            history_store = HistoryStore(path, read_only=True)
+        except (sqlite3.Error, ValueError) as error:
+            messagebox.showerror("Replay a hand history", f"Couldn't open {path}: {error}")
+            return
+
+        if self.history_store is not None:
+            self.history_store.close()
+        self.history_store = history_store
+
+        self.player_sit_panel.grid_remove()
+        self.game_panel.deal_button.grid_remove()
+        self.game_panel.grid()
+        self.replay_panel.grid()
+        self.scoreboard.grid()
+
+        self.replay_panel.update_position(0, self.history_store.last_id)
+        self.seek_replay(1)
+
+    def seek_replay(self, coup_id: int):
+        """Jump to a coup of the replay, by id, and carry on from there.
+
+        The coups are streamed from the store, which finds the first through its
+        primary key, so a jump takes the same time anywhere in a large history. The
+        scoreboard is rebuilt with the results of every coup before it.
+        """
+        if self.history_store is None:
+            return
+
+        self._cancel_replay_step()
+        self.scoreboard.clear()
+        self.scoreboard.extend(self.history_store.results(end=coup_id))
+        self._replay_steps = self._replay(self.history_store.coups(start=coup_id))
+        self._replay_step()
+
+    def pause_replay(self):
+        self._cancel_replay_step()
+
+    def resume_replay(self):
+        self._cancel_replay_step()
+        self._schedule_replay_step()
+
+    def _replay(self, coups: Iterator[StoredCoup]) -> Iterator[None]:
+        """Show each coup a card at a time, yielding after each step."""
+        player_cards = self.game_panel.player_cards
+        banker_cards = self.game_panel.banker_cards
+
+        for stored_coup in coups:
+            coup = stored_coup.coup
+            self.replay_panel.update_position(stored_coup.id)
+            self.game_panel.winner_label["text"] = ""
+            player_cards.clear()
+            banker_cards.clear()
+            yield
+
+            for i in range(3):
+                if i < len(coup.player_cards):
+                    player_cards.add_card(coup.player_cards[i])
+                    yield
+                if i < len(coup.banker_cards):
+                    banker_cards.add_card(coup.banker_cards[i])
+                    yield
+
+            self.game_panel.update_winner(coup.result.value)
+            self.scoreboard.add(coup.result)
+            yield
+
+        self.replay_panel.finish()
+
+    def _replay_step(self):
+        self._replay_after = None
+        if self._replay_steps is None:
+            return
+
+        try:
+            next(self._replay_steps)
+        except StopIteration:
+            self._replay_steps = None
+            return
+
+        self._schedule_replay_step()
+
+    def _schedule_replay_step(self):
+        if self._replay_steps is not None and not self.replay_panel.paused:
+            delay = max(1, round(DEAL_DELAY_MS / self.replay_panel.speed))
+            self._replay_after = self.after(delay, self._replay_step)
+
+    def _cancel_replay_step(self):
+        if self._replay_after is not None:
+            self.after_cancel(self._replay_after)
+            self._replay_after = None
+
+    def dump_trace(self):
+        if self.tracer is not None:
+            self.tracer.dump(self.trace_path)
+
+    def close(self):
+        if self._autoplay_after is not None:
+            self.after_cancel(self._autoplay_after)
+        if self.autoplayer is not None:
+            self.autoplayer.stop(timeout=1)
+        self.after_cancel(self._odds_after)
+        self.odds_worker.stop(timeout=1)
+
+        if self.tracer is not None:
+            self.dump_trace()
+            self.tracer.restore()
+
+        self._cancel_replay_step()
+        self._replay_steps = None
+        if self.history_store is not None:
+            self.history_store.close()
+
+        self.destroy()
+
 
 class PlayerSitPanel(ttk.Frame):
     """Ask the player to sit at the table and enter their bankroll."""
@@ -103,6 +403,9 @@ class PlayerSitPanel(ttk.Frame):
         self.sit_label = ttk.Label(self, text="Sit at the table")
         self.bankroll_label = ttk.Label(self, text="Bankroll")
         self.sit_button = ttk.Button(self, text="Sit", command=self.sit_player)
+        self.replay_button = ttk.Button(
+            self, text="Replay a hand history...", command=self.choose_replay
+        )
 
         self.bankroll_entry = ttk.Entry(self)
         self.bankroll_entry.insert(0, "1000")
@@ -111,6 +414,7 @@ class PlayerSitPanel(ttk.Frame):
         self.bankroll_label.grid(row=1, column=0, sticky="W")
         self.bankroll_entry.grid(row=1, column=1, sticky="EW")
         self.sit_button.grid(row=2, column=0, columnspan=2, sticky="EW")
+        self.replay_button.grid(row=3, column=0, columnspan=2, sticky="EW")
 
     def sit_player(self):
         bankroll = int(self.bankroll_entry.get())
@@ -118,6 +422,14 @@ class PlayerSitPanel(ttk.Frame):
         self.master.sit_player(player)
         self.master.bet_panel.update_bankroll(bankroll)
 
+    def choose_replay(self):
+        path = filedialog.askopenfilename(
+            title="Replay a hand history",
+            filetypes=[("Hand histories", "*.db"), ("All files", "*")],
+        )
+        if path:
+            self.master.start_replay(path)
+
 
 class GamePanel(ttk.Frame):
     """The main game panel."""
@@ -130,9 +442,9 @@ class GamePanel(ttk.Frame):
         self.columnconfigure(1, weight=1)
 
         self.player_card = ttk.Label(self, text="Player")
-        self.player_cards = HandPanel(self)
+        self.player_cards = HandPanel(self, container.card_renderer)
         self.banker_card = ttk.Label(self, text="Banker")
-        self.banker_cards = HandPanel(self)
+        self.banker_cards = HandPanel(self, container.card_renderer)
         self.winner_label = ttk.Label(self, text="")
         self.deal_button = ttk.Button(self, text="Deal", command=self.deal)
 
@@ -157,6 +469,333 @@ class GamePanel(ttk.Frame):
             self.winner_label["text"] = f"{winner} wins!"
 
 
+class ReplayPanel(ttk.Frame):
+    """The controls of a replay: its speed, pausing, and jumping to a coup."""
+
+    master: Window
+    paused: bool
+
+    def __init__(self, container):
+        super().__init__(container)
+        self.paused = False
+        self.total = 0
+
+        self.columnconfigure(1, weight=1)
+
+        self.speed_label = ttk.Label(self, text="Speed")
+        self.speed_scale = tk.Scale(
+            self, from_=1, to=MAX_REPLAY_SPEED, orient="horizontal", showvalue=True
+        )
+        self.pause_button = ttk.Button(self, text="Pause", command=self.toggle_pause)
+        self.coup_label = ttk.Label(self, text="Coup")
+        self.coup_entry = ttk.Entry(self, width=10)
+        self.go_button = ttk.Button(self, text="Go", command=self.seek)
+        self.position_label = ttk.Label(self, text="")
+
+        self.coup_entry.bind("<Return>", lambda event: self.seek())
+
+        self.speed_label.grid(row=0, column=0, sticky="W")
+        self.speed_scale.grid(row=0, column=1, columnspan=2, sticky="EW")
+        self.pause_button.grid(row=0, column=3, sticky="EW")
+        self.coup_label.grid(row=1, column=0, sticky="W")
+        self.coup_entry.grid(row=1, column=1, sticky="EW")
+        self.go_button.grid(row=1, column=2, sticky="EW")
+        self.position_label.grid(row=1, column=3, sticky="E")
+
+    @property
+    def speed(self) -> int:
+        """How many times faster than normal to deal."""
+        return int(self.speed_scale.get())
+
+    def toggle_pause(self):
+        self.paused = not self.paused
+        self.pause_button["text"] = "Play" if self.paused else "Pause"
+        if self.paused:
+            self.master.pause_replay()
+        else:
+            self.master.resume_replay()
+
+    def seek(self):
+        try:
+            coup_id = int(self.coup_entry.get())
+        except ValueError:
+            return
+
+        self.master.seek_replay(max(coup_id, 1))
+
+    def update_position(self, coup_id: int, total: int | None = None):
+        if total is not None:
+            self.total = total
+        self.position_label["text"] = f"Coup {coup_id:,} of {self.total:,}"
+
+    def finish(self):
+        self.position_label["text"] = f"End of the {self.total:,} coups"
+
+
+class AutoPlayPanel(ttk.Frame):
+    """Play many rounds automatically, with the bet of the bet panel."""
+
+    master: Window
+
+    def __init__(self, container):
+        super().__init__(container)
+        self.columnconfigure(1, weight=1)
+
+        self.strategy_label = ttk.Label(self, text="Strategy")
+        self.strategy = tk.StringVar(value=next(iter(STRATEGIES)))
+        self.strategy_combobox = ttk.Combobox(
+            self, textvariable=self.strategy, values=list(STRATEGIES), state="readonly"
+        )
+        self.rounds_label = ttk.Label(self, text="Rounds")
+        self.rounds_entry = ttk.Entry(self)
+        self.rounds_entry.insert(0, "1000")
+        self.goal_label = ttk.Label(self, text="Bankroll goal")
+        self.goal_entry = ttk.Entry(self)
+        self.start_button = ttk.Button(self, text="Auto play", command=self.toggle)
+        self.progress_label = ttk.Label(self, text="")
+
+        self.strategy_label.grid(row=0, column=0, sticky="W")
+        self.strategy_combobox.grid(row=0, column=1, sticky="EW")
+        self.rounds_label.grid(row=1, column=0, sticky="W")
+        self.rounds_entry.grid(row=1, column=1, sticky="EW")
+        self.goal_label.grid(row=2, column=0, sticky="W")
+        self.goal_entry.grid(row=2, column=1, sticky="EW")
+        self.start_button.grid(row=3, column=0, columnspan=2, sticky="EW")
+        self.progress_label.grid(row=4, column=0, columnspan=2, sticky="W")
+
+    def toggle(self):
+        if self.master.autoplayer is not None:
+            self.master.stop_autoplay()
+            return
+
+        try:
+            amount = int(self.master.bet_panel.bet_entry.get())
+            rounds = int(self.rounds_entry.get()) if self.rounds_entry.get() else None
+            goal = int(self.goal_entry.get()) if self.goal_entry.get() else None
+        except ValueError:
+            self.progress_label["text"] = "The bet, rounds and goal must be whole numbers"
+            return
+
+        self.start_button["text"] = "Stop"
+        self.master.start_autoplay(
+            amount, self.master.bet_panel.bet_type.get(), self.strategy.get(), rounds, goal
+        )
+
+    def update_progress(self, progress: AutoPlayProgress):
+        rounds = progress.rounds or 1
+        counts = ", ".join(
+            f"{result.value} {count / rounds:.2%}"
+            for result, count in progress.result_counts.items()
+        )
+        edge = -progress.won / progress.wagered if progress.wagered else 0.0
+        text = f"{progress.rounds:,} rounds, won ${progress.won:,}, edge {edge:.3%}. {counts}"
+        if progress.finished is not None:
+            text = f"{progress.finished}. {text}"
+            self.start_button["text"] = "Auto play"
+
+        self.progress_label["text"] = text
+
+
+class OddsPanel(ttk.Frame):
+    """The exact odds of the next coup, from the cards left in the shoe."""
+
+    def __init__(self, container):
+        super().__init__(container)
+        for column in range(3):
+            self.columnconfigure(column, weight=1)
+
+        self.headings = [
+            ttk.Label(self, text=text) for text in ("Bet", "Probability", "Expected value")
+        ]
+        self.rows = {
+            result: [ttk.Label(self, text=result.value), ttk.Label(self), ttk.Label(self)]
+            for result in BetResult
+        }
+        self.status_label = ttk.Label(self, text="")
+
+        for column, label in enumerate(self.headings):
+            label.grid(row=0, column=column, sticky="W")
+        for row, labels in enumerate(self.rows.values(), start=1):
+            for column, label in enumerate(labels):
+                label.grid(row=row, column=column, sticky="W")
+        self.status_label.grid(row=len(self.rows) + 1, column=0, columnspan=3, sticky="W")
+
+    def calculating(self):
+        self.status_label["text"] = "Calculating..."
+
+    def failed(self, error: Exception):
+        self.status_label["text"] = f"Couldn't calculate the odds: {error}"
+
+    def update_odds(self, report: OddsReport):
+        for result, (_, probability, expected_value) in self.rows.items():
+            probability["text"] = f"{float(report.probabilities[result]):.4%}"
+            expected_value["text"] = f"{float(report.expected_values[result]):+.4%}"
+        self.status_label["text"] = f"With {sum(report.counts)} cards left in the shoe"
+
+
+class ScoreboardPanel(ttk.Frame):
+    """The bead plate and big road of every result of the session."""
+
+    def __init__(self, container) -> None:
+        super().__init__(container)
+        self.columnconfigure(0, weight=1)
+
+        self.bead_plate = RoadView(self, BeadPlate(), filled=True)
+        self.big_road = RoadView(self, BigRoad(), filled=False)
+        self.count_label = ttk.Label(self, text="")
+
+        self.bead_plate.grid(row=0, column=0, sticky="EW")
+        self.big_road.grid(row=1, column=0, sticky="EW")
+        self.count_label.grid(row=2, column=0, sticky="W")
+
+        self.coups = 0
+
+    def clear(self) -> None:
+        """Forget every result."""
+        self.coups = 0
+        self.bead_plate.clear()
+        self.big_road.clear()
+        self.count_label["text"] = ""
+
+    def add(self, result: BetResult) -> None:
+        """Add the result of the latest coup to both roads."""
+        self.extend((result,))
+
+    def extend(self, results: Iterable[BetResult]) -> None:
+        """Add the results of several coups to both roads, redrawing once."""
+        results = list(results)
+        self.coups += len(results)
+        self.bead_plate.extend(results)
+        self.big_road.extend(results)
+        self.count_label["text"] = f"{self.coups:,} coups"
+
+
+class RoadView(ttk.Frame):
+    """A road drawn on a scrolling canvas.
+
+    The canvas scrolls over the whole road, but only holds the items of the columns in
+    view: columns are drawn as they scroll into view and deleted as they scroll out, and
+    a new result only draws the cell it changed.
+    """
+
+    road: Road
+    drawn: set[int]
+
+    def __init__(self, container, road: Road, filled: bool) -> None:
+        super().__init__(container)
+        self.road = road
+        self.filled = filled
+        self.drawn = set()
+
+        self.columnconfigure(0, weight=1)
+
+        self.canvas = tk.Canvas(
+            self,
+            width=30 * CELL_SIZE,
+            height=ROWS * CELL_SIZE,
+            background="#ffffff",
+            highlightthickness=0,
+            xscrollincrement=CELL_SIZE,
+        )
+        self.scrollbar = ttk.Scrollbar(self, orient="horizontal", command=self.canvas.xview)
+        self.canvas.configure(xscrollcommand=self._on_scroll, scrollregion=(0, 0, 0, 0))
+        self.canvas.bind("<Configure>", lambda event: self._draw_visible())
+        self.canvas.bind("<MouseWheel>", lambda event: self._scroll(-event.delta))
+        self.canvas.bind("<Button-4>", lambda event: self._scroll(-1))
+        self.canvas.bind("<Button-5>", lambda event: self._scroll(1))
+
+        self.canvas.grid(row=0, column=0, sticky="EW")
+        self.scrollbar.grid(row=1, column=0, sticky="EW")
+
+    def clear(self) -> None:
+        """Forget every result, and delete every item."""
+        self.road = type(self.road)()
+        self.drawn.clear()
+        self.canvas.delete("all")
+        self.canvas.configure(scrollregion=(0, 0, 0, 0))
+        self.canvas.xview_moveto(0)
+
+    def add(self, result: BetResult) -> None:
+        """Add a result to the road, following it if the view is at the end."""
+        self.extend((result,))
+
+    def extend(self, results: Iterable[BetResult]) -> None:
+        """Add results to the road, following them if the view is at the end. The view is
+        only scrolled and redrawn once, however many results there are."""
+
+        following = self.canvas.xview()[1] >= 1.0
+        for result in results:
+            position = self.road.add(result)
+            if position is not None and position[0] in self.drawn:
+                self._draw_cell(*position)
+
+        self.canvas.configure(scrollregion=(0, 0, len(self.road) * CELL_SIZE, ROWS * CELL_SIZE))
+        if following:
+            self.canvas.xview_moveto(1.0)
+        self._draw_visible()
+
+    def _scroll(self, direction: int) -> None:
+        self.canvas.xview_scroll(1 if direction > 0 else -1, "units")
+
+    def _on_scroll(self, first: str, last: str) -> None:
+        self.scrollbar.set(first, last)
+        self._draw_visible()
+
+    def _visible_columns(self) -> range:
+        left = int(self.canvas.canvasx(0)) // CELL_SIZE
+        right = int(self.canvas.canvasx(self.canvas.winfo_width())) // CELL_SIZE + 1
+        return range(max(left, 0), min(right, len(self.road)))
+
+    def _draw_visible(self) -> None:
+        visible = self._visible_columns()
+
+        for column in [column for column in self.drawn if column not in visible]:
+            self.canvas.delete(f"column{column}")
+            self.drawn.discard(column)
+
+        for column in visible:
+            if column not in self.drawn:
+                for row in range(len(self.road.columns[column])):
+                    self._draw_cell(column, row)
+                self.drawn.add(column)
+
+    def _draw_cell(self, column: int, row: int) -> None:
+        result, ties = self.road.columns[column][row]
+        color = RESULT_COLORS[result]
+        tags = (f"column{column}", f"cell{column}_{row}")
+        x = column * CELL_SIZE
+        y = row * CELL_SIZE
+
+        self.canvas.delete(tags[1])
+        self.canvas.create_oval(
+            x + 2,
+            y + 2,
+            x + CELL_SIZE - 2,
+            y + CELL_SIZE - 2,
+            fill=color if self.filled else "",
+            outline=color,
+            width=1 if self.filled else 2,
+            tags=tags,
+        )
+        if self.filled:
+            self.canvas.create_text(
+                x + CELL_SIZE // 2,
+                y + CELL_SIZE // 2,
+                text=result.value[0],
+                fill="#ffffff",
+                tags=tags,
+            )
+        elif ties:
+            tie_color = RESULT_COLORS[BetResult.TIE]
+            self.canvas.create_line(
+                x + 3, y + CELL_SIZE - 3, x + CELL_SIZE - 3, y + 3, fill=tie_color, tags=tags
+            )
+            if ties > 1:
+                self.canvas.create_text(
+                    x + CELL_SIZE // 2, y + CELL_SIZE // 2, text=str(ties), tags=tags
+                )
+
+
 class BetPanel(ttk.Frame):
     bankroll: int
 
@@ -196,28 +835,42 @@ class BetPanel(ttk.Frame):
 
 
 class HandPanel(ttk.Frame):
-    """A layout for 3 cards, 2 next to each other and 1 above."""
+    """A layout for 3 cards on a canvas, 2 next to each other and 1 below.
+
+    Each card is an image item made once, which is shown with a card's face as it's
+    dealt and hidden when the hand is cleared.
+    """
 
-    cards: list[str]
+    cards: list[Card]
     total: int
 
-    def __init__(self, container) -> None:
+    def __init__(self, container, renderer: "CardRenderer") -> None:
         super().__init__(container)
+        self.renderer = renderer
         self.cards = []
         self.total = 0
 
         self.columnconfigure(0, weight=1)
-        self.columnconfigure(1, weight=1)
 
-        self.card1 = ttk.Label(self, text="", width=10)
-        self.card2 = ttk.Label(self, text="")
-        self.card3 = ttk.Label(self, text="")
+        self.canvas = tk.Canvas(
+            self,
+            width=2 * CARD_WIDTH + 3 * CARD_PADDING,
+            height=2 * CARD_HEIGHT + 3 * CARD_PADDING,
+            highlightthickness=0,
+        )
+        positions = [
+            (CARD_PADDING, CARD_PADDING),
+            (CARD_WIDTH + 2 * CARD_PADDING, CARD_PADDING),
+            ((CARD_WIDTH + 3 * CARD_PADDING) // 2, CARD_HEIGHT + 2 * CARD_PADDING),
+        ]
+        self.card_items = [
+            self.canvas.create_image(x, y, anchor="nw", image=renderer.back, state="hidden")
+            for x, y in positions
+        ]
         self.total_label = ttk.Label(self, text="")
 
-        self.card1.grid(row=0, column=0)
-        self.card2.grid(row=0, column=1)
-        self.card3.grid(row=1, column=0, columnspan=2)
-        self.total_label.grid(row=2, column=0, columnspan=2)
+        self.canvas.grid(row=0, column=0)
+        self.total_label.grid(row=1, column=0)
 
     def clear(self) -> None:
         """Clear the cards and total."""
@@ -225,30 +878,125 @@ class HandPanel(ttk.Frame):
         self.cards = []
         self.total = 0
 
-        self.card1["text"] = ""
-        self.card2["text"] = ""
-        self.card3["text"] = ""
+        for item in self.card_items:
+            self.canvas.itemconfigure(item, state="hidden")
         self.total_label["text"] = ""
 
-    def add_card(self, card: str, card_value: int) -> None:
+    def show(self, cards: Iterable[Card]) -> None:
+        """Show a whole hand at once."""
+        self.clear()
+        for card in cards:
+            self.add_card(card)
+
+    def add_card(self, card: Card) -> None:
         """Add a card to the hand and update the total."""
 
+        item = self.card_items[len(self.cards)]
         self.cards.append(card)
-        if len(self.cards) >= 1:
-            self.card1["text"] = self.cards[0]
+        self.canvas.itemconfigure(item, image=self.renderer.face(card), state="normal")
 
-        if len(self.cards) >= 2:
-            self.card2["text"] = self.cards[1]
-
-        if len(self.cards) >= 3:
-            self.card3["text"] = self.cards[2]
-
-        self.total += card_value
+        self.total += get_baccarat_value(card)
         self.total = self.total % 10
 
         self.total_label["text"] = str(self.total)
 
 
+class CardRenderer:
+    """The faces of the 52 cards and a card back, rendered once into images.
+
+    The images belong to the Tk interpreter of `master`, and are kept here so they
+    aren't garbage collected while a canvas shows them.
+    """
+
+    faces: dict[Card, tk.PhotoImage]
+    back: tk.PhotoImage
+
+    def __init__(self, master: tk.Misc) -> None:
+        self.faces = {card: _photo_image(master, _face_pixels(card)) for card in CARDS}
+        self.back = _photo_image(master, _back_pixels())
+
+    def face(self, card: Card) -> tk.PhotoImage:
+        """The image of a card's face."""
+        return self.faces[card]
+
+
+Pixels = list[list[str]]
+
+
+def _blank_card(color: str) -> Pixels:
+    pixels = [[color] * CARD_WIDTH for _ in range(CARD_HEIGHT)]
+    for x in range(CARD_WIDTH):
+        pixels[0][x] = pixels[-1][x] = BORDER_COLOR
+    for row in pixels:
+        row[0] = row[-1] = BORDER_COLOR
+
+    return pixels
+
+
+def _draw_glyph(pixels: Pixels, glyph: str, x: int, y: int, scale: int, color: str) -> None:
+    """Draw a glyph with its top left corner at (x, y), or its bottom right corner
+    upside down if the scale is negative."""
+    rows = GLYPHS[glyph].split()
+    size = abs(scale)
+    for row_index, row in enumerate(rows):
+        for column_index, bit in enumerate(row):
+            if bit != "1":
+                continue
+
+            for dy in range(size):
+                for dx in range(size):
+                    pixels[y + scale * row_index + (dy if scale > 0 else -dy)][
+                        x + scale * column_index + (dx if scale > 0 else -dx)
+                    ] = color
+
+
+def _face_pixels(card: Card) -> Pixels:
+    pixels = _blank_card(CARD_COLOR)
+    color = "#cc0000" if card.suit in RED_SUITS else "#000000"
+    rank = str(card.value.value)
+    suit = card.suit.value
+
+    # The rank and a small suit in the top left corner, and upside down in the bottom right
+    for i, glyph in enumerate(rank):
+        _draw_glyph(pixels, glyph, 4 + 8 * i, 4, 2, color)
+        _draw_glyph(pixels, glyph, CARD_WIDTH - 5 - 8 * i, CARD_HEIGHT - 5, -2, color)
+    _draw_glyph(pixels, suit, 4, 16, 1, color)
+    _draw_glyph(pixels, suit, CARD_WIDTH - 5, CARD_HEIGHT - 17, -1, color)
+
+    # A large suit in the middle
+    _draw_glyph(pixels, suit, (CARD_WIDTH - 28) // 2, (CARD_HEIGHT - 28) // 2, 4, color)
+    return pixels
+
+
+def _back_pixels() -> Pixels:
+    pixels = _blank_card(BACK_COLOR)
+    for y in range(4, CARD_HEIGHT - 4):
+        for x in range(4, CARD_WIDTH - 4):
+            if (x + y) % 8 == 0 or (x - y) % 8 == 0:
+                pixels[y][x] = BACK_PATTERN_COLOR
+
+    return pixels
+
+
+def _photo_image(master: tk.Misc, pixels: Pixels) -> tk.PhotoImage:
+    """Make an image from rows of colors, in one call to Tk."""
+    image = tk.PhotoImage(master=master, width=CARD_WIDTH, height=CARD_HEIGHT)
+    image.put(" ".join("{" + " ".join(row) + "}" for row in pixels))
+    return image
+
+
 if __name__ == "__main__":
-    window = Window()
+    parser = argparse.ArgumentParser(description="Play baccarat.")
+    parser.add_argument("--replay", metavar="PATH", help="replay a hand history")
+    parser.add_argument(
+        "--trace",
+        metavar="PATH",
+        help="record a timeline of each round, written to PATH with F12 and on closing",
+    )
+    args = parser.parse_args()
+    configure_logging()
+
+    window = Window(Tracer(), args.trace) if args.trace else Window()
+    if args.replay:
+        window.start_replay(args.replay)
     window.mainloop()
@@ -0,0 +1,68 @@
+"""Test playing a table automatically."""
+from baccarat.autoplay import AutoPlayer
+from baccarat.game import BaccaratTable
+from baccarat.game import BetResult
+from baccarat.game import Player
+from baccarat.lobby import flat_bet
+from baccarat.lobby import follow_the_shoe
+
+
+def _table(bankroll):
+    table = BaccaratTable(num_decks=1, verbose=False)
+    table.seat_player(Player(bankroll))
+    return table
+
+
+def _reports(player):
+    reports = []
+    while not player.progress.empty():
+        reports.append(player.progress.get())
+
+    return reports
+
+
+def test_rounds():
+    table = _table(100_000)
+    player = AutoPlayer(table, flat_bet(10, BetResult.PLAYER), rounds=500, interval=0)
+    final = player.run()
+
+    assert final.finished == "Played 500 rounds"
+    assert final.rounds == 500
+    assert final.wagered == 5000
+    assert final.bankroll == 100_000 + final.won == table.player.bankroll
+    assert sum(final.result_counts.values()) == 500
+    assert final.coup.result is table.results[-1]
+
+    # Every result is reported once, across the reports
+    reports = _reports(player)
+    assert reports[-1] == final
+    assert [result for report in reports for result in report.results] == table.results
+
+
+def test_goal_and_broke():
+    table = _table(1000)
+    final = AutoPlayer(table, follow_the_shoe(100), goal=1100).run()
+    assert final.finished in ("Reached the goal", "Not enough money for the bets")
+    assert final.bankroll >= 1100 or final.bankroll < 100
+
+
+def test_thread():
+    table = _table(10**9)
+    table.verbose = True
+    player = AutoPlayer(table, flat_bet(10), interval=0.01)
+    player.start()
+    first = player.progress.get(timeout=10)
+    player.stop(timeout=10)
+
+    assert first.finished is None
+    assert _reports(player)[-1].finished == "Stopped"
+    assert table.verbose
+
+
+def test_follow_the_shoe():
+    table = _table(1000)
+    strategy = follow_the_shoe(10)
+    assert list(strategy(table)) == [(10, BetResult.BANKER)]
+
+    table.results.extend([BetResult.PLAYER, BetResult.TIE])
+    assert list(strategy(table)) == [(10, BetResult.PLAYER)]
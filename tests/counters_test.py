@@ -0,0 +1,124 @@
+"""Test the counters of the drawing rules' paths."""
+import pytest
+
+from baccarat.counters import NUM_TOTALS
+from baccarat.counters import PLAYER_STOOD
+from baccarat.counters import RuleCounters
+from baccarat.game import BaccaratTable
+from baccarat.game import BetResult
+from baccarat.game import deal_coup
+from baccarat.game import get_baccarat_value
+from baccarat.game import Player
+from baccarat.lobby import flat_bet
+from baccarat.lobby import Lobby
+from baccarat.utils import Card
+from baccarat.utils import Shoe
+from baccarat.utils import Suit
+from baccarat.utils import Value
+
+
+@pytest.fixture
+def coups():
+    shoe = Shoe(8)
+    shoe.shuffle()
+    coups = []
+    while shoe.num_cards >= 6:
+        coups.append(deal_coup(shoe))
+
+    return coups
+
+
+def _two_card_total(cards):
+    return (get_baccarat_value(cards[0]) + get_baccarat_value(cards[1])) % 10
+
+
+def test_counts(coups):
+    counters = RuleCounters()
+    for coup in coups:
+        counters.add_coup(coup)
+
+    assert counters.coups == len(coups)
+    assert counters.mismatches() == []
+
+    totals = counters.totals_matrix()
+    assert len(totals) == NUM_TOTALS and all(len(row) == NUM_TOTALS for row in totals)
+    naturals = sum(
+        totals[player][banker]
+        for player in range(NUM_TOTALS)
+        for banker in range(NUM_TOTALS)
+        if player >= 8 or banker >= 8
+    )
+    assert naturals == sum(coup.natural for coup in coups)
+
+    player = counters.player_matrix()
+    assert sum(drew for _, drew in player) == sum(len(coup.player_cards) == 3 for coup in coups)
+
+    stood = counters.banker_matrix(False)
+    drew = counters.banker_matrix(True)
+    assert len(drew) == NUM_TOTALS and all(len(row) == PLAYER_STOOD + 1 for row in drew)
+    assert sum(map(sum, stood)) + sum(map(sum, drew)) == len(coups) - naturals
+
+    # Banker 4 against a player third card of 2 to 7
+    expected = sum(
+        len(coup.player_cards) == 3
+        and 2 <= get_baccarat_value(coup.player_cards[2]) <= 7
+        and _two_card_total(coup.banker_cards) == 4
+        and not coup.natural
+        for coup in coups
+    )
+    assert sum(drew[4][2:8]) == expected
+    assert sum(stood[4][2:8]) == 0
+
+
+def test_mismatches():
+    counters = RuleCounters()
+    four = Card(Value.FOUR, Suit.HEARTS)
+    ten = Card(Value.TEN, Suit.HEARTS)
+
+    # The player stands on 4, and the banker on 4
+    counters.add((four, ten), (four, ten))
+    assert counters.mismatches() == [("player", 4, None, 1), ("banker", 4, None, 1)]
+
+
+def test_merge_and_export(coups):
+    counters = RuleCounters()
+    for coup in coups:
+        counters.add_coup(coup)
+
+    merged = RuleCounters()
+    merged.merge(counters)
+    merged.merge(counters)
+
+    assert merged.coups == 2 * len(coups)
+    assert merged.to_dict()["totals"] == [
+        [2 * count for count in row] for row in counters.totals_matrix()
+    ]
+    assert set(counters.to_dict()) == {"coups", "totals", "player", "banker_stood", "banker_drew"}
+
+
+def test_attach_to_table():
+    table = BaccaratTable(num_decks=1, verbose=False)
+    table.seat_player(Player(10_000))
+    counters = RuleCounters()
+    counters.attach(table)
+
+    for _ in range(20):
+        table.place_bets([(10, BetResult.BANKER)])
+        table.play()
+
+    assert counters.coups == 20
+    assert counters.mismatches() == []
+
+
+def test_lobby_metrics():
+    lobby = Lobby(num_decks=1, count_rules=True)
+    for _ in range(3):
+        lobby.add_table(Player(10_000), flat_bet(10))
+
+    lobby.run(30)
+
+    metrics = lobby.metrics()
+    assert metrics["rounds"] == 90
+    assert metrics["rules"]["coups"] == 90
+    assert sum(metrics["results"].values()) == 90
+    assert "rules" not in Lobby().metrics()
@@ -1,14 +1,27 @@
 """Test the overall game logic."""
+from fractions import Fraction
+
 import pytest
 
 from baccarat.game import BaccaratHand
 from baccarat.game import BaccaratTable
+from baccarat.game import Bet
+from baccarat.game import BetLimits
 from baccarat.game import BetResult
 from baccarat.game import check_natural
+from baccarat.game import deal_coup
+from baccarat.game import EventType
 from baccarat.game import get_result
+from baccarat.game import NotEnoughMoneyError
+from baccarat.game import PayoutRules
 from baccarat.game import Player
+from baccarat.game import Rounding
 from baccarat.game import settle_bet
+from baccarat.game import settle_bets
+from baccarat.game import settle_stakes
+from baccarat.game import TableLimitError
 from baccarat.utils import Card
+from baccarat.utils import Shoe
 from baccarat.utils import Suit
 from baccarat.utils import Value
 
@@ -40,6 +53,66 @@ def test_making_bet(table, player):
     assert table.bets[0].result == BetResult.PLAYER
 
 
+def test_making_bets(table, player):
+    """Test making many bets at once."""
+    table.seat_player(player)
+    table.place_bets([(10, BetResult.PLAYER), (5, BetResult.TIE)])
+
+    assert list(table.bets) == [(10, BetResult.PLAYER), (5, BetResult.TIE)]
+    assert player.bankroll == 85
+
+
+def test_making_bets_is_all_or_nothing(player):
+    """Test a batch with a bad bet places no bets."""
+    table = BaccaratTable(num_decks=1, limits=BetLimits(5, 50))
+    table.seat_player(player)
+
+    with pytest.raises(TableLimitError):
+        table.place_bets([(10, BetResult.PLAYER), (60, BetResult.BANKER)])
+    with pytest.raises(NotEnoughMoneyError):
+        table.place_bets([(50, BetResult.PLAYER), (50, BetResult.BANKER), (5, BetResult.TIE)])
+
+    assert len(table.bets) == 0
+    assert player.bankroll == 100
+
+
+def test_bet_type_limits(player):
+    """Test the limits on the total staked on a bet type."""
+    table = BaccaratTable(num_decks=1, type_limits={BetResult.TIE: BetLimits(1, 10)})
+    table.seat_player(player)
+    table.place_bet(8, BetResult.TIE)
+
+    with pytest.raises(TableLimitError):
+        table.place_bet(5, BetResult.TIE)
+    with pytest.raises(TableLimitError):
+        table.place_bets([(20, BetResult.PLAYER), (3, BetResult.TIE)])
+
+    table.place_bets([(20, BetResult.PLAYER), (2, BetResult.TIE)])
+    assert player.bankroll == 70
+
+
+def test_bet_below_minimum(player):
+    table = BaccaratTable(num_decks=1, limits=BetLimits(5, 50))
+    table.seat_player(player)
+
+    with pytest.raises(TableLimitError):
+        table.place_bet(4, BetResult.PLAYER)
+
+
+@pytest.mark.parametrize("amount", [0, -10])
+def test_bets_must_be_positive(table, player, amount):
+    """Test bets that aren't positive are rejected, whatever the table's limits."""
+    table.seat_player(player)
+
+    with pytest.raises(ValueError, match="positive"):
+        table.place_bet(amount, BetResult.PLAYER)
+    with pytest.raises(ValueError, match="positive"):
+        table.place_bets([(10, BetResult.BANKER), (amount, BetResult.PLAYER)])
+
+    assert len(table.bets) == 0
+    assert player.bankroll == 100
+
+
 def test_making_bet_with_no_player(table):
     """Test making a bet with no player seated."""
     with pytest.raises(ValueError):
@@ -110,6 +183,142 @@ def test_shoe_reset(table, player):
     assert table.banker_hand.num_cards >= 2
 
 
+def test_table_with_shared_shoe(player):
+    shoe = Shoe(1)
+    table = BaccaratTable(shoe=shoe, verbose=False)
+    table.seat_player(player)
+    table.place_bet(10, BetResult.PLAYER)
+    table.play()
+
+    assert table.shoe is shoe
+    assert shoe.num_cards < 52
+
+
+def test_close_table(player):
+    """Test a closed table hands back its shoe and can't deal from it."""
+    shoe = Shoe(1)
+    table = BaccaratTable(shoe=shoe, verbose=False)
+    table.seat_player(player)
+
+    assert not table.closed
+    assert table.close() is shoe
+    assert table.closed
+
+    table.place_bet(10, BetResult.PLAYER)
+    with pytest.raises(ValueError):
+        table.play()
+    with pytest.raises(ValueError):
+        table.close()
+
+
+def test_bounded_history(player):
+    """Test the history keeps at least, and at most twice, its bound."""
+    table = BaccaratTable(num_decks=1, verbose=False, history=5)
+    table.seat_player(player)
+
+    for i in range(1, 30):
+        table.place_bet(1, BetResult.BANKER)
+        table.play()
+        assert min(i, 5) <= len(table.results) <= 10
+
+
+def test_table_events(player):
+    table = BaccaratTable(num_decks=1, verbose=False)
+    events = []
+    table.listeners.append(events.append)
+
+    table.seat_player(player)
+    table.place_bets([(10, BetResult.PLAYER), (5, BetResult.TIE)])
+    table.shoe.reset()
+    table.play()
+
+    types = [event.type for event in events]
+    assert types[:5] == [
+        EventType.SEAT,
+        EventType.BET,
+        EventType.BET,
+        EventType.SHUFFLE,
+        EventType.DEAL,
+    ]
+    assert types[-2:] == [EventType.RESULT, EventType.SETTLE]
+    assert events[3].cards == tuple(table.shoe.cards + table.shoe.discards[::-1])
+    assert events[4].cards == tuple(table.shoe.discards[:4])
+    assert events[-2].result is table.last_result
+    assert events[-1].amount == player.bankroll - 85
+
+    settle = events[-1]
+    assert settle.result is table.last_result
+    assert [bet for bet, _ in settle.settled] == [(10, BetResult.PLAYER), (5, BetResult.TIE)]
+    assert [payout for _, payout in settle.settled] == [
+        settle_bet(bet, table.last_result, table.rules) for bet, _ in settle.settled
+    ]
+
+
+def get_result_of(coup):
+    hands = []
+    for cards in (coup.player_cards, coup.banker_cards):
+        hand = BaccaratHand()
+        for card in cards:
+            hand.add_card(card)
+        hands.append(hand)
+
+    return get_result(*hands)
+
+
+def test_iter_coups(table):
+    """Test coups are played through shoe resets, without recording them."""
+    coups = list(table.iter_coups(100))
+
+    assert len(coups) == 100
+    assert table.results == []
+    assert table.shoe.num_cards + len(table.shoe.discards) == 52
+    assert all(coup.result is get_result_of(coup) for coup in coups)
+
+
+def test_iter_coups_is_lazy(table):
+    coups = table.iter_coups()
+    assert next(coups).result in BetResult
+    assert table.shoe.num_cards >= 52 - 6
+
+
+def test_iter_coups_with_bets(table, player):
+    """Test bets on the last winner are settled."""
+    table.seat_player(player)
+    placed = []
+
+    def bets(last_coup):
+        bet_type = BetResult.BANKER if last_coup is None else last_coup.result
+        placed.append(bet_type)
+        return [(1, bet_type)]
+
+    coups = list(table.iter_coups(20, bets))
+    won = sum(
+        settle_bet(Bet(1, bet_type), coup.result, table.rules)
+        for bet_type, coup in zip(placed, coups)
+    )
+
+    assert placed[1:] == [coup.result for coup in coups[:-1]]
+    assert player.bankroll == 100 - 20 + won
+    assert len(table.bets) == 0
+
+
+def test_iter_coups_calls_no_listeners(table, player):
+    """Test bets placed while streaming coups are settled without any events, and don't
+    touch the bets pending at the table."""
+    events = []
+    table.seat_player(player)
+    table.listeners.append(events.append)
+    table.place_bet(10, BetResult.TIE)
+    events.clear()
+
+    coups = list(table.iter_coups(5, lambda last_coup: [(2, BetResult.PLAYER)]))
+    won = sum(settle_bet(Bet(2, BetResult.PLAYER), coup.result, table.rules) for coup in coups)
+
+    assert events == []
+    assert player.bankroll == 100 - 10 - 5 * 2 + won
+    assert list(table.bets) == [Bet(10, BetResult.TIE)]
+
+
 def test_play_fails_with_no_deal(table, player):
     table.seat_player(player)
     table.place_bet(10, BetResult.PLAYER)
@@ -136,6 +345,19 @@ def test_check_natural():
     assert check_natural(hand2, hand2) == BetResult.TIE
 
 
+def test_check_natural_both_natural():
+    hand1 = BaccaratHand()
+    hand1.cards.append(Card(suit=Suit.SPADES, value=Value.KING))
+    hand1.cards.append(Card(suit=Suit.SPADES, value=Value.NINE))
+
+    hand2 = BaccaratHand()
+    hand2.cards.append(Card(suit=Suit.SPADES, value=Value.KING))
+    hand2.cards.append(Card(suit=Suit.SPADES, value=Value.EIGHT))
+
+    assert check_natural(hand1, hand2) == BetResult.PLAYER
+    assert check_natural(hand2, hand1) == BetResult.BANKER
+
+
 def test_get_result():
     hand1 = BaccaratHand()
     hand1.cards.append(Card(suit=Suit.SPADES, value=Value.ACE))
@@ -169,3 +391,87 @@ def test_settle_bet(player):
     assert settle_bet(bet3, BetResult.PLAYER) == 0
     assert settle_bet(bet3, BetResult.BANKER) == 0
     assert settle_bet(bet3, BetResult.TIE) == 80
+
+
+def test_settle_bet_with_rules(player):
+    rules = PayoutRules(banker_commission=Fraction(1, 10), tie_payout=9, tie_pushes=True)
+
+    assert settle_bet(player.make_bet(10, BetResult.BANKER), BetResult.BANKER, rules) == 19
+    assert settle_bet(player.make_bet(20, BetResult.BANKER), BetResult.BANKER, rules) == 38
+    assert settle_bet(player.make_bet(10, BetResult.PLAYER), BetResult.TIE, rules) == 10
+    assert settle_bet(player.make_bet(10, BetResult.TIE), BetResult.TIE, rules) == 90
+
+
+def test_deal_coup():
+    shoe = Shoe(1)
+    shoe.shuffle()
+
+    coup = deal_coup(shoe)
+
+    assert shoe.num_cards == 52 - len(coup.player_cards) - len(coup.banker_cards)
+    assert coup.outcome.result is coup.result
+    assert coup.outcome.natural is coup.natural
+    two_cards_each = len(coup.player_cards) == len(coup.banker_cards) == 2
+    assert coup.natural == (two_cards_each and max(coup.player_total, coup.banker_total) >= 8)
+
+
+@pytest.mark.parametrize(
+    "rounding, expected",
+    [
+        (Rounding.DOWN, [1, 19, 58, 39]),
+        (Rounding.UP, [2, 20, 59, 39]),
+        (Rounding.HALF_EVEN, [2, 20, 58, 39]),
+    ],
+)
+def test_settle_bet_rounding(rounding, expected):
+    # Banker bets of 1, 10, 30 and 20 win 0.95, 9.5, 28.5 and 19
+    rules = PayoutRules(rounding=rounding)
+    bets = [Bet(amount, BetResult.BANKER) for amount in (1, 10, 30, 20)]
+
+    assert [settle_bet(bet, BetResult.BANKER, rules) for bet in bets] == expected
+
+
+def test_settle_bet_is_exact_for_large_stakes():
+    amount = 10**20 + 10
+    assert (
+        settle_bet(Bet(amount, BetResult.BANKER), BetResult.BANKER) == amount + amount * 19 // 20
+    )
+
+
+@pytest.mark.parametrize("result", list(BetResult))
+@pytest.mark.parametrize(
+    "rules", [PayoutRules(), PayoutRules(tie_pushes=True, rounding=Rounding.UP)]
+)
+def test_settle_bets_matches_settle_bet(result, rules):
+    bets = [Bet(amount, bet_type) for amount in (1, 7, 10, 25, 1000) for bet_type in BetResult]
+
+    payouts = settle_bets(
+        [bet.amount for bet in bets], [bet.result for bet in bets], result, rules
+    )
+
+    assert payouts == [settle_bet(bet, result, rules) for bet in bets]
+
+
+@pytest.mark.parametrize("result", list(BetResult))
+@pytest.mark.parametrize("rounding", list(Rounding))
+def test_settle_stakes_matches_settle_bet(result, rounding):
+    rules = PayoutRules(rounding=rounding)
+    amounts = [0, 1, 5, 7, 10, 25, 30, 1000]
+    for bet_type in BetResult:
+        expected = [settle_bet(Bet(amount, bet_type), result, rules) for amount in amounts]
+        assert settle_stakes(amounts, bet_type, result, rules) == expected
+
+
+def test_table_settles_with_its_rules(player):
+    table = BaccaratTable(num_decks=1, rules=PayoutRules(tie_pushes=True))
+    table.seat_player(player)
+    table.place_bet(10, BetResult.PLAYER)
+    table.place_bet(10, BetResult.BANKER)
+
+    table.play()
+
+    if table.last_result is BetResult.TIE:
+        assert player.bankroll == 100
+    else:
+        assert player.bankroll in (100, 99)
+    assert len(table.bets) == 0
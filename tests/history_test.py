@@ -0,0 +1,207 @@
+"""Test the hand history store."""
+import sqlite3
+
+import pytest
+
+from baccarat.game import BaccaratTable
+from baccarat.game import BetResult
+from baccarat.game import deal_coup
+from baccarat.game import Player
+from baccarat.history import HistoryStore
+from baccarat.utils import Shoe
+
+
+def _shoe(num_decks=1):
+    shoe = Shoe(num_decks)
+    shoe.shuffle()
+    coups = []
+    while shoe.num_cards >= 6:
+        coups.append(deal_coup(shoe))
+
+    return coups
+
+
+@pytest.fixture
+def store(tmp_path):
+    with HistoryStore(tmp_path / "history.db", batch_size=7) as store:
+        yield store
+
+
+def test_round_trip(store):
+    coups = _shoe()
+    shoe = store.add_shoe(coups)
+
+    stored = list(store.coups(shoe=shoe))
+    assert [stored_coup.coup for stored_coup in stored] == coups
+    assert [stored_coup.position for stored_coup in stored] == list(range(len(coups)))
+
+
+def test_filters(store):
+    coups = _shoe(8)
+    store.add_shoe(coups)
+
+    three_card_7s = [
+        coup
+        for coup in coups
+        if coup.result is BetResult.BANKER
+        and coup.banker_total == 7
+        and len(coup.banker_cards) == 3
+    ]
+    stored = list(store.coups(result=BetResult.BANKER, banker_total=7, banker_cards=3))
+    assert [stored_coup.coup for stored_coup in stored] == three_card_7s
+    assert store.count(natural=True) == sum(coup.natural for coup in coups)
+    assert store.count() == len(coups)
+
+
+def test_streaks(store):
+    coups = _shoe(8)
+    store.add_shoe(coups)
+    stored = list(store.coups())
+
+    streak = 0
+    for i, stored_coup in enumerate(stored):
+        streak = streak + 1 if i and coups[i - 1].result is coups[i].result else 1
+        assert stored_coup.streak == streak
+
+    expected = [
+        stored[i + 1]
+        for i in range(len(stored) - 1)
+        if stored[i].coup.result is BetResult.BANKER
+        and stored[i].streak >= 3
+        and stored[i + 1].coup.result is BetResult.PLAYER
+    ]
+    assert list(store.after_streak(BetResult.BANKER, 3, result=BetResult.PLAYER)) == expected
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [{}, {"natural": True}, {"result": BetResult.PLAYER, "player_total": 8, "banker_total": 3}],
+)
+def test_after_streak_looks_up_by_position(store, filters):
+    """Test the coup next to each coup in a streak is found through the shoe and position
+    index, whichever side of the join SQLite starts from."""
+    store.add_shoe(_shoe())
+    statements = []
+    store.connection.set_trace_callback(statements.append)
+    list(store.after_streak(BetResult.BANKER, 3, **filters))
+    store.connection.set_trace_callback(None)
+
+    select = next(statement for statement in statements if statement.startswith("SELECT"))
+    plan = [row[3] for row in store.connection.execute(f"EXPLAIN QUERY PLAN {select}")]
+    assert any("coups_shoe (shoe=? AND position=?)" in step for step in plan)
+
+
+def test_streaks_stay_in_their_shoe(store):
+    store.add_shoe(_shoe())
+    second = store.add_shoe(_shoe())
+
+    assert next(store.coups(shoe=second)).streak == 1
+    assert all(coup.position > 0 for result in BetResult for coup in store.after_streak(result, 1))
+
+
+def test_attach_to_table(store):
+    table = BaccaratTable(num_decks=1, verbose=False)
+    table.seat_player(Player(10_000))
+    store.attach(table)
+
+    for _ in range(20):
+        table.place_bets([(10, BetResult.BANKER), (5, BetResult.TIE)])
+        table.play()
+
+    stored = list(store.coups())
+    assert [stored_coup.coup.result for stored_coup in stored] == table.results
+    assert stored[-1].coup.player_cards == tuple(table.player_hand.cards)
+
+    payouts = sum(payout for coup in stored for _, _, payout in store.bets(coup.id))
+    assert table.player.bankroll == 10_000 - 20 * 15 + payouts
+    assert store.bets(stored[0].id)[0][:2] == (10, BetResult.BANKER)
+
+
+def test_reopen(tmp_path):
+    with HistoryStore(tmp_path / "history.db") as store:
+        first = store.add_shoe(_shoe())
+
+    with HistoryStore(tmp_path / "history.db") as store:
+        second = store.add_shoe(_shoe())
+        assert second == first + 1
+        assert len({coup.id for coup in store.coups()}) == store.count()
+
+
+def test_seek(store):
+    coups = _shoe(8)
+    store.add_shoe(coups)
+
+    stored = store.coups(start=50)
+    assert next(stored).coup == coups[49]
+    assert next(stored).coup == coups[50]
+
+    plan = store.query("EXPLAIN QUERY PLAN SELECT * FROM coups WHERE id >= ? ORDER BY id", [50])
+    assert "INTEGER PRIMARY KEY" in plan[0][-1]
+
+
+def test_read_only(tmp_path):
+    path = tmp_path / "history.db"
+    with HistoryStore(path) as store:
+        coups = _shoe()
+        store.add_shoe(coups)
+    contents = path.read_bytes()
+
+    with HistoryStore(path, read_only=True) as store:
+        assert store.last_id == len(coups)
+        assert store.results(end=4) == [coup.result for coup in coups[:3]]
+        assert store.results() == [coup.result for coup in coups]
+        with pytest.raises(ValueError):
+            store.add(coups[0], 1, len(coups))
+
+    assert path.read_bytes() == contents
+
+
+def test_read_only_rejects_other_files(tmp_path):
+    other = tmp_path / "other.db"
+    connection = sqlite3.connect(other)
+    connection.execute("CREATE TABLE coups (id INTEGER)")
+    connection.close()
+    contents = other.read_bytes()
+
+    with pytest.raises(ValueError, match="Not a hand history"):
+        HistoryStore(other, read_only=True)
+    assert other.read_bytes() == contents
+
+    text = tmp_path / "notes.txt"
+    text.write_text("not a database" * 100)
+    with pytest.raises(sqlite3.DatabaseError):
+        HistoryStore(text, read_only=True)
+    with pytest.raises(sqlite3.OperationalError):
+        HistoryStore(tmp_path / "missing.db", read_only=True)
+
+
+def test_bulk_load(store):
+    shoes = [_shoe() for _ in range(3)]
+    with store.bulk_load():
+        assert store.query("SELECT name FROM sqlite_master WHERE type = 'index'") == []
+        ids = [store.add_shoe(coups) for coups in shoes]
+
+    indexes = store.query("SELECT name FROM sqlite_master WHERE type = 'index'")
+    assert len(indexes) == 5
+    assert store.last_id == sum(len(coups) for coups in shoes)
+    for shoe, coups in zip(ids, shoes):
+        stored = list(store.coups(shoe=shoe))
+        assert [stored_coup.coup for stored_coup in stored] == coups
+        assert stored[0].streak == 1
+
+
+def test_after_streak_includes_long_streaks(store):
+    shoe = store.new_shoe()
+    dealt = _shoe(8)
+    coups = {
+        result: next(coup for coup in dealt if coup.result is result)
+        for result in (BetResult.BANKER, BetResult.PLAYER)
+    }
+    results = [BetResult.BANKER] * 4 + [BetResult.PLAYER]
+    for position, result in enumerate(results):
+        store.add(coups[result], shoe, position)
+
+    # Every coup after the first 2 banker wins, including the one ending the streak
+    assert [coup.position for coup in store.after_streak(BetResult.BANKER, 2)] == [2, 3, 4]
+    ended = store.after_streak(BetResult.BANKER, 2, result=BetResult.PLAYER)
+    assert [coup.position for coup in ended] == [4]
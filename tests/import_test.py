@@ -0,0 +1,43 @@
+"""Test that importing the package is quick and has no side effects."""
+import subprocess
+import sys
+
+# The most time `import baccarat` may take by itself, in microseconds
+IMPORT_BUDGET = 20_000
+
+
+def _run(code):
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+
+
+def _import_time(stderr, module):
+    """The cumulative import time of a module, from the output of -X importtime."""
+    for line in stderr.splitlines():
+        _, _, cumulative, name = (part.strip() for part in line.replace(":", "|").split("|"))
+        if name == module:
+            return int(cumulative)
+
+    raise AssertionError(f"{module} was not imported")
+
+
+def test_import_budget():
+    times = [_import_time(_run("import baccarat").stderr, "baccarat") for _ in range(3)]
+    assert min(times) < IMPORT_BUDGET
+
+
+def test_import_is_lazy():
+    code = "import sys, baccarat; print('baccarat.game' in sys.modules)"
+    assert _run(code).stdout.split() == ["False"]
+
+    code = "from baccarat import Player; print(Player.__module__)"
+    assert _run(code).stdout.split() == ["baccarat.game"]
+
+
+def test_import_leaves_logging_alone():
+    code = "import logging, baccarat.game; print(len(logging.getLogger().handlers))"
+    assert _run(code).stdout.split() == ["0"]
@@ -0,0 +1,113 @@
+"""Test the table journal."""
+import pytest
+
+from baccarat.game import BaccaratTable
+from baccarat.game import BetResult
+from baccarat.game import EventType
+from baccarat.game import Player
+from baccarat.game import TableEvent
+from baccarat.journal import decode_event
+from baccarat.journal import encode_event
+from baccarat.journal import events
+from baccarat.journal import FsyncPolicy
+from baccarat.journal import Journal
+from baccarat.journal import list_segments
+from baccarat.journal import replay
+from baccarat.snapshot import snapshot
+from baccarat.utils import CARDS
+
+
+def _play(table, rounds):
+    for i in range(rounds):
+        table.place_bets([(10, BetResult.BANKER), (1 + i % 3, BetResult.TIE)])
+        table.play()
+
+
+@pytest.fixture
+def table():
+    table = BaccaratTable(num_decks=1, verbose=False)
+    table.seat_player(Player(100_000))
+    return table
+
+
+@pytest.mark.parametrize(
+    "event",
+    [
+        TableEvent(EventType.SEAT, 100),
+        TableEvent(EventType.BET, 25, BetResult.TIE),
+        TableEvent(EventType.SHUFFLE, 3, cards=CARDS),
+        TableEvent(EventType.DRAW, result=BetResult.BANKER, cards=CARDS[7:8]),
+    ],
+)
+def test_encode_event(event):
+    assert decode_event(encode_event(event)) == event
+
+
+def test_replay(table, tmp_path):
+    with Journal(tmp_path, table, batch_size=16, snapshot_every=7) as journal:
+        _play(table, 100)
+        assert journal.table is table
+
+    assert table.listeners == []
+    assert snapshot(replay(tmp_path)) == snapshot(table)
+
+
+def test_replay_with_pending_bets(table, tmp_path):
+    with Journal(tmp_path, table, fsync=FsyncPolicy.NEVER):
+        _play(table, 10)
+        table.place_bet(10, BetResult.PLAYER)
+
+    replayed = replay(tmp_path)
+    assert list(replayed.bets) == list(table.bets)
+    assert replayed.player.bankroll == table.player.bankroll
+
+
+def test_segments_rotate(table, tmp_path):
+    """Test segments rotate, and replay only needs the newest."""
+    with Journal(tmp_path, table, segment_size=2000, fsync=FsyncPolicy.INTERVAL):
+        _play(table, 100)
+
+    segments = list_segments(tmp_path)
+    assert len(segments) > 2
+
+    for segment in segments[:-1]:
+        segment.unlink()
+
+    assert snapshot(replay(tmp_path)) == snapshot(table)
+
+
+def test_reopen_journal(table, tmp_path):
+    with Journal(tmp_path, table):
+        _play(table, 5)
+    with Journal(tmp_path, table):
+        _play(table, 5)
+
+    assert len(list_segments(tmp_path)) == 2
+    assert snapshot(replay(tmp_path)) == snapshot(table)
+
+
+def test_torn_record(table, tmp_path):
+    """Test a torn write at the end of the journal is ignored."""
+    with Journal(tmp_path, table):
+        _play(table, 20)
+
+    segment = list_segments(tmp_path)[-1]
+    segment.write_bytes(segment.read_bytes()[:-30])
+
+    # The last result and settlement are torn, but follow from the deal
+    assert snapshot(replay(tmp_path)) == snapshot(table)
+
+
+def test_events(table, tmp_path):
+    with Journal(tmp_path, table):
+        _play(table, 20)
+
+    streamed = list(events(tmp_path))
+    results = [event.result for event in streamed if event.type is EventType.RESULT]
+    assert results == table.results
+    assert sum(event.type is EventType.BET for event in streamed) == 40
+
+
+def test_replay_without_snapshot(tmp_path):
+    with pytest.raises(ValueError):
+        replay(tmp_path)
@@ -0,0 +1,116 @@
+"""Test the house ledger."""
+from fractions import Fraction
+
+import pytest
+
+from baccarat.game import BaccaratTable
+from baccarat.game import Bet
+from baccarat.game import BetResult
+from baccarat.game import PayoutRules
+from baccarat.game import Player
+from baccarat.ledger import BetTotals
+from baccarat.ledger import HouseLedger
+from baccarat.ledger import main
+from baccarat.ledger import read_periods
+
+
+@pytest.fixture
+def table():
+    table = BaccaratTable(num_decks=1, verbose=False)
+    table.seat_player(Player(10_000_000))
+    return table
+
+
+def play(table, rounds, bets):
+    for _ in range(rounds):
+        table.place_bets(bets)
+        table.play()
+
+
+def test_totals_match_bankroll(table):
+    ledger = HouseLedger(table)
+    play(table, 500, [(100, BetResult.PLAYER), (150, BetResult.BANKER), (25, BetResult.TIE)])
+
+    assert ledger.rounds == 500
+    for bet_type, amount in ((BetResult.PLAYER, 100), (BetResult.BANKER, 150)):
+        totals = ledger.bet_totals(bet_type)
+        assert (totals.bets, totals.handle) == (500, 500 * amount)
+
+    # The house wins what the player loses
+    assert ledger.total.win == 10_000_000 - table.player.bankroll
+    assert ledger.total == BetTotals(
+        1500,
+        500 * 275,
+        sum(totals.paid for totals in ledger.report().values()),
+        ledger.bet_totals(BetResult.BANKER).commission,
+    )
+
+    # 5% of 150 is 7.50, and the winnings are rounded down, so the house keeps 8
+    banker_wins = table.results.count(BetResult.BANKER)
+    assert ledger.bet_totals(BetResult.BANKER).commission == banker_wins * 8
+    assert ledger.bet_totals(BetResult.TIE).paid == table.results.count(BetResult.TIE) * 200
+
+
+def test_commission_rounding():
+    table = BaccaratTable(
+        num_decks=1, rules=PayoutRules(banker_commission=Fraction(1, 20)), verbose=False
+    )
+    table.seat_player(Player(1000))
+    ledger = HouseLedger(table)
+
+    # A winning 5 unit Banker bet pays 4, keeping 1 for the commission
+    ledger.settle([(Bet(5, BetResult.BANKER), 9), (Bet(5, BetResult.PLAYER), 0)], BetResult.BANKER)
+    assert ledger.bet_totals(BetResult.BANKER) == BetTotals(1, 5, 9, 1)
+    assert ledger.bet_totals(BetResult.PLAYER) == BetTotals(1, 5, 0, 0)
+    assert ledger.bet_totals(BetResult.BANKER).hold == pytest.approx(-0.8)
+    assert ledger.total.hold == pytest.approx(0.1)
+
+
+def test_uses_the_tables_payouts(table):
+    """Test the ledger records what the table paid, not what it would work out itself."""
+    ledger = HouseLedger(table)
+    table.rules = PayoutRules(tie_payout=1)
+    play(table, 200, [(100, BetResult.TIE)])
+
+    ties = table.results.count(BetResult.TIE)
+    assert ledger.bet_totals(BetResult.TIE).paid == ties * 100
+    assert ledger.total.win == 10_000_000 - table.player.bankroll
+
+    # Bets streamed without events don't reach the ledger at all
+    list(table.iter_coups(10, lambda coup: [(100, BetResult.BANKER)]))
+    assert ledger.rounds == 200
+    assert ledger.bet_totals(BetResult.BANKER).bets == 0
+
+
+def test_periods(table, tmp_path):
+    path = tmp_path / "ledger.bin"
+    with HouseLedger(table, path, period=100, batch_size=2) as ledger:
+        play(table, 250, [(100, BetResult.BANKER)])
+
+        # Two summaries are written in a batch, and the third is still buffered
+        assert len(list(read_periods(path))) == 2
+
+    periods = list(read_periods(path))
+    assert [(period.start, period.rounds) for period in periods] == [
+        (0, 100),
+        (100, 100),
+        (200, 50),
+    ]
+    assert sum(period.total.win for period in periods) == ledger.total.win
+    assert table.listeners == []
+
+    # A torn record is ignored
+    with open(path, "ab") as file:
+        file.write(b"\x00" * 10)
+    assert len(list(read_periods(path))) == 3
+
+
+def test_main(table, tmp_path, capsys):
+    path = tmp_path / "ledger.bin"
+    with HouseLedger(table, path, period=10):
+        play(table, 20, [(100, BetResult.PLAYER)])
+
+    assert main([str(path)]) == 0
+    output = capsys.readouterr().out
+    assert "11-20" in output
+    assert "20 rounds" in output
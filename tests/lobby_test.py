@@ -0,0 +1,94 @@
+"""Test running many tables in a lobby."""
+import random
+
+import pytest
+
+from baccarat.game import BetResult
+from baccarat.game import Player
+from baccarat.lobby import flat_bet
+from baccarat.lobby import Lobby
+from baccarat.lobby import memory_per_table
+from baccarat.lobby import ShoePool
+from baccarat.utils import CARDS
+
+
+def test_shoe_pool_reuses_shoes():
+    pool = ShoePool(1)
+    shoe = pool.take()
+    shoe.deal()
+
+    pool.give(shoe)
+    assert len(pool) == 1
+    assert pool.take() is shoe
+    assert shoe.num_cards == 52
+    assert len(pool) == 0
+
+
+def test_tables_share_cards():
+    lobby = Lobby(num_decks=1)
+    for _ in range(2):
+        lobby.add_table(Player(100), flat_bet(1))
+
+    canonical = {id(card) for card in CARDS}
+    for table in lobby.tables:
+        assert {id(card) for card in table.shoe.cards} == canonical
+
+
+def test_play_rounds():
+    lobby = Lobby(num_decks=1, history=10)
+    for _ in range(5):
+        lobby.add_table(Player(10_000), flat_bet(10, BetResult.PLAYER))
+
+    assert lobby.run(50) == 50
+
+    for i, table in enumerate(lobby.tables):
+        stats = lobby.table_stats(i)
+        assert stats.rounds == 50
+        assert sum(stats.result_counts.values()) == 50
+        assert stats.wagered == 500
+        assert table.player.bankroll == 10_000 + stats.won
+        assert len(table.results) <= 20
+
+    total = lobby.stats()
+    assert total.rounds == 250
+    assert total.wagered == 2500
+    assert total.won == sum(lobby.table_stats(i).won for i in range(5))
+
+
+def test_broke_tables_close():
+    """Test a table closes when its player can't afford to bet, and its shoe is pooled."""
+    random.seed(0)
+    lobby = Lobby(num_decks=1)
+    lobby.add_table(Player(10), flat_bet(10, BetResult.TIE))
+    lobby.add_table(Player(10), lambda table: [])
+
+    assert lobby.run(100) < 100
+    assert lobby.active == [False, True]
+    assert len(lobby.pool) == 1
+    assert lobby.table_stats(1).rounds == 0
+
+
+def test_closed_table_gives_up_its_shoe():
+    """Test a pooled shoe is only held by the table it is reused at."""
+    lobby = Lobby(num_decks=1)
+    lobby.add_table(Player(100), flat_bet(1))
+    shoe = lobby.tables[0].shoe
+
+    lobby.close_table(0)
+    assert lobby.tables[0].closed
+    with pytest.raises(ValueError):
+        lobby.tables[0].shoe
+
+    lobby.add_table(Player(100), flat_bet(1))
+    assert lobby.tables[1].shoe is shoe
+    assert [table for table in lobby.tables if not table.closed and table.shoe is shoe] == [
+        lobby.tables[1]
+    ]
+
+    lobby.run(5)
+    assert lobby.table_stats(0).rounds == 0
+    assert lobby.table_stats(1).rounds == 5
+
+
+def test_memory_per_table():
+    assert memory_per_table(num_tables=100, rounds=20) < 16_000
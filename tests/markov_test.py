@@ -0,0 +1,61 @@
+"""Test the solved odds of reaching a bankroll goal."""
+import random
+
+import pytest
+
+from baccarat.game import BetResult
+from baccarat.game import PayoutRules
+from baccarat.markov import build_goal_chain
+from baccarat.markov import simulate_goal
+from baccarat.markov import solve_goal
+from baccarat.markov import step_distribution
+
+
+def test_step_distribution():
+    """Test a Banker bet wins its stake less commission, and loses on a tie."""
+    steps = step_distribution(BetResult.BANKER, 200)
+
+    assert set(steps) == {190, -200}
+    assert sum(steps.values()) == 1
+
+
+def test_chain_rows_sum_to_one():
+    """Test every row of the transition matrix is a distribution."""
+    chain = build_goal_chain(BetResult.PLAYER, 200, 1000, 2000)
+
+    assert chain.states[0] < 200
+    assert chain.states[-1] >= 2000
+    for row in chain.transitions:
+        assert sum(row.values()) == pytest.approx(1)
+
+
+def test_fair_coin_gamblers_ruin():
+    """Test a Player bet that pushes on ties is the classic gambler's ruin."""
+    rules = PayoutRules(tie_pushes=True)
+    solution = solve_goal(BetResult.PLAYER, 1, 3, 6, rules)
+
+    # Given no tie, Player wins with probability p, so the chance of doubling is
+    # (1 - r^3) / (1 - r^6) = 1 / (1 + r^3), where r = (1 - p) / p
+    p = 0.446247 / (0.446247 + 0.458597)
+    r = (1 - p) / p
+
+    assert solution.goal_probability == pytest.approx(1 / (1 + r**3), abs=1e-5)
+    assert solution.goal_probability + solution.ruin_probability == pytest.approx(1)
+
+
+def test_already_at_goal():
+    """Test no games are played from an absorbing bankroll."""
+    assert solve_goal(BetResult.PLAYER, 200, 2000, 2000).goal_probability == 1
+    assert solve_goal(BetResult.PLAYER, 200, 100, 2000).ruin_probability == 1
+
+
+@pytest.mark.parametrize("bet_type", list(BetResult))
+def test_solution_matches_simulation(bet_type):
+    """Test the solution is close to playing it out."""
+    random.seed(bet_type.value)
+
+    solved = solve_goal(bet_type, 200, 1000, 2000)
+    simulated = simulate_goal(bet_type, 200, 1000, 2000, trials=1000)
+
+    assert simulated.goal_probability == pytest.approx(solved.goal_probability, abs=0.05)
+    assert simulated.expected_games == pytest.approx(solved.expected_games, rel=0.1)
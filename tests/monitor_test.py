@@ -0,0 +1,88 @@
+"""Test the shared memory monitor."""
+import multiprocessing
+from multiprocessing.shared_memory import SharedMemory
+
+import pytest
+
+from baccarat.game import BaccaratTable
+from baccarat.game import BetResult
+from baccarat.monitor import create_monitor
+from baccarat.monitor import Monitor
+from baccarat.monitor import MonitorError
+from baccarat.monitor import MonitorWriter
+from baccarat.monitor import run_worker
+
+
+@pytest.fixture
+def memory():
+    memory = create_monitor(2)
+    yield memory
+    memory.close()
+    memory.unlink()
+
+
+def test_worker(memory):
+    monitor = Monitor(memory.name)
+    assert monitor.read() == [None, None]
+
+    run_worker(memory.name, 1, 2000, stake=100, publish_every=500)
+
+    stats = monitor.read_slot(1)
+    assert stats.coups == 2000
+    assert sum(stats.result_counts.values()) == 2000
+    assert sum(stats.totals) == 2000
+    assert stats.wagered == 200_000
+    assert -0.2 < stats.house_edge < 0.2
+    assert stats.standard_error > 0
+    assert monitor.total() == stats
+    monitor.close()
+
+
+def test_publish_only_when_asked(memory):
+    monitor = Monitor(memory.name)
+    writer = MonitorWriter(memory.name, 0)
+    run_worker(memory.name, 1, 10)
+
+    coup = next(BaccaratTable(num_decks=1, verbose=False).iter_coups())
+    writer.add(coup, 100, -100)
+    assert monitor.read_slot(0) is None
+
+    writer.publish()
+    stats = monitor.read_slot(0)
+    assert stats.coups == 1
+    assert stats.result_counts[coup.result] == 1
+    assert (stats.profit, stats.squares) == (-100, 10_000)
+    assert monitor.total().coups == 11
+
+    writer.close()
+    monitor.close()
+
+
+def test_processes(memory):
+    processes = [
+        multiprocessing.Process(target=run_worker, args=(memory.name, slot, 500, BetResult.PLAYER))
+        for slot in range(2)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    monitor = Monitor(memory.name)
+    total = monitor.total()
+    assert total.coups == 1000
+    assert total.coups_per_second > 0
+    monitor.close()
+
+
+def test_errors(memory):
+    with pytest.raises(MonitorError):
+        MonitorWriter(memory.name, 2)
+
+    other = SharedMemory(create=True, size=64)
+    try:
+        with pytest.raises(MonitorError):
+            Monitor(other.name)
+    finally:
+        other.close()
+        other.unlink()
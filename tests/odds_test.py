@@ -0,0 +1,122 @@
+"""Test the exact odds of a coup."""
+from fractions import Fraction
+
+import pytest
+
+from baccarat.game import BetResult
+from baccarat.game import PayoutRules
+from baccarat.odds import expected_value
+from baccarat.odds import next_coup_counts
+from baccarat.odds import odds_report
+from baccarat.odds import OddsWorker
+from baccarat.odds import outcome_probabilities
+from baccarat.odds import remaining_counts
+from baccarat.odds import result_probabilities
+from baccarat.odds import shoe_counts
+from baccarat.utils import Shoe
+
+
+def test_shoe_counts():
+    """Test the composition of a full shoe."""
+    assert shoe_counts(1) == (16, 4, 4, 4, 4, 4, 4, 4, 4, 4)
+    assert remaining_counts(Shoe(2)) == shoe_counts(2)
+
+
+def test_probabilities_sum_to_one():
+    """Test every way the cards can fall is accounted for."""
+    assert sum(outcome_probabilities(shoe_counts(1)).values()) == 1
+
+
+@pytest.mark.parametrize(
+    "result, expected",
+    [
+        (BetResult.PLAYER, 0.446247),
+        (BetResult.BANKER, 0.458597),
+        (BetResult.TIE, 0.095156),
+    ],
+)
+def test_eight_deck_result_probabilities(result, expected):
+    """Test the well known 8 deck probabilities."""
+    probabilities = result_probabilities(shoe_counts(8))
+    assert float(probabilities[result]) == pytest.approx(expected, abs=1e-6)
+
+
+def test_house_edge_when_ties_push():
+    """Test the well known 8 deck house edges, when Player and Banker bets push on a tie."""
+    rules = PayoutRules(tie_pushes=True, tie_payout=9)
+    counts = shoe_counts(8)
+
+    assert float(expected_value(BetResult.PLAYER, counts, rules)) == pytest.approx(
+        -0.012351, abs=1e-6
+    )
+    assert float(expected_value(BetResult.BANKER, counts, rules)) == pytest.approx(
+        -0.010579, abs=1e-6
+    )
+    assert float(expected_value(BetResult.TIE, counts, rules)) == pytest.approx(
+        -0.143596, abs=1e-6
+    )
+
+
+def test_only_tens_is_always_a_tie():
+    """Test a shoe of only 0 valued cards."""
+    counts = (6,) + (0,) * 9
+    assert result_probabilities(counts)[BetResult.TIE] == Fraction(1)
+
+
+def test_too_few_cards():
+    """Test a coup needs at least 6 cards."""
+    with pytest.raises(ValueError):
+        outcome_probabilities((5,) + (0,) * 9)
+
+
+def test_odds_report():
+    """Test the report has every result and bet type, and is cached."""
+    counts = shoe_counts(1)
+    report = odds_report(counts)
+
+    assert report.probabilities == result_probabilities(counts)
+    assert report.expected_values[BetResult.TIE] == expected_value(BetResult.TIE, counts)
+    assert odds_report(counts) is report
+
+
+def test_odds_worker():
+    """Test the worker skips to the latest composition, and stops."""
+    worker = OddsWorker()
+    counts = [shoe_counts(1)[:9] + (count,) for count in range(4)]
+    for count in counts:
+        worker.submit(count)
+
+    worker.start()
+    report = worker.results.get(timeout=10)
+    assert report.counts == counts[-1]
+    assert sum(report.probabilities.values()) == 1
+
+    worker.stop(timeout=10)
+    assert worker.latest() is None
+
+
+def test_odds_worker_survives_errors():
+    """Test a composition that can't be computed is reported, and the worker carries on."""
+    worker = OddsWorker()
+    worker.start()
+    too_few = (5,) + (0,) * 9
+    worker.submit(too_few)
+    counts, error = worker.errors.get(timeout=10)
+    assert counts == too_few
+    assert isinstance(error, ValueError)
+
+    worker.submit(shoe_counts(1))
+    assert worker.results.get(timeout=10).counts == shoe_counts(1)
+    worker.stop(timeout=10)
+
+
+def test_next_coup_counts():
+    """Test the next coup is dealt from the whole shoe once it's about to be reshuffled."""
+    shoe = Shoe(1)
+    for _ in range(46):
+        shoe.deal()
+    assert next_coup_counts(shoe) == remaining_counts(shoe)
+
+    shoe.deal()
+    assert sum(remaining_counts(shoe)) == 5
+    assert next_coup_counts(shoe) == shoe_counts(1)
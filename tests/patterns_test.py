@@ -0,0 +1,90 @@
+"""Test the index of streaks and patterns."""
+import itertools
+import random
+
+import pytest
+
+from baccarat.game import BaccaratTable
+from baccarat.game import BetResult
+from baccarat.game import Player
+from baccarat.patterns import LETTERS
+from baccarat.patterns import PatternIndex
+
+
+@pytest.fixture
+def results():
+    rng = random.Random(1)
+    return rng.choices(list(BetResult), weights=[44.6, 45.9, 9.5], k=2000)
+
+
+def _runs(results):
+    return [(result, len(list(run))) for result, run in itertools.groupby(results)]
+
+
+def test_runs(results):
+    index = PatternIndex.from_results(results)
+    runs = _runs(results)
+
+    assert len(index) == len(results)
+    assert list(zip(index.run_results, index.run_lengths)) == runs
+    assert index.current_run == runs[-1]
+
+    for result in BetResult:
+        lengths = [length for run_result, length in runs if run_result is result]
+        assert index.longest_run(result) == max(lengths)
+        assert index.run_histogram(result) == {
+            length: lengths.count(length) for length in sorted(set(lengths))
+        }
+
+
+def test_patterns(results):
+    index = PatternIndex.from_results(results, order=4)
+    letters = "".join(LETTERS[result] for result in results)
+
+    for pattern in ("P", "BT", "PBPB", "BBBB", "TTTT"):
+        expected = sum(letters.startswith(pattern, i) for i in range(len(letters)))
+        assert index.count(pattern) == expected
+
+    assert index.count([BetResult.PLAYER, BetResult.BANKER]) == index.count("PB")
+
+
+@pytest.mark.parametrize("pattern", ["", "PBPBP", "PX"])
+def test_bad_patterns(pattern):
+    with pytest.raises(ValueError):
+        PatternIndex(order=4).count(pattern)
+
+
+def test_empty_index():
+    index = PatternIndex()
+
+    assert index.current_run is None
+    assert index.longest_run(BetResult.TIE) == 0
+    assert index.run_histogram(BetResult.TIE) == {}
+    assert index.count("P") == 0
+
+
+def test_attach_to_table():
+    table = BaccaratTable(num_decks=1, verbose=False)
+    table.seat_player(Player(10_000))
+    index = PatternIndex()
+    index.attach(table)
+
+    for _ in range(30):
+        table.place_bet(1, BetResult.BANKER)
+        table.play()
+
+    assert list(zip(index.run_results, index.run_lengths)) == _runs(table.results)
+
+
+def test_attach_per_shoe():
+    table = BaccaratTable(num_decks=1, verbose=False)
+    table.seat_player(Player(10_000))
+    index = PatternIndex()
+    index.attach(table, per_shoe=True)
+
+    for _ in range(30):
+        table.place_bet(1, BetResult.BANKER)
+        table.play()
+
+    assert table.shoe.shuffles > 1
+    assert len(index) < 30
@@ -29,3 +29,16 @@ def test_player_make_bet_invalid_amount(player):
 def test_player_win_bet(player):
     player.win_bet(10)
     assert player.bankroll == 110
+
+
+def test_player_make_bets(player):
+    bets = player.make_bets([(10, BetResult.PLAYER), (20, BetResult.TIE)])
+    assert [bet.amount for bet in bets] == [10, 20]
+    assert [bet.result for bet in bets] == [BetResult.PLAYER, BetResult.TIE]
+    assert player.bankroll == 70
+
+
+def test_player_make_bets_invalid_amount(player):
+    with pytest.raises(NotEnoughMoneyError):
+        player.make_bets([(60, BetResult.PLAYER), (60, BetResult.BANKER)])
+    assert player.bankroll == 100
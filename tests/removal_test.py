@@ -0,0 +1,61 @@
+"""Test the effects of removal and the approximation built on them."""
+import pytest
+
+from baccarat.game import BetResult
+from baccarat.odds import expected_value
+from baccarat.odds import shoe_counts
+from baccarat.removal import bet_expected_values
+from baccarat.removal import EdgeApproximation
+from baccarat.removal import removal_effects
+
+
+@pytest.fixture(scope="module")
+def effects():
+    return removal_effects(num_decks=1)
+
+
+def test_bet_expected_values():
+    """Test the main bets match the exact odds."""
+    values = bet_expected_values(shoe_counts(1))
+
+    assert set(values) == {"Player", "Banker", "Tie", "Dragon 7", "Panda 8"}
+    for bet in BetResult:
+        assert values[bet.value] == pytest.approx(float(expected_value(bet, shoe_counts(1))))
+
+
+def test_effects_average_to_zero(effects):
+    """Test removing a random card leaves the expected value unchanged, on average."""
+    full = shoe_counts(1)
+    for bet_effects in effects.effects.values():
+        assert sum(effect * count for effect, count in zip(bet_effects, full)) == pytest.approx(
+            0, abs=1e-12
+        )
+
+
+def test_approximation_of_full_shoe(effects):
+    """Test the approximation is exact for a full shoe."""
+    approximation = EdgeApproximation(effects)
+
+    for bet, value in approximation.expected_values(shoe_counts(1)).items():
+        assert value == pytest.approx(effects.expected_values[bet])
+
+
+def test_approximation_of_one_card_removed(effects):
+    """Test the approximation reproduces each effect of removal."""
+    approximation = EdgeApproximation(effects)
+
+    counts = list(shoe_counts(1))
+    counts[9] -= 1
+    for bet in approximation.bets:
+        approximate = approximation.expected_value(bet, tuple(counts))
+        assert approximate == pytest.approx(effects.expected_values[bet] + effects.effects[bet][9])
+
+
+def test_approximation_is_close(effects):
+    """Test the approximation is close to the exact value of a dealt shoe."""
+    approximation = EdgeApproximation(effects)
+    counts = (14, 3, 4, 4, 2, 4, 4, 3, 4, 4)
+
+    exact = bet_expected_values(counts)
+    for bet, value in approximation.expected_values(counts).items():
+        assert value == pytest.approx(exact[bet], abs=0.01)
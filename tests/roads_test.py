@@ -0,0 +1,50 @@
+"""Test the scoreboard roads."""
+import random
+
+import pytest
+
+from baccarat.game import BetResult
+from baccarat.roads import BeadPlate
+from baccarat.roads import BigRoad
+from baccarat.roads import Road
+from baccarat.roads import ROWS
+
+P = BetResult.PLAYER
+B = BetResult.BANKER
+T = BetResult.TIE
+
+
+def test_bead_plate():
+    results = random.Random(0).choices(list(BetResult), k=100)
+    road = BeadPlate.from_results(results)
+
+    assert len(road) == -(-len(results) // ROWS)
+    assert [cell[0] for _, _, cell in road.cells(0, len(road))] == results
+    assert [(column, row) for column, row, _ in road.cells(2, 3)] == [(2, i) for i in range(6)]
+
+
+def test_big_road():
+    road = BigRoad()
+    positions = [road.add(result) for result in [T, B, B, T, T, P, B] + [B] * 7]
+
+    assert positions[:7] == [None, (0, 0), (0, 1), (0, 1), (0, 1), (1, 0), (2, 0)]
+    assert road.columns[0] == [(B, 1), (B, 2)]
+    assert road.columns[1] == [(P, 0)]
+    # A run longer than the rows carries on in the next column
+    assert [len(column) for column in road.columns[2:]] == [ROWS, 2]
+
+
+def test_cells_are_clipped():
+    road = BeadPlate.from_results([P] * 10)
+    assert list(road.cells(-5, 100)) == list(road.cells(0, 2))
+    assert list(road.cells(5, 10)) == []
+
+
+def test_road_must_lay_out_results():
+    class Incomplete(Road):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+    with pytest.raises(TypeError):
+        Road()
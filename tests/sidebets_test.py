@@ -0,0 +1,30 @@
+"""Test the side bets."""
+import pytest
+
+from baccarat.game import Outcome
+from baccarat.odds import shoe_counts
+from baccarat.sidebets import DRAGON_7
+from baccarat.sidebets import PANDA_8
+from baccarat.sidebets import side_bet_expected_value
+
+
+def test_dragon_7():
+    """Test the Dragon 7 only wins on a three card Banker 7."""
+    assert DRAGON_7.net_odds(Outcome(6, 7, True, True)) == 40
+    assert DRAGON_7.net_odds(Outcome(6, 7, False, False)) == -1
+    assert DRAGON_7.net_odds(Outcome(7, 7, True, True)) == -1
+
+
+def test_panda_8():
+    """Test the Panda 8 only wins on a three card Player 8."""
+    assert PANDA_8.net_odds(Outcome(8, 7, True, False)) == 25
+    assert PANDA_8.net_odds(Outcome(8, 7, False, False)) == -1
+    assert PANDA_8.net_odds(Outcome(8, 9, True, True)) == -1
+
+
+@pytest.mark.parametrize("side_bet, expected", [(DRAGON_7, -0.076113), (PANDA_8, -0.101876)])
+def test_eight_deck_house_edge(side_bet, expected):
+    """Test the well known 8 deck house edges."""
+    assert float(side_bet_expected_value(side_bet, shoe_counts(8))) == pytest.approx(
+        expected, abs=1e-6
+    )
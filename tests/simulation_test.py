@@ -0,0 +1,60 @@
+"""Test the sequential simulation."""
+import random
+import statistics
+
+import pytest
+
+from baccarat.game import BetResult
+from baccarat.odds import expected_value
+from baccarat.odds import shoe_counts
+from baccarat.simulation import RunningCovariance
+from baccarat.simulation import simulate
+
+
+def test_running_covariance():
+    """Test the one-pass estimates match the two-pass ones."""
+    xs = [random.random() for _ in range(100)]
+    ys = [x + random.random() for x in xs]
+
+    estimator = RunningCovariance(2)
+    for x, y in zip(xs, ys):
+        estimator.add((x, y))
+
+    assert estimator.count == 100
+    assert estimator.means[0] == pytest.approx(statistics.mean(xs))
+    assert estimator.variance(1) == pytest.approx(statistics.variance(ys))
+    assert estimator.covariance(0, 1) == pytest.approx(statistics.covariance(xs, ys))
+
+
+def test_simulate_needs_a_stopping_rule():
+    """Test the simulation refuses to run forever."""
+    with pytest.raises(ValueError):
+        simulate()
+
+
+def test_simulate_max_coups():
+    """Test the simulation stops after a number of coups."""
+    reports = []
+    report = simulate(max_coups=2500, check_every=1000, progress=reports.append)
+
+    assert report.coups == 2500
+    assert [r.coups for r in reports] == [1000, 2000, 2500]
+    assert sum(report.result_counts.values()) == 2500
+    assert sum(report.frequencies.values()) == pytest.approx(1)
+    assert not report.converged
+
+
+def test_simulate_until_precise():
+    """Test the simulation stops once the intervals are narrow enough."""
+    random.seed(0)
+    report = simulate(half_width=0.05, check_every=500)
+
+    assert report.converged
+    assert max(report.half_widths.values()) <= 0.05
+
+    for bet in BetResult:
+        exact = float(expected_value(bet, shoe_counts(8)))
+        assert report.expected_values[bet] == pytest.approx(exact, abs=4 * report.half_widths[bet])
+
+    # Player and Banker bets never win together
+    assert report.covariances[BetResult.PLAYER, BetResult.BANKER] < 0
@@ -0,0 +1,122 @@
+"""Test snapshots of a table's state."""
+from fractions import Fraction
+
+import pytest
+
+from baccarat.game import BaccaratTable
+from baccarat.game import BetLimits
+from baccarat.game import BetResult
+from baccarat.game import PayoutRules
+from baccarat.game import Player
+from baccarat.game import Rounding
+from baccarat.snapshot import load
+from baccarat.snapshot import restore
+from baccarat.snapshot import save
+from baccarat.snapshot import snapshot
+from baccarat.snapshot import Snapshotter
+from baccarat.utils import create_card
+
+
+def _state(table):
+    return (
+        table.shoe.num_decks,
+        table.shoe.shuffles,
+        table.shoe.cards,
+        table.shoe.discards,
+        None if table.player_hand is None else table.player_hand.cards,
+        None if table.banker_hand is None else table.banker_hand.cards,
+        table.results,
+        table.trimmed_results,
+        list(table.bets),
+        None if table.player is None else table.player.bankroll,
+        table.rules,
+        table.limits,
+        table.type_limits,
+        table.history,
+        table.verbose,
+    )
+
+
+@pytest.fixture
+def table():
+    table = BaccaratTable(
+        num_decks=2,
+        rules=PayoutRules(Fraction(4, 100), 9, True, Rounding.HALF_EVEN),
+        limits=BetLimits(5, 500),
+        type_limits={BetResult.TIE: BetLimits(5)},
+        verbose=False,
+        history=10,
+    )
+    table.seat_player(Player(1000))
+    for _ in range(7):
+        table.place_bet(10, BetResult.BANKER)
+        table.play()
+
+    table.place_bets([(20, BetResult.PLAYER), (5, BetResult.TIE)])
+    return table
+
+
+def test_new_table_round_trip():
+    table = BaccaratTable(num_decks=1, verbose=False)
+    assert _state(restore(snapshot(table))) == _state(table)
+
+
+def test_round_trip(table):
+    assert _state(restore(snapshot(table))) == _state(table)
+
+
+def test_restored_table_plays_the_same(table):
+    """Test a restored table deals the same cards and settles the same bets."""
+    restored = restore(snapshot(table))
+    table.play()
+    restored.play()
+
+    assert _state(restored) == _state(table)
+
+
+def test_snapshotter_matches_snapshot(table):
+    """Test snapshots stay the same through reshuffles and trimming the history."""
+    snapshotter = Snapshotter()
+    table.play()
+
+    for _ in range(100):
+        assert snapshotter.snapshot(table) == snapshot(table)
+        table.place_bet(10, BetResult.PLAYER)
+        table.play()
+
+    assert table.shoe.shuffles > 1
+    assert table.trimmed_results > 0
+    assert snapshotter.snapshot(table) == snapshot(table)
+
+
+def test_snapshotter_with_new_table(table):
+    snapshotter = Snapshotter()
+    snapshotter.snapshot(table)
+
+    other = BaccaratTable(num_decks=1, verbose=False)
+    assert snapshotter.snapshot(other) == snapshot(other)
+
+
+def test_snapshot_size(table):
+    assert len(snapshot(table)) < 200 + 2 * 52
+
+
+def test_non_canonical_cards(table):
+    table.shoe.cards.append(create_card(10, "spades"))
+    assert restore(snapshot(table)).shoe.cards == table.shoe.cards
+
+
+def test_not_a_snapshot(table):
+    with pytest.raises(ValueError):
+        restore(b"not a snapshot")
+
+    with pytest.raises(ValueError):
+        restore(snapshot(table)[:-3])
+
+
+def test_save_and_load(table, tmp_path):
+    path = tmp_path / "table.snapshot"
+    save(table, path)
+
+    assert _state(load(path)) == _state(table)
+    assert [p.name for p in tmp_path.iterdir()] == ["table.snapshot"]
@@ -0,0 +1,162 @@
+"""Test the mergeable summaries."""
+import json
+import random
+import zlib
+
+import pytest
+
+from baccarat.game import BetResult
+from baccarat.game import deal_coup
+from baccarat.game import PayoutRules
+from baccarat.game import Rounding
+from baccarat.simulation import RunningCovariance
+from baccarat.summary import load
+from baccarat.summary import MAGIC
+from baccarat.summary import main
+from baccarat.summary import merge_all
+from baccarat.summary import QuantileSketch
+from baccarat.summary import save
+from baccarat.summary import Summary
+from baccarat.utils import Shoe
+
+
+def play(coups):
+    """Play coups from a shuffled shoe."""
+    shoe = Shoe(8)
+    shoe.shuffle()
+    return [deal_coup(shoe) for _ in range(coups)]
+
+
+@pytest.fixture
+def coups():
+    random.seed(0)
+    return play(60)
+
+
+def summarise(coups, bankrolls=()):
+    summary = Summary()
+    for coup in coups:
+        summary.add(coup)
+    for bankroll in bankrolls:
+        summary.add_bankroll(bankroll)
+    return summary
+
+
+def test_running_covariance_merge():
+    """Test merging estimators is the same as adding everything to one."""
+    values = [(random.random(), random.random()) for _ in range(50)]
+    whole, first, second = RunningCovariance(2), RunningCovariance(2), RunningCovariance(2)
+    for i, value in enumerate(values):
+        whole.add(value)
+        (first if i < 20 else second).add(value)
+
+    first.merge(second)
+    assert first.count == whole.count
+    assert first.means == pytest.approx(whole.means)
+    assert first.covariance(0, 1) == pytest.approx(whole.covariance(0, 1))
+
+
+def test_quantile_sketch():
+    """Test quantiles are within the relative accuracy."""
+    sketch = QuantileSketch(0.01)
+    for value in range(-100, 1001):
+        sketch.add(value)
+
+    assert sketch.count == 1101
+    assert sketch.quantile(0) == pytest.approx(-100, rel=0.01)
+    assert sketch.quantile(0.5) == pytest.approx(450, rel=0.01)
+    assert sketch.quantile(1) == pytest.approx(1000, rel=0.01)
+
+
+def test_quantile_sketch_merge_needs_same_accuracy():
+    with pytest.raises(ValueError):
+        QuantileSketch(0.01).merge(QuantileSketch(0.02))
+
+
+def test_summary(coups):
+    """Test a summary counts coups and streaks."""
+    summary = summarise(coups)
+
+    assert summary.coups == 60
+    assert sum(summary.result_counts.values()) == 60
+    assert sum(map(sum, summary.totals)) == 60
+
+    streak_coups = sum(
+        length * count
+        for lengths in summary.all_streaks().values()
+        for length, count in lengths.items()
+    )
+    assert streak_coups == 60
+
+
+def test_merge_matches_one_summary(coups):
+    """Test merging shards gives the same summary as summarising everything at once."""
+    whole = summarise(coups, range(100))
+    shards = [summarise(coups[:20], range(50)), summarise(coups[20:], range(50, 100))]
+    merged = merge_all(shards)
+
+    assert merged.coups == whole.coups
+    assert merged.result_counts == whole.result_counts
+    assert merged.totals == whole.totals
+    assert merged.profits.means == pytest.approx(whole.profits.means)
+    assert merged.bankrolls.quantile(0.5) == whole.bankrolls.quantile(0.5)
+    assert shards[0].coups == 20
+
+
+def test_merge_is_associative(coups):
+    a, b, c = summarise(coups[:10]), summarise(coups[10:30]), summarise(coups[30:])
+
+    left = a.merge(b).merge(c)
+    right = a.merge(b.merge(c))
+
+    assert left.result_counts == right.result_counts
+    assert left.all_streaks() == right.all_streaks()
+    assert sum(left.profits.comoments, []) == pytest.approx(sum(right.profits.comoments, []))
+
+
+def test_merge_needs_same_rules():
+    with pytest.raises(ValueError):
+        Summary().merge(Summary(PayoutRules(tie_pushes=True)))
+
+
+def test_serialisation(coups, tmp_path):
+    """Test a summary survives a round trip through a file."""
+    summary = summarise(coups, [1000, 1200])
+    save(summary, tmp_path / "shard.summary")
+    loaded = load(tmp_path / "shard.summary")
+
+    assert loaded.to_dict() == summary.to_dict()
+    assert loaded.result_counts[BetResult.BANKER] == summary.result_counts[BetResult.BANKER]
+
+    with pytest.raises(ValueError, match="Not a summary"):
+        Summary.loads(b"not a summary")
+
+
+def test_version_1(coups):
+    """Test a summary written before the rounding rule existed still loads, rounding down."""
+    summary = summarise(coups, [1000])
+    data = summary.to_dict()
+    data["rules"] = data["rules"][:3]
+    v1 = MAGIC + b"\x01" + zlib.compress(json.dumps(data).encode())
+
+    loaded = Summary.loads(v1)
+    assert loaded.rules == PayoutRules(rounding=Rounding.DOWN)
+    assert loaded.to_dict() == summary.to_dict()
+
+
+def test_unsupported_version(coups):
+    data = summarise(coups, [1000]).dumps()
+
+    with pytest.raises(ValueError, match="Unsupported summary version 9"):
+        Summary.loads(MAGIC + b"\x09" + data[len(MAGIC) + 1 :])
+
+
+def test_main(coups, tmp_path, capsys):
+    """Test the CLI merges shard files into a report."""
+    save(summarise(coups[:30], [900]), tmp_path / "1.summary")
+    save(summarise(coups[30:], [1100]), tmp_path / "2.summary")
+
+    main([str(tmp_path / "1.summary"), str(tmp_path / "2.summary"), "-o", str(tmp_path / "all")])
+
+    assert "Coups: 60" in capsys.readouterr().out
+    assert load(tmp_path / "all").coups == 60
@@ -0,0 +1,106 @@
+"""Test the parameter sweep."""
+import random
+
+import pytest
+
+from baccarat import sweep as sweep_module
+from baccarat.sweep import cell_key
+from baccarat.sweep import code_version
+from baccarat.sweep import grid_cells
+from baccarat.sweep import run_cell
+from baccarat.sweep import sweep
+from baccarat.sweep import write_table
+
+
+def test_grid_cells():
+    """Test every combination is a cell, with defaults for the rest."""
+    cells = grid_cells({"num_decks": [1, 8], "tie_payout": [8, 9]})
+
+    assert len(cells) == 4
+    assert cells[0] == {
+        "num_decks": 1,
+        "penetration": 1.0,
+        "banker_commission": 0.05,
+        "tie_payout": 8,
+    }
+    assert {(cell["num_decks"], cell["tie_payout"]) for cell in cells} == {
+        (1, 8),
+        (1, 9),
+        (8, 8),
+        (8, 9),
+    }
+
+
+def test_grid_unknown_parameter():
+    with pytest.raises(ValueError):
+        grid_cells({"decks": [1]})
+
+
+def test_run_cell_is_reproducible():
+    """Test a cell is seeded from its parameters."""
+    cell = grid_cells({"num_decks": [1], "penetration": [0.5]})[0]
+    rows = run_cell(cell, 500)
+
+    assert [row["bet"] for row in rows] == ["Player", "Banker", "Tie"]
+    assert all(row["coups"] == 500 for row in rows)
+    assert rows == run_cell(cell, 500)
+
+
+def test_run_cell_leaves_global_random_alone():
+    """Test a cell neither reseeds nor is affected by the global random number generator."""
+    cell = grid_cells({"num_decks": [1]})[0]
+    random.seed(1)
+    state = random.getstate()
+    rows = run_cell(cell, 200, version="test")
+
+    assert random.getstate() == state
+    random.random()
+    assert run_cell(cell, 200, version="test") == rows
+
+
+def test_commission_changes_the_edge():
+    """Test a lower commission is better for Banker bets."""
+    cells = grid_cells({"num_decks": [1], "banker_commission": [0.05, 0.04]})
+    standard, lower = (run_cell(cell, 10)[1]["exact_ev"] for cell in cells)
+
+    assert lower > standard
+
+
+def test_sweep_resumes_from_cache(tmp_path, monkeypatch):
+    """Test cached cells are not simulated again."""
+    grid = {"num_decks": [1, 2]}
+    rows = sweep(grid, 200, cache_dir=tmp_path, workers=2)
+
+    assert len(rows) == 6
+    assert len(list(tmp_path.glob("*.json"))) == 2
+
+    def fail(*args):
+        raise AssertionError("Cell should have been cached")
+
+    monkeypatch.setattr(sweep_module, "run_cell", fail)
+    assert sweep(grid, 200, cache_dir=tmp_path) == rows
+
+
+def test_cell_key():
+    """Test cells are keyed by their parameters and settings."""
+    cell = grid_cells({})[0]
+
+    version = code_version()
+
+    assert cell_key(cell, 100, None, version) == cell_key(dict(cell), 100, None, version)
+    assert cell_key(cell, 100, None, version) != cell_key(cell, 200, None, version)
+    assert cell_key(cell, 100, None, version) != cell_key(
+        {**cell, "num_decks": 6}, 100, None, version
+    )
+    assert cell_key(cell, 100, None, version) != cell_key(cell, 100, None, "other")
+
+
+def test_write_table(tmp_path):
+    rows = [{"num_decks": 8, "bet": "Player"}, {"num_decks": 8, "bet": "Banker"}]
+    write_table(rows, tmp_path / "sweep.csv")
+
+    assert (tmp_path / "sweep.csv").read_text().splitlines() == [
+        "num_decks,bet",
+        "8,Player",
+        "8,Banker",
+    ]
@@ -0,0 +1,85 @@
+"""Test the tournament engine."""
+import random
+
+import pytest
+
+from baccarat.game import Bet
+from baccarat.game import BetResult
+from baccarat.game import settle_bet
+from baccarat.tournament import Tournament
+
+
+@pytest.fixture
+def tournament():
+    random.seed(0)
+    tournament = Tournament(50, 1000, num_decks=1)
+    bet_types = list(BetResult)
+    for entrant in range(50):
+        tournament.set_bet(entrant, 10 * (entrant % 7) + 5, bet_types[entrant % 3])
+
+    return tournament
+
+
+def test_settles_every_entrant(tournament):
+    expected = list(tournament.bankrolls)
+    for coup in tournament.play(200):
+        for entrant in range(50):
+            stake = min(tournament.amounts[entrant], expected[entrant])
+            bet = Bet(stake, tournament.bet_types[entrant])
+            expected[entrant] += settle_bet(bet, coup.result) - stake
+
+    assert list(tournament.bankrolls) == expected
+    assert tournament.coups == 200
+
+
+def test_leaderboard_and_rank(tournament):
+    tournament.play(50)
+    board = tournament.leaderboard()
+    assert [bankroll for _, bankroll in board] == sorted(tournament.bankrolls, reverse=True)
+    assert tournament.leaderboard(5) == board[:5]
+
+    leader, _ = board[0]
+    assert tournament.rank(leader) == 1
+    last, bankroll = board[-1]
+    assert tournament.rank(last) == 1 + sum(other > bankroll for other in tournament.bankrolls)
+
+
+def test_eliminations(tournament):
+    eliminated = tournament.run(20, [30, 10])
+    assert [len(round_) for round_ in eliminated] == [20, 20]
+    assert len(tournament) == 10
+
+    # Eliminated entrants stop playing
+    out = eliminated[0][0]
+    bankroll = tournament.bankrolls[out]
+    tournament.play(10)
+    assert tournament.bankrolls[out] == bankroll
+
+
+def test_eliminate_broke():
+    tournament = Tournament(3, 100, 100, BetResult.TIE, num_decks=1)
+    tournament.set_bet(0, 0, BetResult.TIE)
+    while len(tournament.eliminate_broke()) == 0:
+        tournament.play_coup()
+
+    assert tournament.entrants[0] == 0
+    assert all(tournament.bankrolls[entrant] == 0 for entrant in (1, 2))
+
+
+def test_negative_bet(tournament):
+    with pytest.raises(ValueError):
+        tournament.set_bet(0, -1, BetResult.PLAYER)
+
+
+def test_changing_bets_and_sitting_out(tournament):
+    tournament.play(5)
+    tournament.set_bet(0, 0, BetResult.PLAYER)
+    tournament.set_bet(1, 20, BetResult.TIE)
+    bankroll = tournament.bankrolls[0]
+    expected = tournament.bankrolls[1]
+
+    for coup in tournament.play(20):
+        expected += settle_bet(Bet(20, BetResult.TIE), coup.result) - 20
+
+    assert tournament.bankrolls[0] == bankroll
+    assert tournament.bankrolls[1] == expected
@@ -0,0 +1,74 @@
+"""Test the timeline tracer."""
+import itertools
+import json
+
+import pytest
+
+from baccarat.game import BaccaratTable
+from baccarat.game import BetResult
+from baccarat.game import Player
+from baccarat.tracing import trace_tables
+from baccarat.tracing import Tracer
+from baccarat.utils import Shoe
+
+
+@pytest.fixture
+def tracer():
+    tracer = Tracer(clock=itertools.count(0, 1000).__next__)
+    yield tracer
+    tracer.restore()
+
+
+def _spans(tracer):
+    return [(event["name"], event["ph"]) for event in tracer.events()]
+
+
+def test_span(tracer):
+    with tracer.span("outer"):
+        tracer.begin("inner")
+        tracer.end("inner")
+
+    assert _spans(tracer) == [
+        ("outer", "B"),
+        ("inner", "B"),
+        ("inner", "E"),
+        ("outer", "E"),
+    ]
+    assert [event["ts"] for event in tracer.events()] == [0, 1, 2, 3]
+
+
+def test_ring_buffer_drops_partial_spans():
+    tracer = Tracer(capacity=3)
+    for name in "abc":
+        with tracer.span(name):
+            pass
+
+    # "a" is overwritten, and the end of "b" has lost its begin
+    assert len(tracer) == 3
+    assert _spans(tracer) == [("c", "B"), ("c", "E")]
+
+    tracer.clear()
+    assert tracer.events() == []
+
+
+def test_trace_tables(tracer, tmp_path):
+    trace_tables(tracer)
+    table = BaccaratTable(num_decks=1, verbose=False)
+    table.seat_player(Player(1000))
+    table.place_bet(10, BetResult.BANKER)
+    table.play()
+
+    # The table shuffles its shoe when it's opened
+    names = [name for name, phase in _spans(tracer) if phase == "B"]
+    assert names[:2] == ["Shoe.shuffle", "BaccaratTable.play"]
+    for name in ("_deal", "_play", "_settle_bets"):
+        assert f"BaccaratTable.{name}" in names
+
+    path = tmp_path / "trace.json"
+    tracer.dump(path)
+    assert json.loads(path.read_text())["traceEvents"] == tracer.events()
+
+    tracer.restore()
+    tracer.clear()
+    Shoe(1).reset()
+    assert len(tracer) == 0
@@ -0,0 +1,128 @@
+"""Test the variance-reduced estimators."""
+import random
+
+import pytest
+
+from baccarat.game import Outcome
+from baccarat.odds import outcome_probabilities
+from baccarat.odds import shoe_counts
+from baccarat.sidebets import DRAGON_7
+from baccarat.sidebets import side_bet_expected_value
+from baccarat.variance import estimate_control_variates
+from baccarat.variance import estimate_importance
+from baccarat.variance import estimate_plain
+from baccarat.variance import estimate_stratified
+from baccarat.variance import estimate_streak_probability
+from baccarat.variance import play_values
+from baccarat.variance import streak_probability
+
+NATURAL_9_OVER_0 = Outcome(0, 9, False, False)
+
+
+def natural_9_over_0(outcome):
+    """Whether the banker's natural 9 beats the player's 0."""
+    return float(outcome == NATURAL_9_OVER_0)
+
+
+@pytest.fixture
+def rng():
+    return random.Random(0)
+
+
+def test_play_values():
+    """Test playing out a coup from card values."""
+    assert play_values((9, 0, 0, 0, 5, 5)) == (Outcome(9, 0, False, False), 4)
+    assert play_values((3, 0, 0, 6, 6, 5)) == (Outcome(9, 1, True, True), 6)
+    assert play_values((3, 0, 0, 6, 8, 5)) == (Outcome(1, 6, True, False), 5)
+    assert play_values((3, 0, 3, 3, 8, 5)) == (Outcome(6, 1, False, True), 5)
+
+
+def test_plain(rng):
+    """Test the plain Monte Carlo estimate."""
+    exact = float(outcome_probabilities(shoe_counts(8))[NATURAL_9_OVER_0])
+    estimate = estimate_plain(natural_9_over_0, 5000, rng=rng)
+
+    assert estimate.mean == pytest.approx(exact, abs=4 * estimate.std_error)
+    assert estimate.variance_reduction == 1
+
+
+def test_stratified_is_exact_for_naturals(rng):
+    """Test an event settled by the first four cards has no variance left."""
+    exact = float(outcome_probabilities(shoe_counts(8))[NATURAL_9_OVER_0])
+    estimate = estimate_stratified(natural_9_over_0, 5000, rng=rng)
+
+    assert estimate.mean == pytest.approx(exact)
+    assert estimate.std_error == 0
+    assert estimate.variance_reduction == float("inf")
+
+
+def test_stratified_side_bet(rng):
+    """Test stratifying a side bet's payoff."""
+    exact = float(side_bet_expected_value(DRAGON_7, shoe_counts(8)))
+    estimate = estimate_stratified(DRAGON_7.net_odds, 5000, rng=rng)
+
+    assert estimate.mean == pytest.approx(exact, abs=4 * estimate.std_error)
+    assert estimate.variance_reduction > 1
+
+
+@pytest.mark.parametrize("samples", [2, 50, 5000])
+def test_stratified_keeps_to_the_budget(rng, samples):
+    """Test exactly the given number of coups are sampled, however many strata there are."""
+    calls = []
+
+    def payoff(outcome):
+        calls.append(outcome)
+        return DRAGON_7.net_odds(outcome)
+
+    estimate_stratified(payoff, 1000, rng=rng)
+    exact_calls = len(calls) - 1000
+    calls.clear()
+
+    estimate = estimate_stratified(payoff, samples, rng=rng)
+    assert estimate.samples == samples
+    assert len(calls) - exact_calls == samples
+
+
+def test_stratified_needs_two_samples():
+    with pytest.raises(ValueError):
+        estimate_stratified(natural_9_over_0, 1)
+
+
+def test_importance(rng):
+    """Test importance sampling from a shoe rich in 0s and 9s."""
+    exact = float(outcome_probabilities(shoe_counts(8))[NATURAL_9_OVER_0])
+    composition = [20, 4, 4, 4, 4, 4, 4, 4, 4, 6]
+    estimate = estimate_importance(natural_9_over_0, 5000, composition, rng=rng)
+
+    assert estimate.mean == pytest.approx(exact, abs=4 * estimate.std_error)
+
+
+def test_importance_needs_every_value():
+    """Test the tilted shoe must be able to draw every value."""
+    with pytest.raises(ValueError):
+        estimate_importance(natural_9_over_0, 10, [1] * 9 + [0])
+
+
+def test_control_variates(rng):
+    """Test the main bets reduce the variance of a Banker side bet."""
+    exact = float(side_bet_expected_value(DRAGON_7, shoe_counts(8)))
+    estimate = estimate_control_variates(DRAGON_7.net_odds, 5000, rng=rng)
+
+    assert estimate.mean == pytest.approx(exact, abs=4 * estimate.std_error)
+    assert estimate.variance_reduction > 1
+
+
+def test_streak_probability():
+    """Test the exact probability of a streak."""
+    assert streak_probability(1, 1) == pytest.approx(0.458597, abs=1e-6)
+    assert streak_probability(2, 2) == pytest.approx(0.458597**2, abs=1e-6)
+    assert streak_probability(3, 2) == 0
+
+
+def test_estimate_streak_probability(rng):
+    """Test importance sampling a long Banker streak."""
+    exact = streak_probability(12, 80)
+    estimate = estimate_streak_probability(12, 80, 5000, tilt=0.55, rng=rng)
+
+    assert estimate.mean == pytest.approx(exact, abs=4 * estimate.std_error)
+    assert estimate.variance_reduction > 1